@@ -1,3 +1,4 @@
 from .client import AaveClient
+from .async_client import AsyncAaveClient
 
 __version__ = '0.2.0'
@@ -583,6 +583,111 @@ class ABIReference:
             "stateMutability": "nonpayable",
             "type": "function",
         },
+        {
+            "anonymous": False,
+            "inputs": [
+                {"indexed": True, "internalType": "address", "name": "owner", "type": "address"},
+                {"indexed": True, "internalType": "address", "name": "spender", "type": "address"},
+                {"indexed": False, "internalType": "uint256", "name": "value", "type": "uint256"},
+            ],
+            "name": "Approval",
+            "type": "event",
+        },
+    ]
+
+    multicall3_abi = [
+        {
+            "inputs": [
+                {
+                    "components": [
+                        {"internalType": "address", "name": "target", "type": "address"},
+                        {"internalType": "bytes", "name": "callData", "type": "bytes"},
+                    ],
+                    "internalType": "struct Multicall3.Call[]",
+                    "name": "calls",
+                    "type": "tuple[]",
+                }
+            ],
+            "name": "aggregate",
+            "outputs": [
+                {"internalType": "uint256", "name": "blockNumber", "type": "uint256"},
+                {"internalType": "bytes[]", "name": "returnData", "type": "bytes[]"},
+            ],
+            "stateMutability": "payable",
+            "type": "function",
+        },
+        {
+            "inputs": [
+                {"internalType": "bool", "name": "requireSuccess", "type": "bool"},
+                {
+                    "components": [
+                        {"internalType": "address", "name": "target", "type": "address"},
+                        {"internalType": "bytes", "name": "callData", "type": "bytes"},
+                    ],
+                    "internalType": "struct Multicall3.Call[]",
+                    "name": "calls",
+                    "type": "tuple[]",
+                },
+            ],
+            "name": "tryAggregate",
+            "outputs": [
+                {
+                    "components": [
+                        {"internalType": "bool", "name": "success", "type": "bool"},
+                        {"internalType": "bytes", "name": "returnData", "type": "bytes"},
+                    ],
+                    "internalType": "struct Multicall3.Result[]",
+                    "name": "returnData",
+                    "type": "tuple[]",
+                }
+            ],
+            "stateMutability": "payable",
+            "type": "function",
+        },
+        {
+            "inputs": [
+                {"internalType": "bool", "name": "requireSuccess", "type": "bool"},
+                {
+                    "components": [
+                        {"internalType": "address", "name": "target", "type": "address"},
+                        {"internalType": "bytes", "name": "callData", "type": "bytes"},
+                    ],
+                    "internalType": "struct Multicall3.Call[]",
+                    "name": "calls",
+                    "type": "tuple[]",
+                },
+            ],
+            "name": "tryBlockAndAggregate",
+            "outputs": [
+                {"internalType": "uint256", "name": "blockNumber", "type": "uint256"},
+                {"internalType": "bytes32", "name": "blockHash", "type": "bytes32"},
+                {
+                    "components": [
+                        {"internalType": "bool", "name": "success", "type": "bool"},
+                        {"internalType": "bytes", "name": "returnData", "type": "bytes"},
+                    ],
+                    "internalType": "struct Multicall3.Result[]",
+                    "name": "returnData",
+                    "type": "tuple[]",
+                },
+            ],
+            "stateMutability": "payable",
+            "type": "function",
+        },
+        {
+            "inputs": [],
+            "name": "getBlockNumber",
+            "outputs": [{"internalType": "uint256", "name": "blockNumber", "type": "uint256"}],
+            "stateMutability": "view",
+            "type": "function",
+        },
+        {
+            "inputs": [{"internalType": "address", "name": "addr", "type": "address"}],
+            "name": "getEthBalance",
+            "outputs": [{"internalType": "uint256", "name": "balance", "type": "uint256"}],
+            "stateMutability": "view",
+            "type": "function",
+        },
     ]
 
     lending_pool_addresses_provider_abi = [
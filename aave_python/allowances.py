@@ -0,0 +1,156 @@
+from collections import OrderedDict
+import threading
+import time
+
+from .abi import ABIReference
+from .contracts import get_contract_cache
+
+from hexbytes import HexBytes
+from web3 import Web3
+from web3._utils.events import event_abi_to_log_topic
+
+UNLIMITED_ALLOWANCE = 2 ** 256 - 1
+
+
+"""------------------------------------------------ APPROVAL POLICY -------------------------------------------------"""
+class ApprovalPolicy:
+    """
+    Decides how much to approve when an allowance is too low:
+        - "exact": the amount the operation needs (an approval before every operation)
+        - "buffered": 'buffer_multiplier' times the amount, so that the next operations reuse the allowance
+        - "unlimited": the maximum uint256 allowance (a single approval per token)
+
+    Some tokens (e.g. USDT) revert approvals that change a nonzero allowance to another nonzero value, which a leftover
+    "buffered" (or partially spent "exact") allowance would hit. For the tokens in 'zero_first_tokens', a nonzero
+    allowance is approved back to zero before the new amount is approved.
+    """
+    MODES = ("exact", "buffered", "unlimited")
+    # Mainnet reserves whose approve() requires the current allowance to be zero: USDT and legacy KNC
+    ZERO_FIRST_TOKENS = frozenset({"0xdac17f958d2ee523a2206206994597c13d831ec7",
+                                   "0xdd974d5c2e2928dea5f71b9825b8b646686bd200"})
+
+    def __init__(self, mode: str = "exact", buffer_multiplier: float = 10, zero_first_tokens: list = None):
+        if mode.lower() not in self.MODES:
+            raise ValueError(f"Invalid approval policy '{mode}' - Valid approval policies are {list(self.MODES)}")
+        if buffer_multiplier < 1:
+            raise ValueError("The approval buffer multiplier must be at least 1")
+        self.mode = mode.lower()
+        self.buffer_multiplier = buffer_multiplier
+        self.zero_first_tokens = {token.lower() for token in zero_first_tokens} if zero_first_tokens is not None \
+            else set(self.ZERO_FIRST_TOKENS)
+
+    def approval_amount(self, required_amount: int) -> int:
+        """Returns the allowance to approve for an operation that needs 'required_amount' (decimal units)"""
+        if self.mode == "unlimited":
+            return UNLIMITED_ALLOWANCE
+        elif self.mode == "buffered":
+            return min(UNLIMITED_ALLOWANCE, int(required_amount * self.buffer_multiplier))
+        return required_amount
+
+    def requires_reset(self, token_address: str, current_allowance: int) -> bool:
+        """Whether the token's allowance must be approved to zero before a new amount can be approved"""
+        return current_allowance > 0 and token_address.lower() in self.zero_first_tokens
+
+
+"""------------------------------------------------ ALLOWANCE CACHE -------------------------------------------------"""
+class AllowanceCache:
+    """
+    Local cache of the ERC20 allowances granted by one owner, so that approval checks cost no RPC calls.
+
+    - Allowances are read with allowance() the first time a (token, spender) pair is used.
+    - Our own approvals and spends are applied locally when their transactions are sent.
+    - Changes made outside of this client (e.g. a revoke from another wallet app) are picked up from the owner's
+      Approval logs, checked at most once every 'sync_interval' seconds. Logs emitted by our own transactions are
+      skipped, since those changes were already applied locally.
+    """
+    OWN_TRANSACTIONS_KEPT = 1024
+
+    def __init__(self, w3: Web3, owner_address: str, sync_interval: float = 30):
+        self.w3 = w3
+        self.owner_address = Web3.toChecksumAddress(owner_address)
+        self.sync_interval = sync_interval
+        self._allowances = {}  # (token, spender) (lowercase) -> allowance (decimal units)
+        self._own_transactions = OrderedDict()
+        self._last_synced_block = None
+        self._last_synced_at = 0
+        self._lock = threading.RLock()
+
+        approval_abi = [entry for entry in ABIReference.erc20_abi
+                        if entry["type"] == "event" and entry["name"] == "Approval"][0]
+        self._approval_topic = Web3.toHex(event_abi_to_log_topic(approval_abi))
+        self._owner_topic = Web3.toHex(HexBytes(self.owner_address).rjust(32, b"\x00"))
+
+    def get(self, token_address: str, spender_address: str) -> int:
+        """Returns the allowance of the spender for the token (decimal units)"""
+        key = (token_address.lower(), spender_address.lower())
+        with self._lock:
+            if self._last_synced_block is not None and time.time() - self._last_synced_at >= self.sync_interval:
+                self.sync()
+            if key not in self._allowances:
+                if self._last_synced_block is None:
+                    self._last_synced_block = self.w3.eth.block_number
+                    self._last_synced_at = time.time()
+                allowance = get_contract_cache(self.w3).function(token_address, ABIReference.erc20_abi, "allowance")
+                self._allowances[key] = allowance(self.owner_address, Web3.toChecksumAddress(spender_address)).call(
+                    block_identifier=self._last_synced_block)
+            return self._allowances[key]
+
+    def set(self, token_address: str, spender_address: str, allowance: int, tx_hash=None) -> None:
+        """Records an approval sent by this client"""
+        with self._lock:
+            self._allowances[(token_address.lower(), spender_address.lower())] = allowance
+            self._record_own_transaction(tx_hash)
+
+    def spend(self, token_address: str, spender_address: str, amount: int, tx_hash=None) -> None:
+        """Records that a transaction sent by this client lets the spender pull 'amount' of the token"""
+        key = (token_address.lower(), spender_address.lower())
+        with self._lock:
+            if key in self._allowances and self._allowances[key] != UNLIMITED_ALLOWANCE:
+                self._allowances[key] = max(0, self._allowances[key] - amount)
+            self._record_own_transaction(tx_hash)
+
+    def invalidate(self, token_address: str = None) -> None:
+        """Drops the cached allowances of one token (or of every token), so they are read again on next use"""
+        with self._lock:
+            if token_address is None:
+                self._allowances.clear()
+            else:
+                for key in [key for key in self._allowances if key[0] == token_address.lower()]:
+                    del self._allowances[key]
+
+    def sync(self) -> int:
+        """
+        Applies the owner's Approval logs emitted by other transactions since the last sync.
+
+        Returns:
+            The number of allowances updated
+        """
+        with self._lock:
+            latest_block = self.w3.eth.block_number
+            tokens = sorted({token for token, _ in self._allowances})
+            updated = 0
+            if self._last_synced_block is not None and latest_block > self._last_synced_block and tokens:
+                logs = self.w3.eth.get_logs({
+                    "address": [Web3.toChecksumAddress(token) for token in tokens],
+                    "fromBlock": self._last_synced_block + 1,
+                    "toBlock": latest_block,
+                    "topics": [self._approval_topic, self._owner_topic],
+                })
+                for log in logs:
+                    if Web3.toHex(log["transactionHash"]) in self._own_transactions:
+                        continue
+                    spender = Web3.toChecksumAddress(HexBytes(log["topics"][2])[-20:])
+                    self._allowances[(log["address"].lower(), spender.lower())] = int.from_bytes(HexBytes(log["data"]),
+                                                                                               "big")
+                    updated += 1
+
+            self._last_synced_block = latest_block
+            self._last_synced_at = time.time()
+            return updated
+
+    def _record_own_transaction(self, tx_hash) -> None:
+        if tx_hash is None:
+            return
+        self._own_transactions[Web3.toHex(HexBytes(tx_hash))] = None
+        while len(self._own_transactions) > self.OWN_TRANSACTIONS_KEPT:
+            self._own_transactions.popitem(last=False)
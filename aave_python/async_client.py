@@ -0,0 +1,587 @@
+import asyncio
+from datetime import datetime
+
+from .abi import ABIReference
+from .allowances import ApprovalPolicy
+from .contracts import get_contract_cache
+from .fees import FeeEstimator
+from .gas import GasLimitModel
+from .models import ReserveToken, ReserveTokenIndex, AaveTrade
+from .multicall import decode_function_result
+from .network_configs import *
+from .planner import OperationPlan, OperationPlanner
+from .token_cache import ReserveTokenCache
+
+import web3.eth
+from aiohttp import ClientSession, ClientTimeout, TCPConnector
+from eth_account import Account
+from web3 import Web3
+from web3.eth import AsyncEth
+
+
+"""------------------------------------------ ASYNCIO AAVE STAKING CLIENT -------------------------------------------"""
+class AsyncAaveClient:
+    """
+    Asyncio version of the AaveClient, running on web3's AsyncHTTPProvider with a shared keep-alive connection pool.
+
+    Every read is a coroutine, and fan-out reads (reserve discovery, reserve balances, prices) are issued concurrently
+    with asyncio.gather, so a single event loop can keep hundreds of requests in flight.
+
+    Usage:
+        async with AsyncAaveClient(wallet_address, private_wallet_key, mainnet_rpc_url=url) as aave_client:
+            print(await aave_client.get_user_data())
+    """
+    def __init__(self, wallet_address: str, private_wallet_key: str,
+                 mainnet_rpc_url: str = None, goerli_rpc_url: str = None,
+                 gas_strategy: str = "medium", max_connections: int = 200, request_timeout: float = 30,
+                 reserve_cache_dir: str = None, learn_gas_limits: bool = True):
+        assert wallet_address is not None, "Wallet address is None - Required for instantiation"
+        assert private_wallet_key is not None, "Private wallet key is None - Required for instantiation"
+
+        self.private_key = private_wallet_key
+        self.wallet_address = Web3.toChecksumAddress(wallet_address)
+
+        if goerli_rpc_url is None and mainnet_rpc_url is None:
+            raise Exception("Missing RPC URLs for all available choices. Must use at least one network configuration.")
+        elif goerli_rpc_url is not None and mainnet_rpc_url is not None:
+            raise Exception("Only one active network supported at a time. Please use either the Goerli testnet or Mainnet network.")
+        else:
+            self.active_network = GoerliConfig(goerli_rpc_url) if goerli_rpc_url is not None else MainnetConfig(
+                mainnet_rpc_url)
+
+        self.max_connections = max_connections
+        self.request_timeout = request_timeout
+        self.session = None
+        self.w3 = Web3(Web3.AsyncHTTPProvider(self.active_network.rpc_url,
+                                              request_kwargs={"timeout": ClientTimeout(total=request_timeout)}),
+                       modules={"eth": (AsyncEth,)}, middlewares=[])
+
+        # Provider-less Web3 instance, only used to build contract calls and encode/decode ABI data
+        self.codec = Web3()
+        self.contracts = get_contract_cache(self.codec)
+        self.data_provider_contract = self.contracts.contract(self.active_network.protocol_data_provider,
+                                                              ABIReference.protocol_data_provider)
+        self.addresses_provider_contract = self.contracts.contract(self.active_network.lending_pool_addresses_provider,
+                                                                   ABIReference.lending_pool_addresses_provider_abi)
+        self.lending_pool_contract = None
+        self.price_oracle_contract = None
+
+        # On-disk reserve token cache (see ./token_cache.py), defaults to ~/.cache/aave_python
+        self.reserve_token_cache = ReserveTokenCache(self.active_network.chain_id,
+                                                     self.active_network.protocol_data_provider, reserve_cache_dir)
+
+        # Decides which steps (e.g. approvals) each operation needs (see ./planner.py)
+        self.planner = OperationPlanner()
+
+        # Approvals are always exact here - the policy decides which tokens need an approval to zero first
+        self.approval_policy = ApprovalPolicy("exact")
+
+        # EIP-1559 fee estimator for the gas strategy speed tier: 'fast', 'medium', 'slow' or 'glacial' (see ./fees.py)
+        self.fee_estimator = FeeEstimator(self.w3, gas_strategy)
+        self.timeout = self.fee_estimator.timeout
+
+        # Gas limits learned from receipts, skipping eth_estimateGas for known operations (see ./gas.py)
+        self.gas_limits = GasLimitModel(enabled=learn_gas_limits)
+        self._sent_gas_keys = {}  # Transaction hash (hex) -> (gas limit key, gas limit used), until its receipt
+
+    async def __aenter__(self) -> "AsyncAaveClient":
+        await self.connect()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def connect(self) -> None:
+        """
+        Opens the pooled HTTP session, resolves the protocol contracts and populates the reserve tokens if needed.
+        Must be awaited once before using the client (done automatically by 'async with').
+        """
+        if self.session is None:
+            self.session = ClientSession(connector=TCPConnector(limit=self.max_connections, keepalive_timeout=60),
+                                         timeout=ClientTimeout(total=self.request_timeout), raise_for_status=True)
+            await self.w3.provider.cache_async_session(self.session)
+
+        try:
+            lending_pool_address, price_oracle_address = await asyncio.gather(
+                self._call(self.addresses_provider_contract.functions.getLendingPool()),
+                self._call(self.addresses_provider_contract.functions.getPriceOracle()),
+            )
+        except Exception as exc:
+            raise ConnectionError(f"Could not connect to {self.active_network.net_name} network with RPC URL: "
+                                  f"{self.active_network.rpc_url} - Error: {exc}")
+        self.lending_pool_contract = self.contracts.contract(lending_pool_address, ABIReference.lending_pool_abi)
+        self.price_oracle_contract = self.contracts.contract(price_oracle_address, ABIReference.aave_price_oracle_abi)
+
+        # Populate active network with reserve tokens if needed
+        self.reserve_index = ReserveTokenIndex(self.active_network.aave_tokens)
+        if len(self.active_network.aave_tokens) == 0:
+            await self._store_reserve_tokens()
+
+    async def close(self) -> None:
+        """Closes the pooled HTTP session"""
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def _call(self, function_call, block_identifier="latest"):
+        """Executes a prepared ContractFunction with eth_call and decodes the result like ContractFunction.call()"""
+        return_data = await self.w3.eth.call({"to": function_call.address,
+                                              "data": function_call._encode_transaction_data()}, block_identifier)
+        return decode_function_result(self.codec, function_call, return_data)
+
+    async def _send_transaction(self, function_call, nonce: int, value: int = 0,
+                                gas_key: tuple = None) -> web3.eth.HexBytes:
+        """
+        Builds, signs and broadcasts the transaction for a prepared ContractFunction, returning the tx hash. The gas
+        limit learned by self.gas_limits for 'gas_key' is used if there is one, otherwise it is estimated by the node.
+        """
+        transaction = {
+            "chainId": self.active_network.chain_id,
+            "from": self.wallet_address,
+            "to": function_call.address,
+            "nonce": nonce,
+            "value": value,
+            "data": function_call._encode_transaction_data(),
+        }
+        gas = self.gas_limits.gas_limit(gas_key) if gas_key is not None else None
+        if gas is None:
+            transaction["gas"], fee_view = await asyncio.gather(self.w3.eth.estimate_gas(transaction),
+                                                                self.fee_estimator.fee_view_async())
+        else:
+            transaction["gas"], fee_view = gas, await self.fee_estimator.fee_view_async()
+        transaction.update(fee_view.transaction_fees(self.fee_estimator.speed))
+        signed_txn = Account.sign_transaction(transaction, private_key=self.private_key)
+        tx_hash = await self.w3.eth.send_raw_transaction(signed_txn.rawTransaction)
+        if gas_key is not None:
+            self._sent_gas_keys[Web3.toHex(tx_hash)] = (gas_key, gas)
+        return tx_hash
+
+    async def _wait_for_transaction_receipt(self, tx_hash: web3.eth.HexBytes) -> dict:
+        """Waits for the transaction receipt, and records its gasUsed in self.gas_limits"""
+        try:
+            receipt = dict(await self.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=self.timeout))
+        except Exception:
+            self._sent_gas_keys.pop(Web3.toHex(tx_hash), None)
+            raise
+        if Web3.toHex(tx_hash) in self._sent_gas_keys:
+            gas_key, gas_limit = self._sent_gas_keys.pop(Web3.toHex(tx_hash))
+            self.gas_limits.record(gas_key, receipt, gas_limit)
+        return receipt
+
+    async def _get_nonce(self, nonce: int = None) -> int:
+        return nonce if nonce is not None else await self.w3.eth.get_transaction_count(self.wallet_address)
+
+    async def process_transaction_receipt(self, tx_hash: web3.eth.HexBytes, asset_amount: float,
+                                          reserve_token: ReserveToken, operation: str, interest_rate_mode: str = None,
+                                          approval_gas_cost: float = 0) -> AaveTrade:
+        print(f"Awaiting transaction receipt for transaction hash: {tx_hash.hex()} (timeout = {self.timeout} seconds)")
+        receipt = await self._wait_for_transaction_receipt(tx_hash)
+
+        verification_timestamp = datetime.utcnow()
+        gas_fee = Web3.fromWei(int(receipt['effectiveGasPrice']) * int(receipt['gasUsed']), 'ether') + approval_gas_cost
+
+        return AaveTrade(hash=tx_hash.hex(),
+                         timestamp=int(datetime.timestamp(verification_timestamp)),
+                         datetime=verification_timestamp.strftime("%Y-%m-%d %H:%M:%S"),
+                         contract_address=receipt['contractAddress'],
+                         from_address=receipt['from'],
+                         to_address=receipt['to'],
+                         gas_price=gas_fee,
+                         asset_symbol=reserve_token.symbol, asset_address=reserve_token.address,
+                         asset_amount=asset_amount,
+                         asset_amount_decimal_units=self.convert_to_decimal_units(reserve_token, asset_amount),
+                         interest_rate_mode=interest_rate_mode, operation=operation)
+
+    async def convert_eth_to_weth(self, amount_in_eth: float) -> AaveTrade:
+        """Mints WETH by depositing ETH, then returns the transaction hash string"""
+        print(f"Converting {amount_in_eth} ETH to WETH...")
+        weth = self.contracts.contract(self.active_network.weth_token, ABIReference.weth_abi)
+        tx_hash = await self._send_transaction(weth.functions.deposit(), await self._get_nonce(),
+                                               value=Web3.toWei(amount_in_eth, 'ether'),
+                                               gas_key=self.gas_limits.key("Convert ETH to WETH", weth.address))
+        receipt = await self.process_transaction_receipt(tx_hash, asset_amount=amount_in_eth,
+                                                         reserve_token=self.get_reserve_token("WETH"),
+                                                         operation="Convert ETH to WETH")
+        print("Received WETH!")
+        return receipt
+
+    async def approve_erc20(self, erc20_address: str, amount_in_decimal_units: int,
+                            nonce: int = None, force: bool = False) -> tuple:
+        """
+        Approve the smart contract to take the tokens out of the wallet
+
+        Returns a tuple of the following:
+            if force is True or allowance < amount_in_decimal_units:
+                (transaction hash string, approval gas cost)
+            else:
+                (None, 0)
+        """
+        approval_hash, approval_gas, _ = await self._approve(erc20_address, amount_in_decimal_units, nonce, force)
+        return approval_hash, approval_gas
+
+    async def _approve(self, erc20_address: str, amount_in_decimal_units: int, nonce: int = None,
+                       force: bool = False) -> tuple:
+        """
+        See self.approve_erc20() - tokens that only allow approvals from a zero allowance (e.g. USDT) get an approval
+        to zero first.
+
+        Returns:
+            (transaction hash string or None, approval gas cost, the nonce to use for the next transaction)
+        """
+        erc20 = self.contracts.contract(erc20_address, ABIReference.erc20_abi)
+        lending_pool_address = self.lending_pool_contract.address
+        allowance = await self._call(self.contracts.function(erc20.address, ABIReference.erc20_abi, "allowance")(
+            self.wallet_address, lending_pool_address))
+        if not force and allowance >= amount_in_decimal_units:
+            return None, 0, nonce
+
+        gas_cost = 0
+        nonce = await self._get_nonce(nonce)
+        if self.approval_policy.requires_reset(erc20.address, allowance):
+            print(f"{erc20.address} does not allow changing a nonzero allowance - approving zero first...")
+            reset_hash = await self._send_transaction(erc20.functions.approve(lending_pool_address, 0), nonce)
+            reset_receipt = await self._wait_for_transaction_receipt(reset_hash)
+            gas_cost += int(reset_receipt['effectiveGasPrice']) * int(reset_receipt['gasUsed'])
+            allowance, nonce = 0, nonce + 1
+
+        tx_hash = await self._send_transaction(erc20.functions.approve(lending_pool_address, amount_in_decimal_units),
+                                               nonce,
+                                               gas_key=self.gas_limits.approval_key(erc20.address, allowance,
+                                                                                    amount_in_decimal_units))
+        receipt = await self._wait_for_transaction_receipt(tx_hash)
+        gas_cost += int(receipt['effectiveGasPrice']) * int(receipt['gasUsed'])
+
+        print(f"Approved {amount_in_decimal_units} of {erc20.address} for contract {lending_pool_address}")
+        return tx_hash.hex(), Web3.fromWei(gas_cost, 'ether'), nonce + 1
+
+    async def _ensure_allowance(self, plan: OperationPlan, nonce: int) -> tuple:
+        """
+        Runs the "ensure_allowance" step of the plan (if any) - See AaveClient._ensure_allowance()
+
+        Returns:
+            (the approval gas cost, the nonce to use for the main transaction)
+        """
+        if not plan.requires_allowance:
+            return 0, nonce
+
+        print(f"Approving transaction to {plan.operation.lower()} {plan.amount_in_decimal_units} decimal units of "
+              f"{plan.asset_address}...")
+        try:
+            _, approval_gas, nonce = await self._approve(erc20_address=plan.asset_address,
+                                                         amount_in_decimal_units=plan.amount_in_decimal_units,
+                                                         nonce=nonce)
+        except Exception as exc:
+            raise UserWarning(f"Could not approve {plan.operation.lower()} transaction - Error Code {exc}")
+        return approval_gas, nonce
+
+    def _gas_key(self, plan: OperationPlan) -> tuple:
+        """The self.gas_limits key of the main transaction of a plan (approvals are always mined first here)"""
+        return self.gas_limits.key(plan.operation, plan.asset_address, "approved" if plan.requires_allowance else None)
+
+    async def withdraw(self, withdraw_token: ReserveToken, withdraw_amount: float, nonce=None) -> AaveTrade:
+        """See AaveClient.withdraw()"""
+        nonce = await self._get_nonce(nonce)
+        amount_in_decimal_units = self.convert_to_decimal_units(withdraw_token, withdraw_amount)
+        plan = self.planner.plan("Withdraw", withdraw_token.address, amount_in_decimal_units)
+        approval_gas, nonce = await self._ensure_allowance(plan, nonce)
+
+        print(f"Withdrawing {withdraw_amount} of {withdraw_token.symbol} from Aave...")
+        function_call = self.lending_pool_contract.functions.withdraw(Web3.toChecksumAddress(withdraw_token.address),
+                                                                      amount_in_decimal_units,
+                                                                      self.wallet_address)
+        tx_hash = await self._send_transaction(function_call, nonce, gas_key=self._gas_key(plan))
+        receipt = await self.process_transaction_receipt(tx_hash, withdraw_amount, withdraw_token,
+                                                         operation="Withdraw", approval_gas_cost=approval_gas)
+        print(f"Successfully withdrew {withdraw_amount:.{withdraw_token.decimals}f} of {withdraw_token.symbol} from Aave")
+        return receipt
+
+    async def withdraw_percentage(self, withdraw_token: ReserveToken, withdraw_percentage: float,
+                                  nonce=None) -> AaveTrade:
+        """See AaveClient.withdraw_percentage()"""
+        if withdraw_percentage > 1.0:
+            raise ValueError("Cannot withdraw more than 100% of available collateral of Aave. "
+                             "Please pass a value between 0.0 and 1.0")
+
+        user_data, (weth_price, withdraw_asset_price) = await asyncio.gather(
+            self.get_user_data(),
+            self.get_asset_prices([self.get_reserve_token("WETH"), withdraw_token], as_dict=False))
+        withdraw_amount = (weth_price / withdraw_asset_price) * (user_data[2] * withdraw_percentage)
+
+        return await self.withdraw(withdraw_token, withdraw_amount, nonce)
+
+    async def deposit(self, deposit_token: ReserveToken, deposit_amount: float, nonce=None) -> AaveTrade:
+        """See AaveClient.deposit()"""
+        nonce = await self._get_nonce(nonce)
+        amount_in_decimal_units = self.convert_to_decimal_units(deposit_token, deposit_amount)
+        plan = self.planner.plan("Deposit", deposit_token.address, amount_in_decimal_units)
+        approval_gas, nonce = await self._ensure_allowance(plan, nonce)
+
+        print(f"Depositing {deposit_amount} of {deposit_token.symbol} to Aave...")
+        function_call = self.lending_pool_contract.functions.deposit(Web3.toChecksumAddress(deposit_token.address),
+                                                                     amount_in_decimal_units,
+                                                                     self.wallet_address,
+                                                                     0)  # The 0 is deprecated and must persist
+        tx_hash = await self._send_transaction(function_call, nonce, gas_key=self._gas_key(plan))
+        receipt = await self.process_transaction_receipt(tx_hash, deposit_amount, deposit_token,
+                                                         operation="Deposit", approval_gas_cost=approval_gas)
+        print(f"Successfully deposited {deposit_amount} of {deposit_token.symbol}")
+        return receipt
+
+    async def borrow(self, borrow_asset: ReserveToken, borrow_amount: float,
+                     nonce=None, interest_rate_mode: str = "stable") -> AaveTrade:
+        """See AaveClient.borrow()"""
+        rate_mode_str = interest_rate_mode
+        if interest_rate_mode.lower() == "stable":
+            interest_rate_mode = 1
+        elif interest_rate_mode.lower() == "variable":
+            interest_rate_mode = 0
+        else:
+            raise ValueError(f"Invalid interest rate mode passed to the borrow_erc20 function ({interest_rate_mode}) - "
+                             f"Valid interest rate modes are 'stable' and 'variable'")
+
+        borrow_amount_in_decimal_units = self.convert_to_decimal_units(borrow_asset, borrow_amount)
+
+        print(f"\nCreating transaction to borrow {borrow_amount:.{borrow_asset.decimals}f} {borrow_asset.symbol}...")
+        function_call = self.lending_pool_contract.functions.borrow(Web3.toChecksumAddress(borrow_asset.address),
+                                                                    borrow_amount_in_decimal_units,
+                                                                    interest_rate_mode, 0,  # 0 must not be changed, it is deprecated
+                                                                    self.wallet_address)
+        plan = self.planner.plan("Borrow", borrow_asset.address, borrow_amount_in_decimal_units)
+        tx_hash = await self._send_transaction(function_call, await self._get_nonce(nonce),
+                                               gas_key=self._gas_key(plan))
+        receipt = await self.process_transaction_receipt(tx_hash, borrow_amount, borrow_asset, operation="Borrow",
+                                                         interest_rate_mode=rate_mode_str)
+
+        print(f"\nBorrowed {borrow_amount:.{borrow_asset.decimals}f} of {borrow_asset.symbol}")
+        print(f"Transaction Hash: {tx_hash.hex()}")
+        return receipt
+
+    async def borrow_percentage(self, borrow_percentage: float, borrow_asset: ReserveToken, nonce=None,
+                                interest_rate_mode: str = "stable") -> AaveTrade:
+        """See AaveClient.borrow_percentage()"""
+        if borrow_percentage > 1.0:
+            raise ValueError("Cannot borrow more than 100% of borrowing power. Please pass a value between 0.0 and 1.0")
+
+        user_data, (weth_price, borrow_asset_price) = await asyncio.gather(
+            self.get_user_data(),
+            self.get_asset_prices([self.get_reserve_token("WETH"), borrow_asset], as_dict=False))
+        borrow_amount = (weth_price / borrow_asset_price) * (user_data[0] * borrow_percentage)
+        print(f"Borrowing {borrow_percentage * 100}% of total borrowing power: "
+              f"{borrow_amount:.{borrow_asset.decimals}f} {borrow_asset.symbol}")
+
+        return await self.borrow(borrow_amount=borrow_amount, borrow_asset=borrow_asset, nonce=nonce,
+                                 interest_rate_mode=interest_rate_mode)
+
+    async def repay(self, repay_asset: ReserveToken, repay_amount: float, nonce=None,
+                    interest_rate_mode: str = "stable") -> AaveTrade:
+        """See AaveClient.repay()"""
+        nonce = await self._get_nonce(nonce)
+
+        rate_mode_str = interest_rate_mode
+        if interest_rate_mode == "stable":
+            interest_rate_mode = 1
+        else:
+            interest_rate_mode = 2
+
+        amount_in_decimal_units = self.convert_to_decimal_units(repay_asset, repay_amount)
+        plan = self.planner.plan("Repay", repay_asset.address, amount_in_decimal_units)
+        approval_gas, nonce = await self._ensure_allowance(plan, nonce)
+
+        print("Repaying...")
+        function_call = self.lending_pool_contract.functions.repay(
+            Web3.toChecksumAddress(repay_asset.address),
+            amount_in_decimal_units,
+            interest_rate_mode,  # the the interest rate mode
+            self.wallet_address,
+        )
+        tx_hash = await self._send_transaction(function_call, nonce, gas_key=self._gas_key(plan))
+        receipt = await self.process_transaction_receipt(tx_hash, repay_amount, repay_asset, "Repay",
+                                                         interest_rate_mode=rate_mode_str,
+                                                         approval_gas_cost=approval_gas)
+        print(f"Repaid {repay_amount} {repay_asset.symbol}")
+        return receipt
+
+    async def repay_percentage(self, repay_asset: ReserveToken, repay_percentage: float, nonce=None) -> AaveTrade:
+        """See AaveClient.repay_percentage()"""
+        if repay_percentage > 1.0:
+            raise ValueError("Cannot repay more than 100% of debts. Please pass a value between 0.0 and 1.0")
+
+        user_data, (weth_price, repay_asset_price) = await asyncio.gather(
+            self.get_user_data(),
+            self.get_asset_prices([self.get_reserve_token("WETH"), repay_asset], as_dict=False))
+        repay_amount = (weth_price / repay_asset_price) * (user_data[1] * repay_percentage)
+
+        return await self.repay(repay_asset, repay_amount, nonce)
+
+    async def get_user_data(self, in_wei=True) -> tuple:
+        """See AaveClient.get_user_data()"""
+        user_data = await self._call(self.contracts.function(self.lending_pool_contract.address,
+                                                             ABIReference.lending_pool_abi,
+                                                             "getUserAccountData")(self.wallet_address))
+        try:
+            (
+                total_collateral_eth,
+                total_debt_eth,
+                available_borrow_eth,
+                liquidation_threshold,
+                ltv,
+                health_factor,
+            ) = user_data
+        except TypeError:
+            raise Exception(f"Could not unpack user data due to a TypeError - Received: {user_data}")
+
+        if not in_wei:
+            available_borrow_eth = Web3.fromWei(available_borrow_eth, "ether")
+            total_collateral_eth = Web3.fromWei(total_collateral_eth, "ether")
+            total_debt_eth = Web3.fromWei(total_debt_eth, "ether")
+
+        return available_borrow_eth, total_debt_eth, total_collateral_eth, \
+            liquidation_threshold, ltv, health_factor
+
+    async def get_asset_price(self, base_address: str, quote_address: str = None) -> float:
+        """See AaveClient.get_asset_price()"""
+        if quote_address is None:
+            return (await self.get_asset_prices([base_address], as_dict=False))[0]
+        base_price, quote_price = await self.get_asset_prices([base_address, quote_address], as_dict=False)
+        return base_price / quote_price
+
+    async def get_asset_prices(self, tokens: list, as_dict: bool = True):
+        """See AaveClient.get_asset_prices()"""
+        if len(tokens) == 0:
+            return {} if as_dict else []
+
+        addresses = [Web3.toChecksumAddress(token.address if isinstance(token, ReserveToken) else token)
+                     for token in tokens]
+        prices = [float(Web3.fromWei(int(price), 'ether'))
+                  for price in await self._call(self.contracts.function(self.price_oracle_contract.address,
+                                                                        ABIReference.aave_price_oracle_abi,
+                                                                        "getAssetsPrices")(addresses))]
+
+        if not as_dict:
+            return prices
+        return {(token.symbol if isinstance(token, ReserveToken) else token): price
+                for token, price in zip(tokens, prices)}
+
+    async def get_user_reserve_data(self, reserve_token: ReserveToken) -> tuple:
+        """See AaveClient.get_user_reserve_data()"""
+        return await self._call(self.contracts.function(self.data_provider_contract.address,
+                                                        ABIReference.protocol_data_provider, "getUserReserveData")(
+            Web3.toChecksumAddress(reserve_token.address), self.wallet_address))
+
+    async def get_wallet_balance(self, reserve_token: ReserveToken) -> int:
+        """Returns the wallet balance of the reserve token's underlying asset (in decimal units)"""
+        return await self._call(self.contracts.function(reserve_token.address, ABIReference.erc20_abi, "balanceOf")(
+            self.wallet_address))
+
+    async def get_all_reserve_balances(self, hide_empty_assets: bool = True, include_prices: bool = False):
+        """See AaveClient.get_all_reserve_balances() - Every reserve is fetched concurrently"""
+        all_reserve_tokens = self.active_network.aave_tokens
+
+        user_reserve_data, wallet_balances = await asyncio.gather(
+            asyncio.gather(*[self.get_user_reserve_data(token) for token in all_reserve_tokens]),
+            asyncio.gather(*[self.get_wallet_balance(token) for token in all_reserve_tokens]),
+        )
+
+        output = {}
+        for token, reserve_data, user_bal in zip(all_reserve_tokens, user_reserve_data, wallet_balances):
+            a_token_balance, stable_debt, variable_debt, _, _, _, _, _, _ = reserve_data
+            output[token.symbol] = {"collateral": a_token_balance, "stable_debt": stable_debt,
+                                    "variable_debt": variable_debt, "wallet_balance": user_bal}
+
+        if hide_empty_assets:
+            for token, balances in output.copy().items():
+                if all(v == 0 for v in balances.values()):
+                    output.pop(token)
+
+        if include_prices:
+            prices = await self.get_asset_prices([token for token in all_reserve_tokens if token.symbol in output])
+            for symbol, price in prices.items():
+                output[symbol]["price_eth"] = price
+
+        return output
+
+    def convert_to_decimal_units(self, reserve_token: ReserveToken, token_amount: float) -> int:
+        """integer units i.e amt * 10 ^ (decimal units of the token). So, 1.2 USDC will be 1.2 * 10 ^ 6"""
+        return int(token_amount * (10 ** int(reserve_token.decimals)))
+
+    def get_reserve_token(self, symbol: str) -> ReserveToken:
+        """Returns the ReserveToken class containing the Aave reserve token with the passed symbol"""
+        token = self.reserve_index.by_symbol(symbol)
+        if token is None:
+            raise ValueError(
+                f"Could not match '{symbol}' with a valid reserve token on aave for the {self.active_network.net_name} network.")
+        return token
+
+    def get_reserve_token_by_address(self, address: str, kind: str = None) -> ReserveToken:
+        """
+        Returns the ReserveToken that the passed underlying asset, aToken, stable debt token or variable debt token
+        address belongs to. Pass 'kind' to only match one type of address - see ReserveTokenIndex in ./models.py
+        """
+        token = self.reserve_index.by_address(address, kind)
+        if token is None:
+            raise ValueError(
+                f"Could not match '{address}' with a valid reserve token on aave for the {self.active_network.net_name} network.")
+        return token
+
+    def fetch_reserve_tokens(self) -> list:
+        """Returns all Aave ReserveToken class objects stored on the active network"""
+        return self.active_network.aave_tokens
+
+    async def refresh_reserve_tokens(self) -> list:
+        """Re-validates the stored reserve tokens against the data provider, fetching any newly listed reserves"""
+        await self._store_reserve_tokens()
+        return self.active_network.aave_tokens
+
+    def _set_reserve_tokens(self, reserve_tokens: list[ReserveToken]) -> None:
+        """Replaces the active network's reserve tokens and swaps in a new ReserveTokenIndex in one assignment"""
+        reserve_index = ReserveTokenIndex(reserve_tokens)
+        self.active_network.aave_tokens = list(reserve_index.tokens)
+        self.reserve_index = reserve_index
+
+    async def _initial_get_reserve_token(self, r_symbol: str, r_address: str) -> ReserveToken:
+        """Builds the ReserveToken object by fetching its decimals and associated token data concurrently"""
+        r_decimals, token_addresses = await asyncio.gather(
+            self._call(self.contracts.function(r_address, ABIReference.erc20_abi, "decimals")()),
+            self._call(self.data_provider_contract.functions.getReserveTokensAddresses(
+                Web3.toChecksumAddress(r_address))),
+        )
+        token_symbols = await asyncio.gather(*[
+            self._call(self.contracts.function(token_address, ABIReference.erc20_abi, "symbol")())
+            for token_address in token_addresses
+        ])
+        a_token, stable_debt_token, variable_debt_token = zip(token_addresses, token_symbols)
+
+        return ReserveToken(r_symbol, r_address, r_decimals,
+                            aTokenAddress=a_token[0], aTokenSymbol=a_token[1],
+                            stableDebtTokenAddress=stable_debt_token[0], stableDebtTokenSymbol=stable_debt_token[1],
+                            variableDebtTokenAddress=variable_debt_token[0],
+                            variableDebtTokenSymbol=variable_debt_token[1])
+
+    async def _store_reserve_tokens(self) -> None:
+        """
+        Loads the reserve tokens for the set network from the on-disk reserve token cache, validated against the data
+        provider's current reserves list. Missing reserves are fetched concurrently, then the cache is updated.
+        """
+        reserves_tokens = await self._call(self.data_provider_contract.functions.getAllReservesTokens())
+
+        cached_tokens = {token.address.lower(): token for token in self.reserve_token_cache.load()}
+        missing_reserves = [(symbol, address) for symbol, address in reserves_tokens
+                            if address.lower() not in cached_tokens]
+        if len(missing_reserves) > 0:
+            print(f"Fetching {len(missing_reserves)} reserve tokens missing from the reserve token cache...")
+            for token in await self._fetch_reserve_tokens(missing_reserves):
+                cached_tokens[token.address.lower()] = token
+
+        reserve_tokens = [cached_tokens[address.lower()] for _, address in reserves_tokens
+                          if address.lower() in cached_tokens]
+        if len(missing_reserves) > 0 or len(reserve_tokens) != len(cached_tokens):
+            self.reserve_token_cache.save(reserve_tokens)
+        self._set_reserve_tokens(reserve_tokens)
+
+        print(f"{len(self.active_network.aave_tokens)}/{len(reserves_tokens)} Reserve tokens stored for "
+              f"{self.active_network.net_name} network")
+
+    async def _fetch_reserve_tokens(self, reserves_tokens: list) -> list[ReserveToken]:
+        """Builds the ReserveToken objects for the passed (symbol, address) reserves, every reserve concurrently"""
+        return list(await asyncio.gather(
+            *[self._initial_get_reserve_token(symbol, address) for symbol, address in reserves_tokens]))
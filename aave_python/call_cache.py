@@ -0,0 +1,117 @@
+from collections import OrderedDict
+import threading
+
+from web3 import Web3
+
+
+"""------------------------------------------- BLOCK-SCOPED CALL CACHE ----------------------------------------------"""
+class BlockCallCache:
+    """
+    LRU cache of eth_call results keyed by (block number, to, calldata, from), shared by every read of a Web3 instance
+    through a middleware (see self.middleware()). Identical reads within one block are answered locally.
+
+    - Reads at an explicit block number are always cacheable. Reads at "latest" are pinned to the block number of the
+      HeadTracker's current head (the request is sent for that block, so the cached result is from the block it is
+      keyed by), and only while the tracker is running - otherwise they are passed through untouched.
+    - Reads at "pending", at block hashes, and failed reads are never cached.
+    - clear() drops every entry - the client calls it on every new head (see AaveClient._on_new_head()).
+
+    The chain id, which web3's validation middleware requests before every eth_call, is also answered once per cache.
+    """
+    def __init__(self, heads=None, max_entries: int = 4096):
+        """
+        Parameters:
+            heads: The HeadTracker resolving "latest" reads to a block number (see ./heads.py)
+
+            max_entries: The maximum number of cached results, least recently used results are evicted first
+        """
+        self.heads = heads
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._chain_id_response = None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def pin(self, params) -> tuple:
+        """
+        Returns the eth_call params with a "latest" block resolved to the current head's block number, or None if the
+        read is not cacheable
+        """
+        if len(params) < 2 or params[1] == "latest":
+            head = self.heads.head if self.heads is not None and self.heads.running else None
+            if head is None:
+                return None
+            return (params[0], hex(head.number), *params[2:])
+        return tuple(params)
+
+    def key(self, params) -> tuple:
+        """The cache key of eth_call params pinned to a block number, or None if the read is not cacheable"""
+        transaction, block_identifier = params[0], params[1]
+        if isinstance(block_identifier, int):
+            block_number = block_identifier
+        elif isinstance(block_identifier, str) and block_identifier.startswith("0x") and len(block_identifier) < 66:
+            block_number = int(block_identifier, 16)
+        else:
+            return None
+        data, sender = transaction.get("data", "0x"), transaction.get("from")
+        return (block_number, str(transaction.get("to", "")).lower(),
+                data.lower() if isinstance(data, str) else Web3.toHex(data),
+                sender.lower() if isinstance(sender, str) else None)
+
+    def get(self, key: tuple):
+        with self._lock:
+            if key in self._entries:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: tuple, response: dict) -> None:
+        with self._lock:
+            self._entries[key] = response
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self, head=None) -> None:
+        """Drops every cached result (e.g. when a new head arrives)"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                    "entries": len(self._entries), "hit_rate": self.hits / lookups if lookups else 0.0}
+
+    def middleware(self, make_request, w3):
+        """web3 middleware answering cacheable eth_call requests from the cache"""
+        def middleware(method, params):
+            if method == "eth_chainId":
+                if self._chain_id_response is None:
+                    response = make_request(method, params)
+                    if "error" in response:
+                        return response
+                    self._chain_id_response = response
+                return self._chain_id_response
+            if method != "eth_call":
+                return make_request(method, params)
+            pinned_params = self.pin(params)
+            key = self.key(pinned_params) if pinned_params is not None else None
+            if key is None:
+                return make_request(method, params)
+            params = pinned_params
+            response = self.get(key)
+            if response is None:
+                response = make_request(method, params)
+                if "error" not in response:
+                    self.put(key, response)
+            return response
+        return middleware
@@ -1,27 +1,56 @@
 from pprint import pprint
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Union
 import json
 import os
 import time
 from datetime import datetime
 from dataclasses import dataclass
 import concurrent.futures
+from concurrent.futures import Future
+import threading
 
 from .abi import ABIReference
-from .models import ReserveToken, AaveTrade
+from .allowances import AllowanceCache, ApprovalPolicy
+from .call_cache import BlockCallCache
+from .contracts import get_contract_cache
+from .fees import FeeEstimator
+from .gas import GasLimitModel
+from .heads import HeadTracker
+from .hedging import HedgePolicy
+from .history_cache import HistoricalCallCache
+from .indexer import LendingPoolIndexer
+from .market import MarketSnapshot
+from .models import ReserveToken, ReserveTokenIndex, AaveTrade, AaveSnapshot
+from .multicall import Multicall
 from .network_configs import *
+from .nonces import NonceManager
+from .planner import OperationPlan, OperationPlanner
+from .receipts import ReceiptWatcher
+from .registry import ProtocolAddressRegistry
+from .risk import HealthFactorEngine
+from .router import RoutedHTTPProvider
+from .scanner import AccountScanner
+from .token_cache import ReserveTokenCache
+from .transport import HTTPTransport
 
-import requests
 import web3.eth
 from web3 import Web3
-from web3.gas_strategies.time_based import *
+from web3.exceptions import TimeExhausted
 
 
 """------------------------------------------ MAIN AAVE STAKING CLIENT ----------------------------------------------"""
 class AaveClient:
     """Fully plug-and-play AAVE staking client in Python3"""
+
     def __init__(self, wallet_address: str, private_wallet_key: str,
-                 mainnet_rpc_url: str = None, goerli_rpc_url: str = None,
-                 gas_strategy: str = "medium", web3_instance: Web3 = None):
+                 mainnet_rpc_url: Union[str, list] = None, goerli_rpc_url: Union[str, list] = None,
+                 gas_strategy: str = "medium", web3_instance: Web3 = None, reserve_cache_dir: str = None,
+                 approval_policy: str = "exact", approval_buffer_multiplier: float = 10,
+                 report_account_data: bool = False, learn_gas_limits: bool = True, transport: HTTPTransport = None,
+                 hedge_reads: bool = False, subscription_url: str = None, cache_reads: bool = False,
+                 cache_history: bool = False, history_cache_max_bytes: int = 512 * 1024 ** 2):
         assert wallet_address is not None, "Wallet address is None - Required for instantiation"
         assert private_wallet_key is not None, "Private wallet key is None - Required for instantiation"
 
@@ -36,44 +65,103 @@ class AaveClient:
             self.active_network = GoerliConfig(goerli_rpc_url) if goerli_rpc_url is not None else MainnetConfig(
                 mainnet_rpc_url)
 
+        # Keep-alive HTTP connection pool shared by the RPC provider, tokenlist and ABI fetches (see ./transport.py)
+        self.transport = HTTPTransport() if transport is None else transport
+
+        # Opt-in hedged reads: slow idempotent reads are sent again to a second endpoint (see ./hedging.py)
+        self.hedge_policy = HedgePolicy() if hedge_reads else None
+
         self.w3 = self._connect() if web3_instance is None else web3_instance
 
+        # Shared cache of contract objects and prepared function encoders (see ./contracts.py)
+        self.contracts = get_contract_cache(self.w3)
+
+        # Batched read aggregator used to collapse many contract reads into a few eth_call requests
+        self.multicall = Multicall(self.w3, self.active_network.multicall_address)
+
         # Set protocol data provider
-        self.data_provider_contract = self.w3.eth.contract(
-            address=Web3.toChecksumAddress(self.active_network.protocol_data_provider),
-            abi=ABIReference.protocol_data_provider
-        )
+        self.data_provider_contract = self.contracts.contract(self.active_network.protocol_data_provider,
+                                                              ABIReference.protocol_data_provider)
+
+        # Resolve the lending pool addresses provider targets once, refreshed only when the provider reports changes
+        self.addresses = ProtocolAddressRegistry(self.w3, self.active_network.lending_pool_addresses_provider,
+                                                 self.multicall)
 
         # Set the lending pool provider
-        self.lending_pool_contract = self._get_lending_pool()
+        self._get_lending_pool()
+
+        # Local nonce allocator, synced from the chain on the first transaction (see ./nonces.py)
+        self.nonces = NonceManager(self.w3, self.wallet_address)
+
+        # How much to approve when an allowance is too low, and the locally cached allowances (see ./allowances.py)
+        self.approval_policy = ApprovalPolicy(approval_policy, approval_buffer_multiplier)
+        self.allowances = AllowanceCache(self.w3, self.wallet_address)
+
+        # Decides which steps (approvals, post-trade reads) each operation needs (see ./planner.py)
+        self.planner = OperationPlanner(report_account_data=report_account_data)
+
+        # Background watcher resolving the receipts of every pending transaction (see ./receipts.py)
+        self.receipts = ReceiptWatcher(self.w3, on_timeout=lambda tx_hash: self.nonces.reconcile())
+
+        # Chain head follower (newHeads subscription if 'subscription_url' is a WebSocket URL or IPC path, otherwise
+        # started on demand with self.heads.start() in polling mode) - new blocks drop the block-scoped caches
+        self.heads = HeadTracker(self.w3, subscription_url)
+        self.heads.on_new_head(self._on_new_head)
+
+        # Opt-in block-scoped eth_call cache shared by every read, dropped on each new head (see ./call_cache.py)
+        self.call_cache = BlockCallCache(self.heads)
+        if cache_reads:
+            self.w3.middleware_onion.inject(self.call_cache.middleware, name="block_call_cache", layer=0)
+
+        # Opt-in on-disk cache of eth_call results at final past blocks, e.g. for backtests (see ./history_cache.py).
+        # Injected innermost, so the in-memory block cache is checked first
+        self.history_cache = None
+        if cache_history:
+            self.history_cache = HistoricalCallCache(self.active_network.chain_id, reserve_cache_dir,
+                                                     max_bytes=history_cache_max_bytes, heads=self.heads)
+            self.w3.middleware_onion.inject(self.history_cache.middleware, name="historical_call_cache", layer=0)
+
+        # Block-pinned snapshots memoized by (block number, reserves) - see self.snapshot()
+        self._snapshots = OrderedDict()
+
+        # On-disk reserve token cache (see ./token_cache.py), defaults to ~/.cache/aave_python
+        self.reserve_token_cache = ReserveTokenCache(self.active_network.chain_id,
+                                                     self.active_network.protocol_data_provider, reserve_cache_dir)
 
         # Populate active network with reserve tokens if needed
+        self.reserve_index = ReserveTokenIndex(self.active_network.aave_tokens)
         if len(self.active_network.aave_tokens) == 0:
             self._store_reserve_tokens()
 
-        # Gas strategies
-        if gas_strategy.lower() == "fast":
-            """Transaction mined within 60 seconds."""
-            self.w3.eth.setGasPriceStrategy(fast_gas_price_strategy)
-            self.timeout = 60
-        elif gas_strategy.lower() == "medium":
-            """Transaction mined within 5 minutes."""
-            self.w3.eth.setGasPriceStrategy(medium_gas_price_strategy)
-            self.timeout = 60 * 5
-        elif gas_strategy.lower() == "slow":
-            """Transaction mined within 1 hour."""
-            self.w3.eth.setGasPriceStrategy(slow_gas_price_strategy)
-            self.timeout = 60 * 60
-        elif gas_strategy.lower() == "glacial":
-            """Transaction mined within 24 hours."""
-            self.w3.eth.setGasPriceStrategy(glacial_gas_price_strategy)
-            self.timeout = 60 * 1440
-        else:
-            raise ValueError("Invalid gas strategy. Available gas strategies are 'fast', 'medium', 'slow', or 'glacial'")
+        # EIP-1559 fee estimator for the gas strategy speed tier: 'fast', 'medium', 'slow' or 'glacial' (see ./fees.py)
+        self.fee_estimator = FeeEstimator(self.w3, gas_strategy)
+        self.timeout = self.fee_estimator.timeout
+
+        # Gas limits learned from receipts per (operation, reserve, approval state), skipping eth_estimateGas once an
+        # operation has been seen - learn_gas_limits=False estimates every transaction instead (see ./gas.py)
+        self.gas_limits = GasLimitModel(enabled=learn_gas_limits)
+
+        if subscription_url is not None or cache_reads:
+            self.heads.start()
+
+    def _on_new_head(self, head) -> None:
+        """Runs on the head tracker thread for every new block"""
+        self.call_cache.clear(head)
+        self.fee_estimator.invalidate()
+        self.receipts.notify_new_head(head)
 
     def _connect(self) -> Web3:
+        """
+        Connects to the RPC URL of the active network. A list of RPC URLs (or hedged reads) is served by a
+        RoutedHTTPProvider, sending reads to the fastest healthy endpoint and transactions to a pinned one (see
+        ./router.py)
+        """
         try:
-            return Web3(Web3.HTTPProvider(self.active_network.rpc_url))
+            rpc_url = self.active_network.rpc_url
+            if isinstance(rpc_url, (list, tuple)) or self.hedge_policy is not None:
+                rpc_urls = list(rpc_url) if isinstance(rpc_url, (list, tuple)) else [rpc_url]
+                return Web3(RoutedHTTPProvider(rpc_urls, self.transport, hedge_policy=self.hedge_policy))
+            return Web3(self.transport.provider(self.active_network.rpc_url))
         except:
             raise ConnectionError(f"Could not connect to {self.active_network.net_name} network with RPC URL: "
                                   f"{self.active_network.rpc_url}")
@@ -82,12 +170,17 @@ class AaveClient:
                                     reserve_token: ReserveToken, operation: str, interest_rate_mode: str = None,
                                     approval_gas_cost: float = 0) -> AaveTrade:
         print(f"Awaiting transaction receipt for transaction hash: {tx_hash.hex()} (timeout = {self.timeout} seconds)")
-        receipt = dict(self.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=self.timeout))
+        receipt = dict(self._wait_for_transaction_receipt(tx_hash))
+        return self._trade_from_receipt(tx_hash, receipt, asset_amount, reserve_token, operation,
+                                        interest_rate_mode, approval_gas_cost)
 
+    def _trade_from_receipt(self, tx_hash: web3.eth.HexBytes, receipt: dict, asset_amount: float,
+                            reserve_token: ReserveToken, operation: str, interest_rate_mode: str = None,
+                            approval_gas_cost: float = 0) -> AaveTrade:
         verification_timestamp = datetime.utcnow()
-        gas_fee = Web3.fromWei(int(receipt['effectiveGasPrice']) * int(receipt['gasUsed']), 'ether') + approval_gas_cost
+        gas_fee = self._gas_cost(receipt) + approval_gas_cost
 
-        return AaveTrade(hash=tx_hash.hex(),
+        return AaveTrade(hash=Web3.toHex(tx_hash),
                          timestamp=int(datetime.timestamp(verification_timestamp)),
                          datetime=verification_timestamp.strftime("%Y-%m-%d %H:%M:%S"),
                          contract_address=receipt['contractAddress'],
@@ -99,51 +192,135 @@ class AaveClient:
                          asset_amount_decimal_units=self.convert_to_decimal_units(reserve_token, asset_amount),
                          interest_rate_mode=interest_rate_mode, operation=operation)
 
+    @staticmethod
+    def _gas_cost(receipt: dict):
+        """The amount of ETH paid for gas by a transaction receipt"""
+        return Web3.fromWei(int(receipt['effectiveGasPrice']) * int(receipt['gasUsed']), 'ether')
+
+    def _watch_trade(self, tx_hash: web3.eth.HexBytes, asset_amount: float, reserve_token: ReserveToken,
+                     operation: str, interest_rate_mode: str = None, approval: Future = None) -> Future:
+        """
+        Returns a Future resolved with the AaveTrade of the transaction by the shared receipt watcher (self.receipts),
+        once the transaction and its approval (the Future returned by self.submit_approve_erc20(), if any) are mined.
+        """
+        trade = Future()
+        receipt = self.receipts.watch(tx_hash, timeout=self.timeout)
+        dependencies = [receipt] if approval is None else [receipt, approval]
+        lock = threading.Lock()
+
+        def resolve(_):
+            with lock:
+                if trade.done() or not all(dependency.done() for dependency in dependencies):
+                    return
+                try:
+                    approval_gas_cost = 0 if approval is None else self._gas_cost(approval.result())
+                    trade.set_result(self._trade_from_receipt(tx_hash, dict(receipt.result()), asset_amount,
+                                                              reserve_token, operation, interest_rate_mode,
+                                                              approval_gas_cost))
+                except Exception as exc:
+                    trade.set_exception(exc)
+
+        for dependency in dependencies:
+            dependency.add_done_callback(resolve)
+        return trade
+
     def convert_eth_to_weth(self, amount_in_eth: float) -> AaveTrade:
         """Mints WETH by depositing ETH, then returns the transaction hash string"""
+        trade = self.submit_convert_eth_to_weth(amount_in_eth)
+        print(f"Awaiting WETH conversion transaction receipt (timeout = {self.timeout} seconds)")
+        receipt = trade.result()
+        print("Received WETH!")
+        return receipt
+
+    def submit_convert_eth_to_weth(self, amount_in_eth: float) -> Future:
+        """
+        Non-blocking version of self.convert_eth_to_weth()
+
+        Returns:
+            A concurrent.futures.Future resolved with the AaveTrade object once the transaction is mined
+        """
         print(f"Converting {amount_in_eth} ETH to WETH...")
         amount_in_wei = Web3.toWei(amount_in_eth, 'ether')
-        nonce = self.w3.eth.getTransactionCount(self.wallet_address)
         weth_address = Web3.toChecksumAddress(self.active_network.weth_token)
-        weth = self.w3.eth.contract(address=weth_address, abi=ABIReference.weth_abi)
+        weth = self.contracts.contract(weth_address, ABIReference.weth_abi)
         function_call = weth.functions.deposit()
-        transaction = function_call.buildTransaction(
-            {
-                "chainId": self.active_network.chain_id,
-                "from": self.wallet_address,
-                "nonce": nonce,
-                # "value": Web3.toWei(amount_in_decimal_units, 'ether'),
-                "value": amount_in_wei
-            }
-        )
-        signed_txn = self.w3.eth.account.sign_transaction(
-            transaction, private_key=self.private_key
-        )
-        tx_hash = self.w3.eth.send_raw_transaction(signed_txn.rawTransaction)
-        receipt = self.process_transaction_receipt(tx_hash, asset_amount=amount_in_eth,
-                                                   reserve_token=self.get_reserve_token("WETH"),
-                                                   operation="Convert ETH to WETH")
-        print("Received WETH!")
-        return receipt
+        tx_hash = self._send_transaction(function_call, value=amount_in_wei,
+                                         gas_key=self.gas_limits.key("Convert ETH to WETH", weth_address))
+        return self._watch_trade(tx_hash, amount_in_eth, self.get_reserve_token("WETH"), "Convert ETH to WETH")
+
+    @property
+    def lending_pool_contract(self) -> web3.eth.Contract:
+        """The LendingPool contract currently registered with the addresses provider"""
+        return self._get_lending_pool()
 
     def _get_lending_pool(self) -> web3.eth.Contract:
         try:
-            lending_pool_addresses_provider_address = Web3.toChecksumAddress(
-                self.active_network.lending_pool_addresses_provider
-            )
-            lending_poll_addresses_provider = self.w3.eth.contract(
-                address=lending_pool_addresses_provider_address,
-                abi=ABIReference.lending_pool_addresses_provider_abi,
-            )
-            lending_pool_address = (
-                lending_poll_addresses_provider.functions.getLendingPool().call()
-            )
-            lending_pool = self.w3.eth.contract(
-                address=lending_pool_address, abi=ABIReference.lending_pool_abi)
+            lending_pool_address = self.addresses.get("lending_pool")
+            lending_pool = self.contracts.contract(lending_pool_address, ABIReference.lending_pool_abi)
             return lending_pool
         except Exception as exc:
             raise Exception(f"Could not fetch the Aave lending pool smart contract - Error: {exc}")
 
+    def _send_transaction(self, function_call, nonce: int = None, value: int = None,
+                          gas: int = None, gas_key: tuple = None) -> web3.eth.HexBytes:
+        """
+        Builds, signs and sends the transaction of a contract function call from self.wallet_address.
+
+        If 'nonce' is None, the nonce is reserved from self.nonces and released again if the transaction could not be
+        sent (e.g. gas estimation failed), so failed transactions never leave a nonce gap.
+        If 'gas' is None, the gas limit learned by self.gas_limits for 'gas_key' is used, and the receipt of the
+        transaction is recorded for that key. Without a learned limit, the gas limit is estimated by the node.
+
+        Returns:
+            The transaction hash
+        """
+        if gas is None and gas_key is not None:
+            gas = self.gas_limits.gas_limit(gas_key)
+        reserved_nonce = nonce is None
+        nonce = self.nonces.next_nonce() if reserved_nonce else nonce
+        transaction_params = {"chainId": self.active_network.chain_id, "from": self.wallet_address, "nonce": nonce}
+        if value is not None:
+            transaction_params["value"] = value
+        if gas is not None:
+            transaction_params["gas"] = gas
+
+        try:
+            transaction_params.update(self.fee_estimator.transaction_fees())
+            transaction = function_call.buildTransaction(transaction_params)
+            signed_txn = self.w3.eth.account.sign_transaction(transaction, private_key=self.private_key)
+            tx_hash = self.w3.eth.send_raw_transaction(signed_txn.rawTransaction)
+        except Exception as exc:
+            if reserved_nonce:
+                self.nonces.release(nonce)
+            if "nonce" in str(exc).lower():
+                self.nonces.reconcile()
+            if "underpriced" in str(exc).lower() or "fee cap" in str(exc).lower():
+                self.fee_estimator.invalidate()
+            raise
+
+        self.nonces.mark_sent(nonce, tx_hash)
+        self.receipts.watch(tx_hash, timeout=self.timeout).add_done_callback(
+            lambda receipt: self._on_transaction_mined(nonce, receipt, gas_key, gas))
+        return tx_hash
+
+    def _on_transaction_mined(self, nonce: int, receipt: Future, gas_key: tuple = None, gas_limit: int = None) -> None:
+        """
+        Stops tracking the nonce of a mined transaction and records its gasUsed in self.gas_limits (dropped transactions
+        are ignored)
+        """
+        if receipt.exception() is None:
+            self.nonces.mark_mined(nonce)
+            if gas_key is not None:
+                self.gas_limits.record(gas_key, receipt.result(), gas_limit)
+
+    def _wait_for_transaction_receipt(self, tx_hash: web3.eth.HexBytes):
+        """Waits for the transaction receipt, reconciling the nonces if the transaction was not mined in time"""
+        try:
+            return self.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=self.timeout)
+        except TimeExhausted:
+            self.nonces.reconcile()
+            raise
+
     def approve_erc20(self, erc20_address: str, amount_in_decimal_units: int,
                       nonce: int =None, force: bool = False) -> tuple:
         """
@@ -155,31 +332,108 @@ class AaveClient:
             else:
                 (None, 0)
         """
-        nonce = nonce if nonce else self.w3.eth.getTransactionCount(self.wallet_address)
+        approval = self.submit_approve_erc20(erc20_address, amount_in_decimal_units, nonce, force)
+        if approval is None:
+            return None, 0
+
+        receipt = approval.result()
+        print(f"Approved {amount_in_decimal_units} of {erc20_address} for contract {self.lending_pool_contract.address}")
+        return Web3.toHex(receipt['transactionHash']), self._gas_cost(receipt)
+
+    def submit_approve_erc20(self, erc20_address: str, amount_in_decimal_units: int,
+                             nonce: int = None, force: bool = False) -> Future:
+        """
+        Non-blocking version of self.approve_erc20()
+
+        The allowance is checked against the local allowance cache (self.allowances). If it is too low, the amount
+        approved is decided by self.approval_policy ('exact', 'buffered' or 'unlimited'), while force=True always
+        approves exactly 'amount_in_decimal_units'. Tokens that only allow approvals from a zero allowance (e.g. USDT)
+        get an approval to zero first.
+
+        Returns:
+            if force is True or allowance < amount_in_decimal_units:
+                A concurrent.futures.Future resolved with the approval transaction receipt once it is mined
+            else:
+                None
+        """
+        return self._submit_approval(erc20_address, amount_in_decimal_units, nonce, force)[0]
+
+    def _submit_approval(self, erc20_address: str, amount_in_decimal_units: int,
+                         nonce: int = None, force: bool = False) -> tuple:
+        """
+        See self.submit_approve_erc20()
 
+        Returns:
+            (the approval Future or None, the nonce to use for the next transaction)
+        """
         erc20_address = Web3.toChecksumAddress(erc20_address)
-        erc20 = self.w3.eth.contract(address=erc20_address, abi=ABIReference.erc20_abi)
-        if not force:
-            if erc20.functions.allowance(self.wallet_address, self.lending_pool_contract.address).call() >= amount_in_decimal_units:
-                return None, 0
-
-        lending_pool_address = Web3.toChecksumAddress(self.lending_pool_contract.address)
-        function_call = erc20.functions.approve(lending_pool_address, amount_in_decimal_units)
-        transaction = function_call.buildTransaction(
-            {
-                "chainId": self.active_network.chain_id,
-                "from": self.wallet_address,
-                "nonce": nonce,
-            }
-        )
-        signed_txn = self.w3.eth.account.sign_transaction(
-            transaction, private_key=self.private_key
-        )
-        tx_hash = self.w3.eth.send_raw_transaction(signed_txn.rawTransaction)
-        receipt = dict(self.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=self.timeout))
+        erc20 = self._get_erc20_contract(erc20_address)
+        lending_pool_address = self.lending_pool_contract.address
+        current_allowance = self.allowances.get(erc20_address, lending_pool_address)
+        if not force and current_allowance >= amount_in_decimal_units:
+            return None, nonce
+
+        if self.approval_policy.requires_reset(erc20_address, current_allowance):
+            print(f"{erc20_address} does not allow changing a nonzero allowance - approving zero first...")
+            reset_hash = self._send_transaction(erc20.functions.approve(lending_pool_address, 0), nonce)
+            self.allowances.set(erc20_address, lending_pool_address, 0, reset_hash)
+            current_allowance = 0
+            nonce = None if nonce is None else nonce + 1
+
+        approval_amount = amount_in_decimal_units if force else \
+            self.approval_policy.approval_amount(amount_in_decimal_units)
+        function_call = erc20.functions.approve(lending_pool_address, approval_amount)
+        tx_hash = self._send_transaction(function_call, nonce, gas_key=self.gas_limits.approval_key(
+            erc20_address, current_allowance, approval_amount))
+        self.allowances.set(erc20_address, lending_pool_address, approval_amount, tx_hash)
+
+        def invalidate_failed_approval(approval: Future):
+            # A failed or dropped approval leaves the cached allowance too high, so read it again on next use
+            if approval.exception() is not None or approval.result()["status"] == 0:
+                self.allowances.invalidate(erc20_address)
+
+        approval = self.receipts.watch(tx_hash, timeout=self.timeout)
+        approval.add_done_callback(invalidate_failed_approval)
+        return approval, None if nonce is None else nonce + 1
+
+    def plan_operation(self, operation: str, reserve_token: ReserveToken,
+                       amount_in_decimal_units: int) -> OperationPlan:
+        """
+        Returns the steps an operation will run ('Deposit', 'Withdraw', 'Borrow', 'Repay' or 'Convert ETH to WETH'),
+        e.g. whether it needs an ERC20 allowance - See ./planner.py
+        """
+        return self.planner.plan(operation, reserve_token.address, amount_in_decimal_units)
+
+    def _ensure_allowance(self, plan: OperationPlan, nonce: int = None) -> tuple:
+        """
+        Runs the "ensure_allowance" step of the plan (if any).
+
+        Returns:
+            (the approval Future or None, the nonce to use for the main transaction)
+        """
+        if not plan.requires_allowance:
+            return None, nonce
+
+        print(f"Approving transaction to {plan.operation.lower()} {plan.amount_in_decimal_units} decimal units of "
+              f"{plan.asset_address}...")
+        try:
+            # A manually specified nonce is moved past the approval transactions
+            return self._submit_approval(erc20_address=plan.asset_address,
+                                         amount_in_decimal_units=plan.amount_in_decimal_units,
+                                         nonce=nonce)
+        except Exception as exc:
+            raise UserWarning(f"Could not approve {plan.operation.lower()} transaction - Error Code {exc}")
 
-        print(f"Approved {amount_in_decimal_units} of {erc20_address} for contract {lending_pool_address}")
-        return tx_hash.hex(), Web3.fromWei(int(receipt['effectiveGasPrice']) * int(receipt['gasUsed']), 'ether')
+    def _gas_key(self, plan: OperationPlan, approval: Future = None) -> tuple:
+        """
+        The self.gas_limits key of the main transaction of a plan. Operations sent right after their own approval are
+        keyed apart, since their gas cannot be estimated until the approval is mined.
+        """
+        if approval is not None:
+            approval_state = "pending_approval"
+        else:
+            approval_state = "approved" if plan.requires_allowance else None
+        return self.gas_limits.key(plan.operation, plan.asset_address, approval_state)
 
     def withdraw(self, withdraw_token: ReserveToken, withdraw_amount: float, nonce=None) -> AaveTrade:
         """
@@ -190,8 +444,8 @@ class AaveClient:
 
             withdraw_amount:  The amount of the 'withdraw_token' to withdraw from Aave (e.g. 0.001 WETH)
 
-            nonce: Manually specify the transaction count/ID. Leave as None to get the current transaction count from
-                   the user's wallet set at self.wallet_address.
+            nonce: Manually specify the transaction count/ID. Leave as None to use the next nonce of the
+                   local nonce manager (self.nonces).
 
         Returns:
             The AaveTrade object - See ./models.py
@@ -199,39 +453,30 @@ class AaveClient:
         Smart Contract Reference:
             https://docs.aave.com/developers/v/2.0/the-core-protocol/lendingpool#withdraw
         """
-        nonce = nonce if nonce else self.w3.eth.getTransactionCount(self.wallet_address)
-        amount_in_decimal_units = self.convert_to_decimal_units(withdraw_token, withdraw_amount)
+        trade = self.submit_withdraw(withdraw_token, withdraw_amount, nonce)
+        print(f"Awaiting withdraw transaction receipt (timeout = {self.timeout} seconds)")
+        receipt = trade.result()
+        print(f"Successfully withdrew {withdraw_amount:.{withdraw_token.decimals}f} of {withdraw_token.symbol} from Aave")
+        return receipt
 
-        # First, attempt to approve the transaction:
-        print(f"Approving transaction to withdraw {withdraw_amount:.{withdraw_token.decimals}f} of {withdraw_token.symbol} from Aave...")
-        try:
-            approval_hash, approval_gas = self.approve_erc20(erc20_address=withdraw_token.address,
-                                                             amount_in_decimal_units=amount_in_decimal_units,
-                                                             nonce=nonce)
-        except Exception as exc:
-            raise UserWarning(f"Could not approve withdraw transaction - Error Code {exc}")
+    def submit_withdraw(self, withdraw_token: ReserveToken, withdraw_amount: float, nonce=None) -> Future:
+        """
+        Non-blocking version of self.withdraw(). Withdrawing burns aTokens, so no approval is needed (see
+        self.plan_operation()).
+
+        Returns:
+            A concurrent.futures.Future resolved with the AaveTrade object once the withdrawal is mined
+        """
+        amount_in_decimal_units = self.convert_to_decimal_units(withdraw_token, withdraw_amount)
+        plan = self.plan_operation("Withdraw", withdraw_token, amount_in_decimal_units)
+        approval, nonce = self._ensure_allowance(plan, nonce)
 
-        # Second, if the transaction is approved, create the transaction to deposit the tokens to Aave:
         print(f"Withdrawing {withdraw_amount} of {withdraw_token.symbol} from Aave...")
         function_call = self.lending_pool_contract.functions.withdraw(withdraw_token.address,
                                                                       amount_in_decimal_units,
                                                                       self.wallet_address)
-        transaction = function_call.buildTransaction(
-            {
-                "chainId": self.active_network.chain_id,
-                "from": self.wallet_address,
-                "nonce": nonce + 1 if approval_hash else nonce,
-            }
-        )
-        signed_txn = self.w3.eth.account.sign_transaction(
-            transaction, private_key=self.private_key
-        )
-        tx_hash = self.w3.eth.send_raw_transaction(signed_txn.rawTransaction)
-        receipt = self.process_transaction_receipt(tx_hash, withdraw_amount, withdraw_token,
-                                                   operation="Withdraw", approval_gas_cost=approval_gas)
-        # receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=self.timeout)
-        print(f"Successfully withdrew {withdraw_amount:.{withdraw_token.decimals}f} of {withdraw_token.symbol} from Aave")
-        return receipt
+        tx_hash = self._send_transaction(function_call, nonce, gas_key=self._gas_key(plan, approval))
+        return self._watch_trade(tx_hash, withdraw_amount, withdraw_token, operation="Withdraw", approval=approval)
 
     def withdraw_percentage(self, withdraw_token: ReserveToken, withdraw_percentage: float, nonce=None) -> AaveTrade:
         """Same parameters as the self.withdraw() function, except instead of 'withdraw_amount', you will pass the
@@ -243,9 +488,9 @@ class AaveClient:
                              "Please pass a value between 0.0 and 1.0")
 
         # Calculate withdraw amount by multiplying the total collateral on Aave by the withdraw_percentage parameter.
-        total_collateral = self.get_user_data()[2]
-        weth_to_withdraw_asset = self.get_asset_price(base_address=self.get_reserve_token("WETH").address,
-                                                      quote_address=withdraw_token.address)
+        snapshot = self.snapshot(reserve_tokens=[self.get_reserve_token("WETH"), withdraw_token])
+        total_collateral = snapshot.total_collateral_eth
+        weth_to_withdraw_asset = snapshot.pair_price("WETH", withdraw_token.symbol)
         withdraw_amount = weth_to_withdraw_asset * (total_collateral * withdraw_percentage)
 
         return self.withdraw(withdraw_token, withdraw_amount, nonce)
@@ -259,8 +504,8 @@ class AaveClient:
 
             deposit_amount: The amount of the 'deposit_token' to deposit on Aave (e.g. 0.001 WETH)
 
-            nonce: Manually specify the transaction count/ID. Leave as None to get the current transaction count from
-                   the user's wallet set at self.wallet_address.
+            nonce: Manually specify the transaction count/ID. Leave as None to use the next nonce of the
+                   local nonce manager (self.nonces).
 
         Returns:
             The AaveTrade object - See ./models.py
@@ -268,44 +513,35 @@ class AaveClient:
         Smart Contract Reference:
             https://docs.aave.com/developers/v/2.0/the-core-protocol/lendingpool#deposit
         """
+        trade = self.submit_deposit(deposit_token, deposit_amount, nonce)
+        print(f"Awaiting deposit transaction receipt (timeout = {self.timeout} seconds)")
+        receipt = trade.result()
+        print(f"Successfully deposited {deposit_amount} of {deposit_token.symbol}")
+        return receipt
 
-        nonce = nonce if nonce else self.w3.eth.getTransactionCount(self.wallet_address)
+    def submit_deposit(self, deposit_token: ReserveToken, deposit_amount: float, nonce=None) -> Future:
+        """
+        Non-blocking version of self.deposit(): the approval (if needed) and the deposit transaction are sent
+        back-to-back without waiting for either to be mined.
 
+        Returns:
+            A concurrent.futures.Future resolved with the AaveTrade object once the deposit is mined
+        """
         amount_in_decimal_units = self.convert_to_decimal_units(deposit_token, deposit_amount)
+        plan = self.plan_operation("Deposit", deposit_token, amount_in_decimal_units)
+        approval, nonce = self._ensure_allowance(plan, nonce)
 
-        # First, attempt to approve the transaction:
-        print(f"Approving transaction to deposit {deposit_amount} of {deposit_token.symbol} to Aave...")
-        try:
-            approval_hash, approval_gas = self.approve_erc20(erc20_address=deposit_token.address,
-                                                             amount_in_decimal_units=amount_in_decimal_units,
-                                                             nonce=nonce)
-        except Exception as exc:
-            raise UserWarning(f"Could not approve deposit transaction - Error Code {exc}")
-
-        # Second, if the transaction is approved, create the transaction to deposit the tokens to Aave:
         print(f"Depositing {deposit_amount} of {deposit_token.symbol} to Aave...")
         function_call = self.lending_pool_contract.functions.deposit(deposit_token.address,
                                                                 amount_in_decimal_units,
                                                                 self.wallet_address,
                                                                 0)  # The 0 is deprecated and must persist
-        transaction = function_call.buildTransaction(
-            {
-                "chainId": self.active_network.chain_id,
-                "from": self.wallet_address,
-                "nonce": nonce + 1 if approval_hash else nonce,
-            }
-        )
-        signed_txn = self.w3.eth.account.sign_transaction(
-            transaction, private_key=self.private_key
-        )
-        tx_hash = self.w3.eth.send_raw_transaction(signed_txn.rawTransaction)
-        receipt = self.process_transaction_receipt(tx_hash, deposit_amount, deposit_token,
-                                                   operation="Deposit", approval_gas_cost=approval_gas)
-        # receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=self.timeout)
-        print(f"Successfully deposited {deposit_amount} of {deposit_token.symbol}")
-        return receipt
+        tx_hash = self._send_transaction(function_call, nonce, gas_key=self._gas_key(plan, approval))
+        self.allowances.spend(deposit_token.address, self.lending_pool_contract.address, amount_in_decimal_units,
+                              tx_hash)
+        return self._watch_trade(tx_hash, deposit_amount, deposit_token, operation="Deposit", approval=approval)
 
-    def get_user_data(self, in_wei=True) -> tuple:
+    def get_user_data(self, in_wei=True, block_identifier="latest") -> tuple:
         """
         - Fetches user account data (shown below) across all reserves
         - Only returns the borrowing power (in ETH), and the total user debt (in ETH)
@@ -313,6 +549,8 @@ class AaveClient:
         Parameters:
             in_wei: If True, returns the collateral, debt, and borrows values in wei instead of the token
 
+            block_identifier: The block to read the account data at (defaults to the latest block)
+
         Returns:
             totalCollateralETH: total collateral in ETH of the use (wei decimal unit)
             totalDebtETH: total debt in ETH of the user (wei decimal unit)
@@ -323,7 +561,13 @@ class AaveClient:
 
         https://docs.aave.com/developers/v/2.0/the-core-protocol/lendingpool#getuseraccountdata
         """
-        user_data = self.lending_pool_contract.functions.getUserAccountData(self.wallet_address).call()
+        user_data = self._prepare_lending_pool_function("getUserAccountData")(self.wallet_address).call(
+            block_identifier=block_identifier)
+        return self._format_user_data(user_data, in_wei)
+
+    @staticmethod
+    def _format_user_data(user_data: list, in_wei: bool = True) -> tuple:
+        """Orders the raw getUserAccountData output as returned by self.get_user_data()"""
         try:
             (
                 total_collateral_eth,  # total collateral in ETH of the use (wei decimal unit)
@@ -355,6 +599,8 @@ class AaveClient:
         If quote_address is None, returns the asset price in Ether
         If quote_address is not None, returns the pair price of BASE/QUOTE
 
+        Both prices of a pair are fetched in a single oracle call - see self.get_asset_prices()
+
         https://docs.aave.com/developers/v/2.0/the-core-protocol/price-oracle#getassetprice
         """
 
@@ -365,27 +611,48 @@ class AaveClient:
         # latest_price = Web3.fromWei(link_eth_price_feed.functions.latestRoundData().call()[1], "ether")
         # print(f"The LINK/ETH price is {latest_price}")
 
-        # For calling the Aave price oracle:
-        price_oracle_address = self.w3.eth.contract(
-            address=Web3.toChecksumAddress(self.active_network.lending_pool_addresses_provider),
-            abi=ABIReference.lending_pool_addresses_provider_abi,
-        ).functions.getPriceOracle().call()
+        if quote_address is None:
+            return self.get_asset_prices([base_address], as_dict=False)[0]
+        base_price, quote_price = self.get_asset_prices([base_address, quote_address], as_dict=False)
+        return base_price / quote_price
 
-        price_oracle_contract = self.w3.eth.contract(
-            address=price_oracle_address, abi=ABIReference.aave_price_oracle_abi
-        )
+    def get_asset_prices(self, tokens: list, as_dict: bool = True, block_identifier="latest"):
+        """
+        Fetches the Aave oracle price in Ether of any number of assets with a single getAssetsPrices call.
+
+        Parameters:
+            tokens: A list of ReserveToken objects and/or underlying asset address strings
 
-        latest_price = Web3.fromWei(int(price_oracle_contract.functions.getAssetPrice(base_address).call()),
-                                    'ether')
-        if quote_address is not None:
-            quote_price = Web3.fromWei(int(price_oracle_contract.functions.getAssetPrice(quote_address).call()),
-                                       'ether')
-            latest_price = latest_price / quote_price
-        return float(latest_price)
+            as_dict: If True, returns a dict mapping each token to its price. If False, returns a list of prices in the
+                     same order as 'tokens'.
 
-    def get_user_reserve_data(self, reserve_token: ReserveToken) -> tuple:
+            block_identifier: The block to read the prices at (defaults to the latest block)
+
+        Returns:
+            dict: {reserve_token_symbol (or address if an address string was passed): price_in_eth (float)}
+            or list: [price_in_eth (float), ...]
+
+        https://docs.aave.com/developers/v/2.0/the-core-protocol/price-oracle#getassetsprices
+        """
+        if len(tokens) == 0:
+            return {} if as_dict else []
+
+        addresses = [Web3.toChecksumAddress(token.address if isinstance(token, ReserveToken) else token)
+                     for token in tokens]
+        get_assets_prices = self.contracts.function(self.addresses.get("price_oracle"),
+                                                    ABIReference.aave_price_oracle_abi, "getAssetsPrices")
+        prices = [float(Web3.fromWei(int(price), 'ether'))
+                  for price in get_assets_prices(addresses).call(block_identifier=block_identifier)]
+
+        if not as_dict:
+            return prices
+        return {(token.symbol if isinstance(token, ReserveToken) else token): price
+                for token, price in zip(tokens, prices)}
+
+    def get_user_reserve_data(self, reserve_token: ReserveToken, block_identifier="latest") -> tuple:
         """
         :param reserve_token: The ReserveToken object for the desired reserve token to fetch data
+        :param block_identifier: The block to read the user reserve data at (defaults to the latest block)
 
         :returns: tuple
             - currentATokenBalance (int)
@@ -398,7 +665,162 @@ class AaveClient:
             - stableRateLastUpdated (int)
             - usageAsCollateralEnabled (bool)
         """
-        return self.data_provider_contract.functions.getUserReserveData(reserve_token.address, self.wallet_address).call()
+        return self._prepare_data_provider_function("getUserReserveData")(
+            Web3.toChecksumAddress(reserve_token.address), self.wallet_address).call(block_identifier=block_identifier)
+
+    def snapshot(self, block="latest", reserve_tokens: list[ReserveToken] = None) -> AaveSnapshot:
+        """
+        Pins a single block and reads everything a higher-level operation needs at that block, so that the values are
+        consistent with each other:
+            - The user account data (same format as self.get_user_data())
+            - The user reserve data of each reserve (same format as self.get_user_reserve_data())
+            - The oracle price in ETH of each reserve
+            - The reserve data of each reserve (protocol data provider getReserveData)
+
+        Parameters:
+            block: The block number to read at, or a block tag such as "latest" which is resolved to a block number.
+
+            reserve_tokens: The ReserveToken objects to include (defaults to every reserve of the active network)
+
+        Returns:
+            The immutable AaveSnapshot object - See ./models.py
+            Snapshots are memoized per block number, so repeated snapshots of the same block cost no calls.
+        """
+        reserve_tokens = self.active_network.aave_tokens if reserve_tokens is None else reserve_tokens
+        block_number = self._resolve_block_number(block)
+
+        key = (block_number, tuple(token.address.lower() for token in reserve_tokens))
+        if key in self._snapshots:
+            self._snapshots.move_to_end(key)
+            return self._snapshots[key]
+
+        reserve_addresses = [Web3.toChecksumAddress(token.address) for token in reserve_tokens]
+        get_user_reserve_data = self._prepare_data_provider_function("getUserReserveData")
+        get_reserve_data = self._prepare_data_provider_function("getReserveData")
+        calls = [self._prepare_lending_pool_function("getUserAccountData")(self.wallet_address),
+                 self.contracts.function(self.addresses.get("price_oracle"), ABIReference.aave_price_oracle_abi,
+                                         "getAssetsPrices")(reserve_addresses)]
+        for address in reserve_addresses:
+            calls.append(get_user_reserve_data(address, self.wallet_address))
+            calls.append(get_reserve_data(address))
+
+        if self.multicall.is_available():
+            results = self.multicall.aggregate(calls, block_identifier=block_number)
+        else:
+            results = [call.call(block_identifier=block_number) for call in calls]
+        user_data, prices, reserve_results = results[0], results[1], results[2:]
+
+        symbols = [token.symbol for token in reserve_tokens]
+        snapshot = AaveSnapshot(
+            block_number=block_number,
+            wallet_address=self.wallet_address,
+            user_data=self._format_user_data(user_data),
+            user_reserve_data=MappingProxyType(dict(zip(symbols, map(tuple, reserve_results[0::2])))),
+            prices=MappingProxyType({symbol: float(Web3.fromWei(int(price), 'ether'))
+                                     for symbol, price in zip(symbols, prices)}),
+            reserve_data=MappingProxyType(dict(zip(symbols, map(tuple, reserve_results[1::2])))),
+        )
+
+        self._snapshots[key] = snapshot
+        while len(self._snapshots) > 16:
+            self._snapshots.popitem(last=False)
+        return snapshot
+
+    def get_market_snapshot(self, block="latest", reserve_tokens: list[ReserveToken] = None) -> MarketSnapshot:
+        """
+        Fetches the protocol-wide state of every reserve (liquidity, debt, rates, indexes, LTV, liquidation threshold
+        and bonus, flags and oracle price) at one block in a single aggregated pass.
+
+        Parameters:
+            block: The block number to read at, or a block tag such as "latest" which is resolved to a block number.
+
+            reserve_tokens: The ReserveToken objects to include (defaults to every reserve of the active network)
+
+        Returns:
+            The MarketSnapshot object with one NumPy array per field - See ./market.py
+
+        https://docs.aave.com/developers/v/2.0/the-core-protocol/protocol-data-provider
+        """
+        reserve_tokens = self.active_network.aave_tokens if reserve_tokens is None else reserve_tokens
+        block_number = self._resolve_block_number(block)
+
+        reserve_addresses = [Web3.toChecksumAddress(token.address) for token in reserve_tokens]
+        get_reserve_data = self._prepare_data_provider_function("getReserveData")
+        get_configuration_data = self._prepare_data_provider_function("getReserveConfigurationData")
+        calls = [self.contracts.function(self.addresses.get("price_oracle"), ABIReference.aave_price_oracle_abi,
+                                         "getAssetsPrices")(reserve_addresses)]
+        for address in reserve_addresses:
+            calls.append(get_reserve_data(address))
+            calls.append(get_configuration_data(address))
+
+        if self.multicall.is_available():
+            results = self.multicall.aggregate(calls, block_identifier=block_number)
+        else:
+            results = [call.call(block_identifier=block_number) for call in calls]
+
+        return MarketSnapshot.from_reserve_data(block_number, reserve_tokens, reserve_data=results[1::2],
+                                                configuration_data=results[2::2], prices=results[0])
+
+    def get_health_factor_engine(self, block="latest", reserve_tokens: list[ReserveToken] = None) -> HealthFactorEngine:
+        """
+        Reads the user's reserve balances and the market state at one block and returns a HealthFactorEngine that
+        evaluates hypothetical deposits, withdrawals, borrows and repays locally (no further RPC calls).
+
+        Parameters:
+            block: The block number to read at, or a block tag such as "latest" which is resolved to a block number.
+
+            reserve_tokens: The ReserveToken objects to include (defaults to every reserve of the active network)
+
+        Returns:
+            The HealthFactorEngine object - See ./risk.py
+        """
+        block_number = self._resolve_block_number(block)
+        market = self.get_market_snapshot(block_number, reserve_tokens)
+        snapshot = self.snapshot(block_number, reserve_tokens)
+        return HealthFactorEngine.from_user_reserve_data(market, snapshot.user_reserve_data)
+
+    def get_account_scanner(self, gas_cap: int = 50_000_000, max_workers: int = 8, **kwargs) -> AccountScanner:
+        """
+        Returns a watch-only AccountScanner that reads getUserAccountData() of many addresses in concurrent Multicall
+        batches, e.g. for liquidation monitoring.
+
+        Parameters:
+            gas_cap: The gas limit of each batched eth_call (keep at or below the provider's eth_call gas cap)
+
+            max_workers: The number of batches requested concurrently
+
+        Returns:
+            The AccountScanner object - call .scan(addresses) - See ./scanner.py
+        """
+        return AccountScanner(self.w3, self.addresses.get("lending_pool"), self.active_network.multicall_address,
+                              gas_cap=gas_cap, max_workers=max_workers, **kwargs)
+
+    def _resolve_block_number(self, block) -> int:
+        """Returns the block number of a block number or block tag (e.g. "latest")"""
+        if isinstance(block, int):
+            return block
+        elif block == "latest":
+            return self.heads.block_number
+        return self.w3.eth.get_block(block)["number"]
+
+    def get_event_indexer(self, database_path: str = "aave_events.db", start_block: int = 0,
+                          confirmations: int = 12, **kwargs) -> LendingPoolIndexer:
+        """
+        Returns a LendingPoolIndexer that streams the active LendingPool's events into a local SQLite database.
+
+        Parameters:
+            database_path: The path of the SQLite database file (created if missing)
+
+            start_block: The first block to index when the database has no checkpoint yet (e.g. the LendingPool
+                         deployment block)
+
+            confirmations: Only blocks at least this deep are indexed, reorgs within this depth never reach the database
+
+        Returns:
+            The LendingPoolIndexer object - call .run() to index up to the latest confirmed block - See ./indexer.py
+        """
+        return LendingPoolIndexer(self.w3, self.addresses.get("lending_pool"), database_path,
+                                  start_block=start_block, confirmations=confirmations, **kwargs)
 
     def get_all_reserves_tokens(self) -> list[ReserveToken]:
         # Get the list of reserves token symbols:
@@ -406,7 +828,7 @@ class AaveClient:
 
         # Pull tokens from active networks tokenlist URL and prepare output
         output = []
-        for token in requests.get(self.active_network.aave_tokenlist_url).json()['proto']:
+        for token in self.active_network.fetch_aave_tokens(self.transport):
             if token['symbol'].upper() in reserves_tokens:
                 output.append(ReserveToken(**token))
         return output
@@ -422,8 +844,8 @@ class AaveClient:
                           self.get_reserve_token(symbol: str) function.
             borrow_amount: Amount of the underlying asset to borrow. The amount should be measured in the asset's
                            currency (e.g. for ETH, borrow_amount=0.05, as in 0.05 ETH)
-            nonce: Manually specify the transaction count/ID. Leave as None to get the current transaction count from
-                   the user's wallet set at self.wallet_address.
+            nonce: Manually specify the transaction count/ID. Leave as None to use the next nonce of the
+                   local nonce manager (self.nonces).
             interest_rate_mode: The type of Aave interest rate mode for borrow debt, with the options being a 'stable'
                                 or 'variable' interest rate.
 
@@ -433,7 +855,25 @@ class AaveClient:
         Smart Contract Docs:
         https://docs.aave.com/developers/v/2.0/the-core-protocol/lendingpool#borrow
         """
+        plan = self.plan_operation("Borrow", borrow_asset, self.convert_to_decimal_units(borrow_asset, borrow_amount))
+        trade = self.submit_borrow(borrow_asset, borrow_amount, nonce, interest_rate_mode)
+        print(f"Awaiting borrow transaction receipt (timeout = {self.timeout} seconds)")
+        receipt = trade.result()
+
+        print(f"\nBorrowed {borrow_amount:.{borrow_asset.decimals}f} of {borrow_asset.symbol}")
+        if plan.reads_account_data:
+            print(f"Remaining Borrowing Power: {self.get_user_data()[0]:.18f}")
+        print(f"Transaction Hash: {receipt.hash}")
+        return receipt
 
+    def submit_borrow(self, borrow_asset: ReserveToken, borrow_amount: float,
+                      nonce=None, interest_rate_mode: str = "stable") -> Future:
+        """
+        Non-blocking version of self.borrow()
+
+        Returns:
+            A concurrent.futures.Future resolved with the AaveTrade object once the borrow is mined
+        """
         rate_mode_str = interest_rate_mode
         if interest_rate_mode.lower() == "stable":
             interest_rate_mode = 1
@@ -452,24 +892,10 @@ class AaveClient:
                                                                     borrow_amount_in_decimal_units,
                                                                     interest_rate_mode, 0,  # 0 must not be changed, it is deprecated
                                                                     self.wallet_address)
-        transaction = function_call.buildTransaction(
-            {
-                "chainId": self.active_network.chain_id,
-                "from": self.wallet_address,
-                "nonce": nonce if nonce else self.w3.eth.getTransactionCount(self.wallet_address),
-            }
-        )
-        signed_txn = self.w3.eth.account.sign_transaction(
-            transaction, private_key=self.private_key
-        )
-        tx_hash = self.w3.eth.send_raw_transaction(signed_txn.rawTransaction)
-        receipt = self.process_transaction_receipt(tx_hash, borrow_amount, borrow_asset, operation="Borrow",
-                                                   interest_rate_mode=rate_mode_str)
-
-        print(f"\nBorrowed {borrow_amount:.{borrow_asset.decimals}f} of {borrow_asset.symbol}")
-        print(f"Remaining Borrowing Power: {self.get_user_data()[0]:.18f}")
-        print(f"Transaction Hash: {tx_hash.hex()}")
-        return receipt
+        plan = self.plan_operation("Borrow", borrow_asset, borrow_amount_in_decimal_units)
+        tx_hash = self._send_transaction(function_call, nonce, gas_key=self._gas_key(plan))
+        return self._watch_trade(tx_hash, borrow_amount, borrow_asset, operation="Borrow",
+                                 interest_rate_mode=rate_mode_str)
 
     def convert_to_decimal_units(self, reserve_token: ReserveToken, token_amount: float) -> int:
         """integer units i.e amt * 10 ^ (decimal units of the token). So, 1.2 USDC will be 1.2 * 10 ^ 6"""
@@ -485,9 +911,9 @@ class AaveClient:
             raise ValueError("Cannot borrow more than 100% of borrowing power. Please pass a value between 0.0 and 1.0")
 
         # Calculate borrow amount from available borrow percentage:
-        total_borrowable_in_eth = self.get_user_data()[0]
-        weth_to_borrow_asset = self.get_asset_price(base_address=self.get_reserve_token("WETH").address,
-                                                    quote_address=borrow_asset.address)
+        snapshot = self.snapshot(reserve_tokens=[self.get_reserve_token("WETH"), borrow_asset])
+        total_borrowable_in_eth = snapshot.available_borrows_eth
+        weth_to_borrow_asset = snapshot.pair_price("WETH", borrow_asset.symbol)
         borrow_amount = weth_to_borrow_asset * (total_borrowable_in_eth * borrow_percentage)
         print(f"Borrowing {borrow_percentage * 100}% of total borrowing power: "
               f"{borrow_amount:.{borrow_asset.decimals}f} {borrow_asset.symbol}")
@@ -502,8 +928,8 @@ class AaveClient:
             repay_asset: The ReserveToken object for the target asset to repay. Use self.get_reserve_token("SYMBOL") to
                          get the ReserveToken object.
             repay_amount: The amount of the target asset to repay. (e.g. 0.5 DAI)
-            nonce: Manually specify the transaction count/ID. Leave as None to get the current transaction count from
-                   the user's wallet set at self.wallet_address.
+            nonce: Manually specify the transaction count/ID. Leave as None to use the next nonce of the
+                   local nonce manager (self.nonces).
             interest_rate_mode: the type of borrow debt,'stable' or 'variable'
 
         Returns:
@@ -511,8 +937,25 @@ class AaveClient:
 
         https://docs.aave.com/developers/v/2.0/the-core-protocol/lendingpool#repay
         """
+        plan = self.plan_operation("Repay", repay_asset, self.convert_to_decimal_units(repay_asset, repay_amount))
+        trade = self.submit_repay(repay_asset, repay_amount, nonce, interest_rate_mode)
+        print(f"Awaiting repay transaction receipt (timeout = {self.timeout} seconds)")
+        receipt = trade.result()
+        print(f"Repaid {repay_amount} {repay_asset.symbol}")
+        if plan.reads_account_data:
+            print(f"{self.get_user_data()[1]:.18f} ETH worth of debt remaining.")
+        return receipt
+
+    def submit_repay(self, repay_asset: ReserveToken, repay_amount: float, nonce=None,
+                     interest_rate_mode: str = "stable") -> Future:
+        """
+        Non-blocking version of self.repay(): the approval (if needed) and the repay transaction are sent back-to-back
+        without waiting for either to be mined.
+
+        Returns:
+            A concurrent.futures.Future resolved with the AaveTrade object once the repayment is mined
+        """
         print("Time to repay...")
-        nonce = nonce if nonce else self.w3.eth.getTransactionCount(self.wallet_address)
 
         rate_mode_str = interest_rate_mode
         if interest_rate_mode == "stable":
@@ -521,42 +964,21 @@ class AaveClient:
             interest_rate_mode = 2
 
         amount_in_decimal_units = self.convert_to_decimal_units(repay_asset, repay_amount)
+        plan = self.plan_operation("Repay", repay_asset, amount_in_decimal_units)
+        approval, nonce = self._ensure_allowance(plan, nonce)
 
-        # First, attempt to approve the transaction:
-        print(f"Approving transaction to repay {repay_amount} of {repay_asset.symbol} to Aave...")
-        try:
-            approval_hash, approval_gas = self.approve_erc20(erc20_address=repay_asset.address,
-                                                             amount_in_decimal_units=amount_in_decimal_units,
-                                                             nonce=nonce)
-            print("Transaction approved!")
-        except Exception as exc:
-            raise UserWarning(f"Could not approve repay transaction - Error Code {exc}")
-
-        print("Building function call...")
         function_call = self.lending_pool_contract.functions.repay(
             repay_asset.address,
             amount_in_decimal_units,
             interest_rate_mode,  # the the interest rate mode
             self.wallet_address,
         )
-        print("Building transaction from function call...")
-        transaction = function_call.buildTransaction(
-            {
-                "chainId": self.active_network.chain_id,
-                "from": self.wallet_address,
-                "nonce": nonce + 1 if approval_hash else nonce,
-            }
-        )
         print("Repaying...")
-        signed_txn = self.w3.eth.account.sign_transaction(
-            transaction, self.private_key
-        )
-        tx_hash = self.w3.eth.send_raw_transaction(signed_txn.rawTransaction)
-        receipt = self.process_transaction_receipt(tx_hash, repay_amount, repay_asset, "Repay",
-                                                   interest_rate_mode=rate_mode_str, approval_gas_cost=approval_gas)
-        print(f"Repaid {repay_amount} {repay_asset.symbol}  |  "
-              f"{self.get_user_data()[1]:.18f} ETH worth of debt remaining.")
-        return receipt
+        tx_hash = self._send_transaction(function_call, nonce, gas_key=self._gas_key(plan, approval))
+        self.allowances.spend(repay_asset.address, self.lending_pool_contract.address, amount_in_decimal_units,
+                              tx_hash)
+        return self._watch_trade(tx_hash, repay_amount, repay_asset, "Repay",
+                                 interest_rate_mode=rate_mode_str, approval=approval)
 
     def repay_percentage(self, repay_asset: ReserveToken, repay_percentage: float, nonce=None) -> AaveTrade:
         """
@@ -571,9 +993,9 @@ class AaveClient:
             raise ValueError("Cannot repay more than 100% of debts. Please pass a value between 0.0 and 1.0")
 
         # Calculate debt amount from outstanding debt percentage:
-        total_debt_in_eth = self.get_user_data()[1]
-        weth_to_repay_asset = self.get_asset_price(base_address=self.get_reserve_token("WETH").address,
-                                                   quote_address=repay_asset.address)
+        snapshot = self.snapshot(reserve_tokens=[self.get_reserve_token("WETH"), repay_asset])
+        total_debt_in_eth = snapshot.total_debt_eth
+        weth_to_repay_asset = snapshot.pair_price("WETH", repay_asset.symbol)
         repay_amount = weth_to_repay_asset * (total_debt_in_eth * repay_percentage)
 
         return self.repay(repay_asset, repay_amount, nonce)
@@ -590,7 +1012,7 @@ class AaveClient:
         json_abi = None
         err = None
         while retry_count < 5:
-            etherscan_response = requests.get(abi_endpoint).json()
+            etherscan_response = self.transport.get_json(abi_endpoint)
             if str(etherscan_response['status']) == '0':
                 err = etherscan_response['result']
                 retry_count += 1
@@ -611,30 +1033,66 @@ class AaveClient:
 
     def get_reserve_token(self, symbol: str) -> ReserveToken:
         """Returns the ReserveToken class containing the Aave reserve token with the passed symbol"""
-        try:
-            return [token for token in self.active_network.aave_tokens if token.symbol.lower() == symbol.lower()][0]
-        except IndexError:
+        token = self.reserve_index.by_symbol(symbol)
+        if token is None:
             raise ValueError(
                 f"Could not match '{symbol}' with a valid reserve token on aave for the {self.active_network.net_name} network.")
+        return token
+
+    def get_reserve_token_by_address(self, address: str, kind: str = None) -> ReserveToken:
+        """
+        Returns the ReserveToken that the passed underlying asset, aToken, stable debt token or variable debt token
+        address belongs to. Pass 'kind' to only match one type of address - see ReserveTokenIndex in ./models.py
+        """
+        token = self.reserve_index.by_address(address, kind)
+        if token is None:
+            raise ValueError(
+                f"Could not match '{address}' with a valid reserve token on aave for the {self.active_network.net_name} network.")
+        return token
 
     def fetch_reserve_tokens(self) -> list:
         """Returns all Aave ReserveToken class objects stored on the active network"""
         return self.active_network.aave_tokens
 
+    def refresh_reserve_tokens(self) -> list:
+        """Re-validates the stored reserve tokens against the data provider, fetching any newly listed reserves"""
+        self._store_reserve_tokens()
+        return self.active_network.aave_tokens
+
+    def _set_reserve_tokens(self, reserve_tokens: list[ReserveToken]) -> None:
+        """Replaces the active network's reserve tokens and swaps in a new ReserveTokenIndex in one assignment"""
+        reserve_index = ReserveTokenIndex(reserve_tokens)
+        self.active_network.aave_tokens = list(reserve_index.tokens)
+        self.reserve_index = reserve_index
+
     def _get_erc20_contract(self, token_address: str) -> web3.eth.Contract:
-        return self.w3.eth.contract(address=Web3.toChecksumAddress(token_address), abi=ABIReference.erc20_abi)
+        return self.contracts.contract(token_address, ABIReference.erc20_abi)
+
+    def _prepare_erc20_function(self, token_address: str, fn_name: str):
+        """Returns the cached PreparedFunction (see ./contracts.py) of an ERC20 token's read function"""
+        return self.contracts.function(token_address, ABIReference.erc20_abi, fn_name)
+
+    def _prepare_data_provider_function(self, fn_name: str):
+        """Returns the cached PreparedFunction (see ./contracts.py) of a protocol data provider read function"""
+        return self.contracts.function(self.active_network.protocol_data_provider,
+                                       ABIReference.protocol_data_provider, fn_name)
+
+    def _prepare_lending_pool_function(self, fn_name: str):
+        """Returns the cached PreparedFunction (see ./contracts.py) of a lending pool read function"""
+        return self.contracts.function(self.addresses.get("lending_pool"), ABIReference.lending_pool_abi, fn_name)
 
     def _initial_get_reserve_token(self, r_symbol: str, r_address: str) -> ReserveToken:
         """
         Builds the ReserveToken object by fetching data from the data provider contracts.
         Should only be used when initializing the active network's reserve token database. Otherwise, use get_reserve_token()
 
+        Used by self._fetch_reserve_tokens() when Multicall is not available.
+
         :param r_symbol: The symbol of the reserve token's underlying asset (e.g. USDC)
         :param r_address: The reserve token address
         """
         r_erc = self._get_erc20_contract(r_address)
         r_decimals = r_erc.functions.decimals().call()
-        print(f"Fetching Reserve Token: {r_symbol} ({r_decimals}) - {r_address}")
 
         # Build empty data structure to receive token mappings
         associated_tokens = {'aToken': {},
@@ -658,37 +1116,77 @@ class AaveClient:
 
     def _store_reserve_tokens(self) -> None:
         """
-        Only run once when the client is initialized.
-        Fetches and stores all reserve tokens and addresses for the set network.
-        Concurrency using a process pool and futures.
+        Run when the client is initialized, and by self.refresh_reserve_tokens().
+        Loads the reserve tokens for the set network from the on-disk reserve token cache, validated against the data
+        provider's current reserves list. Only reserves missing from the cache are fetched, then the cache is updated.
         """
+        start = time.time()
         reserves_tokens = self.data_provider_contract.functions.getAllReservesTokens().call()
 
-        print("Building reserve tokens mapping... Please wait - this may take up to 60 seconds")
-        # Run each multithread fetch to get realized token volatilities
-        start = time.time()
-        # output = []
-        # with concurrent.futures.ProcessPoolExecutor() as executor:
-        #     futures = [executor.submit(self._initial_get_reserve_token, symbol, address) for symbol, address in reserves_tokens]
-        # for f in concurrent.futures.as_completed(futures):
-        #     try:
-        #         # self.active_network.aave_tokens.append(f.result())
-        #         output.append(f.result())
-        #     except Exception as exc:
-        #         print("Could not store reserve token:", str(exc))
-        for symbol, address in reserves_tokens:
-            self.active_network.aave_tokens.append(self._initial_get_reserve_token(symbol, address))
+        cached_tokens = {token.address.lower(): token for token in self.reserve_token_cache.load()}
+        missing_reserves = [(symbol, address) for symbol, address in reserves_tokens
+                            if address.lower() not in cached_tokens]
+        if len(missing_reserves) > 0:
+            print(f"Fetching {len(missing_reserves)} reserve tokens missing from the reserve token cache...")
+            for token in self._fetch_reserve_tokens(missing_reserves):
+                cached_tokens[token.address.lower()] = token
+
+        reserve_tokens = [cached_tokens[address.lower()] for _, address in reserves_tokens
+                          if address.lower() in cached_tokens]
+        if len(missing_reserves) > 0 or len(reserve_tokens) != len(cached_tokens):
+            self.reserve_token_cache.save(reserve_tokens)
+        self._set_reserve_tokens(reserve_tokens)
 
         print(f"{len(self.active_network.aave_tokens)}/{len(reserves_tokens)} Reserve tokens stored for "
               f"{self.active_network.net_name} network in {(time.time() - start):.1f} seconds")
 
-    def get_all_reserve_balances(self, hide_empty_assets: bool = True):
+    def _fetch_reserve_tokens(self, reserves_tokens: list) -> list[ReserveToken]:
+        """
+        Builds the ReserveToken objects for the passed (symbol, address) reserves in two aggregated rounds:
+            1. decimals() and getReserveTokensAddresses() of every reserve
+            2. symbol() of every aToken, stable debt token and variable debt token
+        If Multicall is not available, each reserve is fetched with self._initial_get_reserve_token() in a thread pool.
+        """
+        if len(reserves_tokens) == 0:
+            return []
+
+        if not self.multicall.is_available():
+            with concurrent.futures.ThreadPoolExecutor(max_workers=min(16, len(reserves_tokens))) as executor:
+                return list(executor.map(lambda reserve: self._initial_get_reserve_token(*reserve), reserves_tokens))
+
+        get_reserve_tokens_addresses = self._prepare_data_provider_function("getReserveTokensAddresses")
+        reserve_calls = []
+        for _, address in reserves_tokens:
+            reserve_calls.append(self._prepare_erc20_function(address, "decimals")())
+            reserve_calls.append(get_reserve_tokens_addresses(Web3.toChecksumAddress(address)))
+        reserve_results = self.multicall.aggregate(reserve_calls)
+        reserves_decimals, reserves_token_addresses = reserve_results[0::2], reserve_results[1::2]
+
+        symbols = self.multicall.aggregate([self._prepare_erc20_function(token_address, "symbol")()
+                                            for token_addresses in reserves_token_addresses
+                                            for token_address in token_addresses])
+
+        output = []
+        for i, ((r_symbol, r_address), r_decimals, token_addresses) in enumerate(
+                zip(reserves_tokens, reserves_decimals, reserves_token_addresses)):
+            a_token_symbol, stable_debt_token_symbol, variable_debt_token_symbol = symbols[i * 3:i * 3 + 3]
+            output.append(ReserveToken(r_symbol, r_address, r_decimals,
+                                       aTokenAddress=token_addresses[0],
+                                       aTokenSymbol=a_token_symbol,
+                                       stableDebtTokenAddress=token_addresses[1],
+                                       stableDebtTokenSymbol=stable_debt_token_symbol,
+                                       variableDebtTokenAddress=token_addresses[2],
+                                       variableDebtTokenSymbol=variable_debt_token_symbol))
+        return output
+
+    def get_all_reserve_balances(self, hide_empty_assets: bool = True, include_prices: bool = False):
         """
         Get the current balance of each token type for each reserve token on Aave.
             - Supplied collateral amount
             - Stable debt amount
             - Variable debt amount
             - Current wallet balance of underlying asset
+            - Oracle price of the underlying asset in ETH (only if include_prices is True, fetched in one batch)
 
         :return: dict
             { # For each reserve token symbol:
@@ -697,6 +1195,7 @@ class AaveClient:
                 stable_debt: stable_debt_amt,
                 variable_debt: variable_debt_amt,
                 wallet_balance: current_wallet_balance
+                price_eth: underlying_asset_price_in_eth  # Only if include_prices is True
                 }
             }
         """
@@ -705,16 +1204,27 @@ class AaveClient:
         all_reserve_tokens = self.active_network.aave_tokens
 
         output = {token.symbol: {"collateral": 0, "stable_debt": 0, "variable_debt": 0, "wallet_balance": 0} for token in all_reserve_tokens}
+        if self.multicall.is_available():
+            # Aggregate the user reserve data and wallet balance reads for every reserve into as few calls as possible
+            get_user_reserve_data = self._prepare_data_provider_function("getUserReserveData")
+            calls = []
+            for token in all_reserve_tokens:
+                calls.append(get_user_reserve_data(Web3.toChecksumAddress(token.address), self.wallet_address))
+                calls.append(self._prepare_erc20_function(token.address, "balanceOf")(self.wallet_address))
+            results = self.multicall.aggregate(calls)
+            reserve_results = [(token, results[i * 2], results[i * 2 + 1]) for i, token in enumerate(all_reserve_tokens)]
+        else:
+            reserve_results = [(token, self.get_user_reserve_data(token),
+                                self._prepare_erc20_function(token.address, "balanceOf")(self.wallet_address).call())
+                               for token in all_reserve_tokens]
+
         # Check each reserve token for debts
-        for token in all_reserve_tokens:
-            a_token_balance, stable_debt, variable_debt, _, _, _, _, _, _ = self.get_user_reserve_data(token)
+        for token, user_reserve_data, user_bal in reserve_results:
+            a_token_balance, stable_debt, variable_debt, _, _, _, _, _, _ = user_reserve_data
 
             output[token.symbol]['collateral'] = a_token_balance
             output[token.symbol]["stable_debt"] = stable_debt
             output[token.symbol]["variable_debt"] = variable_debt
-
-            erc20_contract = token.get_erc20_contract(self.w3)
-            user_bal = erc20_contract.functions.balanceOf(self.wallet_address).call()
             output[token.symbol]["wallet_balance"] = user_bal
 
         if hide_empty_assets:
@@ -722,4 +1232,9 @@ class AaveClient:
                 if all(v == 0 for v in [balances[k] for k in output[list(output.keys())[0]].keys()]):
                     output.pop(token)
 
+        if include_prices:
+            prices = self.get_asset_prices([token for token in all_reserve_tokens if token.symbol in output])
+            for symbol, price in prices.items():
+                output[symbol]["price_eth"] = price
+
         return output
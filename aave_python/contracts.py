@@ -0,0 +1,132 @@
+from collections import OrderedDict
+import threading
+import weakref
+
+import web3.eth
+from eth_utils import function_abi_to_4byte_selector
+from web3 import Web3
+from web3._utils.abi import get_abi_input_types, get_abi_output_types, map_abi_data
+from web3._utils.normalizers import BASE_RETURN_NORMALIZERS
+
+
+"""------------------------------------------ PREPARED FUNCTION ENCODERS --------------------------------------------"""
+class PreparedFunction:
+    """
+    A contract function whose ABI lookup, selector and input/output types are resolved once, so that encoding a call
+    only runs the ABI codec. Calling the object with arguments returns a PreparedCall.
+    """
+    def __init__(self, w3: Web3, address: str, fn_abi: dict):
+        self.w3 = w3
+        self.address = address
+        self.abi = fn_abi
+        self.fn_name = fn_abi["name"]
+        self.selector = function_abi_to_4byte_selector(fn_abi)
+        self.input_types = get_abi_input_types(fn_abi)
+        self.output_types = get_abi_output_types(fn_abi)
+
+    def __call__(self, *args) -> "PreparedCall":
+        return PreparedCall(self, args)
+
+    def encode(self, *args) -> str:
+        """Returns the hex encoded calldata (selector + arguments) for the passed arguments"""
+        return Web3.toHex(self.selector + self.w3.codec.encode_abi(self.input_types, args))
+
+    def decode(self, return_data: bytes):
+        """Decodes raw return data the same way web3's ContractFunction.call() does"""
+        decoded = self.w3.codec.decode_abi(self.output_types, return_data)
+        normalized = map_abi_data(BASE_RETURN_NORMALIZERS, self.output_types, decoded)
+        return normalized[0] if len(normalized) == 1 else normalized
+
+
+class PreparedCall:
+    """
+    A PreparedFunction bound to its arguments. Exposes the same read interface as a web3 ContractFunction (address,
+    fn_name, abi, call() and _encode_transaction_data()), so it can be passed anywhere a ContractFunction is read,
+    including Multicall.aggregate().
+    """
+    def __init__(self, function: PreparedFunction, args: tuple):
+        self.function = function
+        self.args = args
+        self.address = function.address
+        self.fn_name = function.fn_name
+        self.abi = function.abi
+
+    def _encode_transaction_data(self) -> str:
+        return self.function.encode(*self.args)
+
+    def call(self, transaction: dict = None, block_identifier="latest"):
+        call_transaction = dict(transaction or {})
+        call_transaction.update({"to": self.address, "data": self._encode_transaction_data()})
+        return self.function.decode(self.function.w3.eth.call(call_transaction, block_identifier))
+
+
+"""--------------------------------------------- CONTRACT OBJECT CACHE ----------------------------------------------"""
+class ContractCache:
+    """
+    Bounded LRU cache of web3 Contract instances and PreparedFunction encoders for one Web3 instance.
+    Entries are keyed by (checksum address, ABI identity), where the ABI identity is the id() of the ABI list - the ABI
+    lists in ./abi.py are class attributes, so every use of the same ABI shares its entries.
+    """
+    def __init__(self, w3: Web3, maxsize: int = 256):
+        self.w3 = w3
+        self.maxsize = maxsize
+        self._contracts = OrderedDict()
+        self._functions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def contract(self, address: str, abi: list) -> web3.eth.Contract:
+        """Returns the cached Contract instance for the address and ABI (built on first use)"""
+        address = Web3.toChecksumAddress(address)
+        key = (address, id(abi))
+        with self._lock:
+            entry = self._contracts.get(key)
+            if entry is not None:
+                self._contracts.move_to_end(key)
+                return entry[0]
+
+        contract = self.w3.eth.contract(address=address, abi=abi)
+        with self._lock:
+            # The ABI is stored with the contract so its id() cannot be reused while the entry is cached
+            self._contracts[key] = (contract, abi)
+            self._evict(self._contracts)
+        return contract
+
+    def function(self, address: str, abi: list, fn_name: str) -> PreparedFunction:
+        """Returns the cached PreparedFunction encoder for the function 'fn_name' of the address and ABI"""
+        address = Web3.toChecksumAddress(address)
+        key = (address, id(abi), fn_name)
+        with self._lock:
+            entry = self._functions.get(key)
+            if entry is not None:
+                self._functions.move_to_end(key)
+                return entry[0]
+
+        fn_abis = [entry for entry in abi if entry.get("type") == "function" and entry.get("name") == fn_name]
+        if len(fn_abis) != 1:
+            raise ValueError(f"Could not prepare function '{fn_name}' - Found {len(fn_abis)} matching ABI entries")
+        function = PreparedFunction(self.w3, address, fn_abis[0])
+        with self._lock:
+            self._functions[key] = (function, abi)
+            self._evict(self._functions)
+        return function
+
+    def clear(self) -> None:
+        with self._lock:
+            self._contracts.clear()
+            self._functions.clear()
+
+    def _evict(self, entries: OrderedDict) -> None:
+        while len(entries) > self.maxsize:
+            entries.popitem(last=False)
+
+
+_contract_caches = weakref.WeakKeyDictionary()
+_contract_caches_lock = threading.Lock()
+
+
+def get_contract_cache(w3: Web3) -> ContractCache:
+    """Returns the shared ContractCache of a Web3 instance"""
+    with _contract_caches_lock:
+        if w3 not in _contract_caches:
+            _contract_caches[w3] = ContractCache(w3)
+        return _contract_caches[w3]
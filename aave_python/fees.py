@@ -0,0 +1,144 @@
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Mapping
+import statistics
+import threading
+import time
+
+from web3 import Web3
+
+
+@dataclass(frozen=True)
+class FeeTier:
+    """A named transaction speed: which priority fee percentile to pay and how much base fee growth to allow"""
+    reward_percentile: float  # Percentile of the recent blocks' priority fees paid as the priority fee
+    base_fee_multiplier: float  # maxFeePerGas = next base fee * multiplier + priority fee
+    timeout: int  # Seconds to wait for the receipt
+
+
+# The base fee can grow by 12.5% per block, so a 2x multiplier keeps a "fast" transaction valid for ~6 full blocks
+SPEED_TIERS = MappingProxyType({
+    "fast": FeeTier(reward_percentile=90, base_fee_multiplier=2.0, timeout=60),  # Mined within 60 seconds
+    "medium": FeeTier(reward_percentile=50, base_fee_multiplier=1.5, timeout=60 * 5),  # Mined within 5 minutes
+    "slow": FeeTier(reward_percentile=25, base_fee_multiplier=1.25, timeout=60 * 60),  # Mined within 1 hour
+    "glacial": FeeTier(reward_percentile=10, base_fee_multiplier=1.125, timeout=60 * 1440),  # Mined within 24 hours
+})
+
+
+"""--------------------------------------------- Cached Fee Market View ---------------------------------------------"""
+@dataclass(frozen=True)
+class FeeView:
+    """
+    The fee market at one block, as summarized from eth_feeHistory. On networks without EIP-1559, base_fee_per_gas is
+    None and 'gas_price' holds the node's legacy gas price suggestion.
+    """
+    block_number: int
+    base_fee_per_gas: int  # Base fee of the next block (wei)
+    priority_fees: Mapping[str, int]  # Speed tier -> suggested maxPriorityFeePerGas (wei)
+    gas_price: int = None
+    fetched_at: float = 0  # time.monotonic() of the fetch
+
+    def transaction_fees(self, speed: str) -> dict:
+        """Returns the fee fields of a transaction for the speed tier (type-2 fields, or gasPrice on legacy networks)"""
+        if self.base_fee_per_gas is None:
+            return {"gasPrice": self.gas_price}
+        priority_fee = self.priority_fees[speed]
+        return {"maxFeePerGas": int(self.base_fee_per_gas * SPEED_TIERS[speed].base_fee_multiplier) + priority_fee,
+                "maxPriorityFeePerGas": priority_fee}
+
+
+"""------------------------------------------- EIP-1559 FEE ESTIMATOR -----------------------------------------------"""
+class FeeEstimator:
+    """
+    Estimates EIP-1559 (type-2) transaction fees from a single eth_feeHistory request, which returns the next block's
+    base fee and the priority fee percentiles of every speed tier over the last 'history_blocks' blocks at once.
+
+    The resulting FeeView is cached for 'cache_ttl' seconds, so transactions built in quick succession share one
+    request. Networks without eth_feeHistory fall back to legacy eth_gasPrice transactions, any other error is raised.
+    """
+    MIN_PRIORITY_FEE = Web3.toWei(0.01, "gwei")
+    # Error messages of nodes that do not implement eth_feeHistory (JSON-RPC code -32601 is "method not found")
+    UNSUPPORTED_ERRORS = ("-32601", "does not exist", "method not found", "not supported", "unsupported", "not available")
+
+    def __init__(self, w3: Web3, speed: str = "medium", history_blocks: int = 10, cache_ttl: float = 6.0):
+        if speed.lower() not in SPEED_TIERS:
+            raise ValueError("Invalid gas strategy. Available gas strategies are 'fast', 'medium', 'slow', or 'glacial'")
+        self.w3 = w3
+        self.speed = speed.lower()
+        self.history_blocks = history_blocks
+        self.cache_ttl = cache_ttl
+        self._view = None
+        self._lock = threading.Lock()
+
+    @property
+    def timeout(self) -> int:
+        return SPEED_TIERS[self.speed].timeout
+
+    def transaction_fees(self, speed: str = None) -> dict:
+        """Returns the fee fields to add to a transaction for the speed tier (defaults to self.speed)"""
+        return self.fee_view().transaction_fees(speed.lower() if speed is not None else self.speed)
+
+    def fee_view(self) -> FeeView:
+        """Returns the cached FeeView, refreshed with one eth_feeHistory request once it is older than cache_ttl"""
+        with self._lock:
+            if self._view is not None and time.monotonic() - self._view.fetched_at < self.cache_ttl:
+                return self._view
+            try:
+                fee_history = self.w3.eth.fee_history(self.history_blocks, "latest", self._reward_percentiles())
+                self._view = self.view_from_fee_history(fee_history)
+            except Exception as exc:
+                if not self._is_unsupported(exc):
+                    raise
+                self._view = FeeView(block_number=self.w3.eth.block_number, base_fee_per_gas=None, priority_fees={},
+                                     gas_price=self.w3.eth.gas_price, fetched_at=time.monotonic())
+            return self._view
+
+    async def fee_view_async(self) -> FeeView:
+        """Same as self.fee_view() for a Web3 instance using AsyncEth"""
+        if self._view is not None and time.monotonic() - self._view.fetched_at < self.cache_ttl:
+            return self._view
+        try:
+            fee_history = await self.w3.eth.fee_history(self.history_blocks, "latest", self._reward_percentiles())
+            self._view = self.view_from_fee_history(fee_history)
+        except Exception as exc:
+            if not self._is_unsupported(exc):
+                raise
+            self._view = FeeView(block_number=await self.w3.eth.block_number, base_fee_per_gas=None, priority_fees={},
+                                 gas_price=await self.w3.eth.gas_price, fetched_at=time.monotonic())
+        return self._view
+
+    def invalidate(self) -> None:
+        """Drops the cached FeeView (e.g. after a transaction was rejected as underpriced)"""
+        with self._lock:
+            self._view = None
+
+    @staticmethod
+    def _reward_percentiles() -> list:
+        """The reward percentiles of every tier, in the ascending order nodes require"""
+        return sorted({tier.reward_percentile for tier in SPEED_TIERS.values()})
+
+    @classmethod
+    def _is_unsupported(cls, exc: Exception) -> bool:
+        """Whether the error means the node does not implement eth_feeHistory"""
+        message = str(exc).lower()
+        return any(pattern in message for pattern in cls.UNSUPPORTED_ERRORS)
+
+    @classmethod
+    def view_from_fee_history(cls, fee_history: dict) -> FeeView:
+        """
+        Builds a FeeView from an eth_feeHistory response requested with self._reward_percentiles(). The priority fee
+        of each tier is the median of its percentile over the non-empty blocks.
+        """
+        rewards = [block_rewards for block_rewards, gas_used_ratio in zip(fee_history["reward"],
+                                                                          fee_history["gasUsedRatio"])
+                   if gas_used_ratio > 0] or fee_history["reward"]
+        columns = {percentile: i for i, percentile in enumerate(cls._reward_percentiles())}
+        priority_fees = {}
+        for speed, tier in SPEED_TIERS.items():
+            fees = [block_rewards[columns[tier.reward_percentile]] for block_rewards in rewards]
+            priority_fees[speed] = max(cls.MIN_PRIORITY_FEE, int(statistics.median(fees)) if fees else 0)
+
+        return FeeView(block_number=fee_history["oldestBlock"] + len(fee_history["gasUsedRatio"]) - 1,
+                       base_fee_per_gas=fee_history["baseFeePerGas"][-1],
+                       priority_fees=MappingProxyType(priority_fees),
+                       fetched_at=time.monotonic())
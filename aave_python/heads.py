@@ -0,0 +1,178 @@
+from dataclasses import dataclass
+import asyncio
+import json
+import threading
+import time
+
+from hexbytes import HexBytes
+from web3 import Web3
+
+
+@dataclass(frozen=True)
+class BlockHead:
+    """The latest block seen by a HeadTracker"""
+    number: int
+    hash: str
+    timestamp: int
+    received_at: float  # time.monotonic() when the head was received
+
+
+"""-------------------------------------------------- HEAD TRACKER --------------------------------------------------"""
+class HeadTracker:
+    """
+    Follows the chain head from a background thread, so the rest of the client knows the latest block without asking
+    the node, and block-scoped caches can drop their entries when a new block arrives instead of on timers.
+
+    - With a 'subscription_url' (ws://, wss:// or the path of a node's IPC socket), new heads are pushed by an
+      eth_subscribe("newHeads") subscription.
+    - Without one, or while the subscription is down, the latest block is polled every 'poll_interval' seconds. A
+      dropped subscription is reconnected after 'reconnect_delay' seconds.
+
+    Callbacks registered with on_new_head() run on the tracker thread with each new BlockHead (including a head that
+    replaces the previous one at the same height after a reorg), so they should only do cheap work like invalidation.
+    """
+    def __init__(self, w3: Web3, subscription_url: str = None, poll_interval: float = 1.0,
+                 reconnect_delay: float = 5.0, stale_timeout: float = 60.0):
+        """
+        Parameters:
+            subscription_url: WebSocket URL or IPC path of a node of the same network - polling only if None
+
+            poll_interval: Seconds between latest block requests while polling
+
+            reconnect_delay: Seconds to poll before reconnecting a dropped subscription
+
+            stale_timeout: Seconds without a new head after which the subscription is considered dropped
+        """
+        self.w3 = w3
+        self.subscription_url = subscription_url
+        self.poll_interval = poll_interval
+        self.reconnect_delay = reconnect_delay
+        self.stale_timeout = stale_timeout
+        self.mode = None  # "subscription" or "polling" while running
+
+        self._head = None
+        self._callbacks = []
+        self._condition = threading.Condition()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def head(self) -> BlockHead:
+        """The latest BlockHead received (None until the first head arrives)"""
+        with self._condition:
+            return self._head
+
+    @property
+    def block_number(self) -> int:
+        """The latest block number, from the tracked head if the tracker is running, otherwise from the node"""
+        head = self.head
+        if head is not None and self.running:
+            return head.number
+        return self.w3.eth.block_number
+
+    def on_new_head(self, callback) -> None:
+        """Registers a callable run with every new BlockHead"""
+        self._callbacks.append(callback)
+
+    def start(self) -> "HeadTracker":
+        """Starts following the chain head (no-op if already running)"""
+        if not self.running:
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._run, name="aave-head-tracker", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    def wait_for_block(self, block_number: int, timeout: float = None) -> BlockHead:
+        """
+        Blocks until a head at or above 'block_number' arrives (the tracker must be running).
+
+        Returns:
+            The BlockHead, or None if the timeout passed first
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self._head is not None and self._head.number >= block_number, timeout)
+            return self._head if self._head is not None and self._head.number >= block_number else None
+
+    def _set_head(self, number: int, block_hash, timestamp: int) -> None:
+        head = BlockHead(number=number, hash=Web3.toHex(HexBytes(block_hash)), timestamp=timestamp,
+                         received_at=time.monotonic())
+        with self._condition:
+            if self._head is not None and (head.hash == self._head.hash or head.number < self._head.number):
+                return
+            self._head = head
+            self._condition.notify_all()
+        for callback in list(self._callbacks):
+            try:
+                callback(head)
+            except Exception as exc:
+                print(f"New head callback failed - Error: {exc}")
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            if self.subscription_url is not None:
+                self.mode = "subscription"
+                try:
+                    asyncio.run(self._subscribe())
+                except Exception as exc:
+                    print(f"newHeads subscription to {self.subscription_url} dropped - polling for "
+                          f"{self.reconnect_delay} seconds - Error: {exc}")
+                if self._stopped.is_set():
+                    break
+            self.mode = "polling"
+            self._poll(self.reconnect_delay if self.subscription_url is not None else None)
+        self.mode = None
+
+    def _poll(self, duration: float = None) -> None:
+        """Polls the latest block until stopped, or for 'duration' seconds"""
+        deadline = None if duration is None else time.monotonic() + duration
+        while not self._stopped.is_set() and (deadline is None or time.monotonic() < deadline):
+            try:
+                block = self.w3.eth.get_block("latest")
+                self._set_head(block["number"], block["hash"], block["timestamp"])
+            except Exception as exc:
+                print(f"Head tracker poll failed - Error: {exc}")
+            self._stopped.wait(self.poll_interval)
+
+    async def _subscribe(self) -> None:
+        request = json.dumps({"jsonrpc": "2.0", "id": 1, "method": "eth_subscribe", "params": ["newHeads"]})
+        if self.subscription_url.startswith(("ws://", "wss://")):
+            import websockets
+            async with websockets.connect(self.subscription_url, max_size=2 ** 24) as websocket:
+                await websocket.send(request)
+                while not self._stopped.is_set():
+                    self._handle_message(json.loads(await asyncio.wait_for(websocket.recv(), self.stale_timeout)))
+        else:
+            reader, writer = await asyncio.open_unix_connection(self.subscription_url, limit=2 ** 24)
+            try:
+                writer.write(request.encode())
+                await writer.drain()
+                decoder, buffer = json.JSONDecoder(), ""
+                while not self._stopped.is_set():
+                    chunk = await asyncio.wait_for(reader.read(65536), self.stale_timeout)
+                    if not chunk:
+                        raise ConnectionError("IPC connection closed by the node")
+                    buffer += chunk.decode()
+                    while buffer.strip():  # IPC messages are concatenated JSON objects
+                        try:
+                            message, end = decoder.raw_decode(buffer.lstrip())
+                        except json.JSONDecodeError:
+                            break
+                        buffer = buffer.lstrip()[end:]
+                        self._handle_message(message)
+            finally:
+                writer.close()
+
+    def _handle_message(self, message: dict) -> None:
+        if "error" in message:
+            raise ConnectionError(f"eth_subscribe failed: {message['error']}")
+        if message.get("method") != "eth_subscription":
+            return  # The subscription id reply
+        head = message["params"]["result"]
+        self._set_head(int(head["number"], 16), head["hash"], int(head["timestamp"], 16))
@@ -0,0 +1,78 @@
+from collections import deque
+import threading
+
+import numpy as np
+
+
+"""------------------------------------------------- HEDGE POLICY ---------------------------------------------------"""
+class HedgePolicy:
+    """
+    Decides when an idempotent read is sent a second time to another endpoint (a "hedged" request):
+        - The hedge delay of a method is the 'percentile' of its recent response times, so only the slowest
+          (100 - percentile)% of the reads are hedged. Until 'min_samples' responses were seen, 'default_delay' is used.
+        - A token bucket caps the hedges to 'budget' times the number of reads (e.g. 0.05 = at most 5% extra requests),
+          with bursts of up to 'max_burst' hedges.
+    """
+    # Reads that return the same result wherever they are sent (transactions and nonce reads are never hedged)
+    HEDGED_METHODS = frozenset({"eth_call", "eth_getBalance", "eth_getCode", "eth_getStorageAt", "eth_blockNumber",
+                                "eth_chainId", "eth_getBlockByNumber", "eth_getBlockByHash", "eth_getLogs",
+                                "eth_getTransactionReceipt", "eth_getTransactionByHash", "eth_feeHistory",
+                                "eth_gasPrice"})
+
+    def __init__(self, percentile: float = 95, budget: float = 0.05, max_burst: float = 10,
+                 default_delay: float = 0.5, min_delay: float = 0.01, window: int = 256, min_samples: int = 20):
+        if not 0 < percentile < 100:
+            raise ValueError("The hedge percentile must be between 0 and 100")
+        self.percentile = percentile
+        self.budget = budget
+        self.max_burst = max_burst
+        self.default_delay = default_delay
+        self.min_delay = min_delay
+        self.window = window
+        self.min_samples = min_samples
+
+        self.requests = 0
+        self.hedges = 0
+        self.hedge_wins = 0  # Hedged requests that answered before the original request
+        self._tokens = max_burst
+        self._latencies = {}  # Method -> deque of recent response times (seconds)
+        self._lock = threading.Lock()
+
+    def delay(self, method: str) -> float:
+        """Seconds to wait for a read before hedging it"""
+        with self._lock:
+            latencies = self._latencies.get(method)
+            if latencies is None or len(latencies) < self.min_samples:
+                return self.default_delay
+            return max(self.min_delay, float(np.percentile(latencies, self.percentile)))
+
+    def record(self, method: str, latency: float) -> None:
+        """Records the response time of a read"""
+        with self._lock:
+            self._latencies.setdefault(method, deque(maxlen=self.window)).append(latency)
+
+    def start_request(self) -> None:
+        """Counts a hedgeable read, adding 'budget' tokens to the bucket"""
+        with self._lock:
+            self.requests += 1
+            self._tokens = min(self.max_burst, self._tokens + self.budget)
+
+    def try_hedge(self) -> bool:
+        """Takes a token from the bucket - Returns False if the hedge budget is spent"""
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            self.hedges += 1
+            return True
+
+    def record_hedge_win(self) -> None:
+        with self._lock:
+            self.hedge_wins += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"requests": self.requests, "hedges": self.hedges, "hedge_wins": self.hedge_wins,
+                    "hedge_rate": self.hedges / self.requests if self.requests else 0.0,
+                    "delays": {method: float(np.percentile(latencies, self.percentile))
+                               for method, latencies in self._latencies.items() if len(latencies) >= self.min_samples}}
@@ -0,0 +1,197 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+from .token_cache import ReserveTokenCache
+
+
+"""------------------------------------------ ON-DISK HISTORICAL CALL CACHE -----------------------------------------"""
+class HistoricalCallCache:
+    """
+    Persistent cache of eth_call results at explicit past block numbers, for backtests that read the same historical
+    blocks over and over. The results of a block that is at least 'finality_depth' blocks deep never change, so they
+    are stored on disk and answered without a request the next time, across runs.
+
+    - Results are stored zlib-compressed in a SQLite database per chain, content-addressed by (block number, to,
+      sha256 of the calldata).
+    - Once the database holds more than 'max_bytes' of results, the least recently used ones are evicted down to 90% of
+      the cap. Hits do not write to the database: their last use times are kept in memory and written in batches of
+      TOUCH_BATCH_SIZE (and before evicting or closing).
+    - Reads at "latest", "pending", non-final blocks and failed reads are passed through untouched.
+    """
+    VERSION = 1
+    TOUCH_BATCH_SIZE = 256
+
+    def __init__(self, chain_id: int, cache_dir: str = None, max_bytes: int = 512 * 1024 ** 2,
+                 finality_depth: int = 64, heads=None, compression_level: int = 6):
+        """
+        Parameters:
+            cache_dir: The directory of the database - defaults to ReserveTokenCache.default_cache_dir()
+
+            max_bytes: Size cap of the stored (compressed) results
+
+            finality_depth: How many blocks deep a block must be for its results to be stored
+
+            heads: Optional running HeadTracker used to know the chain head without eth_blockNumber requests
+        """
+        self.chain_id = chain_id
+        self.cache_dir = cache_dir if cache_dir is not None else ReserveTokenCache.default_cache_dir()
+        self.path = os.path.join(self.cache_dir, f"eth_call_history_{chain_id}_v{self.VERSION}.sqlite")
+        self.max_bytes = max_bytes
+        self.finality_depth = finality_depth
+        self.heads = heads
+        self.compression_level = compression_level
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._final_block = -1
+        self._final_block_checked_at = 0
+        self._touched = {}  # Key -> last use time of the hits not yet written to the database
+        self._lock = threading.Lock()
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.db = sqlite3.connect(self.path, check_same_thread=False)
+        with self.db:
+            self.db.execute("PRAGMA journal_mode=WAL")
+            # A crash can lose the last transactions but not corrupt the database in WAL mode - fine for a cache
+            self.db.execute("PRAGMA synchronous=NORMAL")
+            self.db.execute("""
+                CREATE TABLE IF NOT EXISTS results (
+                    block_number INTEGER NOT NULL,
+                    to_address TEXT NOT NULL,
+                    calldata_hash BLOB NOT NULL,
+                    result BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    last_used REAL NOT NULL,
+                    PRIMARY KEY (block_number, to_address, calldata_hash)
+                )""")
+            self.db.execute("CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used)")
+        self._size = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+
+    @property
+    def size(self) -> int:
+        """Bytes of stored (compressed) results"""
+        return self._size
+
+    @staticmethod
+    def _key(block_number: int, to_address: str, calldata: str) -> tuple:
+        return block_number, to_address.lower(), hashlib.sha256(bytes.fromhex(calldata[2:])).digest()
+
+    def get(self, block_number: int, to_address: str, calldata: str):
+        """Returns the stored result (hex string) of the call, or None"""
+        key = self._key(block_number, to_address, calldata)
+        with self._lock:
+            row = self.db.execute("SELECT result FROM results WHERE block_number = ? AND to_address = ? "
+                                  "AND calldata_hash = ?", key).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._touched[key] = time.time()
+            if len(self._touched) >= self.TOUCH_BATCH_SIZE:
+                self._flush_touched()
+        return zlib.decompress(row[0]).decode()
+
+    def _flush_touched(self) -> None:
+        """Writes the last use times of the recent hits to the database"""
+        if self._touched:
+            with self.db:
+                self.db.executemany("UPDATE results SET last_used = ? WHERE block_number = ? AND to_address = ? "
+                                    "AND calldata_hash = ?",
+                                    [(last_used, *key) for key, last_used in self._touched.items()])
+            self._touched = {}
+
+    def put(self, block_number: int, to_address: str, calldata: str, result: str) -> None:
+        """Stores the result (hex string) of a call at a final block"""
+        key = self._key(block_number, to_address, calldata)
+        compressed = zlib.compress(result.encode(), self.compression_level)
+        with self._lock:
+            with self.db:
+                previous = self.db.execute("SELECT size FROM results WHERE block_number = ? AND to_address = ? "
+                                           "AND calldata_hash = ?", key).fetchone()
+                self.db.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)",
+                                (*key, compressed, len(compressed), time.time()))
+            self._touched.pop(key, None)
+            self._size += len(compressed) - (previous[0] if previous is not None else 0)
+            if self._size > self.max_bytes:
+                self._evict(int(self.max_bytes * 0.9))
+
+    def _evict(self, target_bytes: int) -> None:
+        """Deletes the least recently used results until at most 'target_bytes' are stored"""
+        self._flush_touched()
+        with self.db:
+            # Deletes the oldest rows for as long as the bytes freed by the older ones are short of the excess
+            evicted = self.db.execute("""
+                DELETE FROM results WHERE rowid IN (
+                    SELECT rowid FROM (
+                        SELECT rowid, SUM(size) OVER (ORDER BY last_used, rowid) - size AS freed_before FROM results
+                    ) WHERE freed_before < ?
+                )""", (self._size - target_bytes,)).rowcount
+        self._size = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        self.evictions += evicted
+
+    def clear(self) -> None:
+        """Deletes every stored result"""
+        with self._lock:
+            with self.db:
+                self.db.execute("DELETE FROM results")
+            self._size = 0
+            self._touched = {}
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush_touched()
+            self.db.close()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "size_bytes": self._size,
+                    "entries": self.db.execute("SELECT COUNT(*) FROM results").fetchone()[0],
+                    "hit_rate": self.hits / lookups if lookups else 0.0}
+
+    def is_final(self, block_number: int, make_request) -> bool:
+        """
+        Whether the block is at least 'finality_depth' blocks deep. The chain head is read from the HeadTracker if it
+        is running, otherwise with eth_blockNumber at most once per 12 seconds (about one block).
+        """
+        if block_number <= self._final_block:
+            return True
+        if self.heads is not None and self.heads.running and self.heads.head is not None:
+            self._final_block = self.heads.head.number - self.finality_depth
+        elif time.monotonic() - self._final_block_checked_at >= 12:
+            response = make_request("eth_blockNumber", [])
+            if "result" in response:
+                self._final_block = int(response["result"], 16) - self.finality_depth
+                self._final_block_checked_at = time.monotonic()
+        return block_number <= self._final_block
+
+    def middleware(self, make_request, w3):
+        """web3 middleware answering eth_call requests at final block numbers from the disk cache"""
+        def middleware(method, params):
+            if method != "eth_call" or len(params) < 2:
+                return make_request(method, params)
+            transaction, block_identifier = params[0], params[1]
+            if isinstance(block_identifier, str) and block_identifier.startswith("0x") and len(block_identifier) < 66:
+                block_number = int(block_identifier, 16)
+            elif isinstance(block_identifier, int):
+                block_number = block_identifier
+            else:
+                return make_request(method, params)
+            to_address, calldata = transaction.get("to"), transaction.get("data")
+            if not isinstance(to_address, str) or not isinstance(calldata, str) or "from" in transaction \
+                    or not self.is_final(block_number, make_request):
+                return make_request(method, params)
+
+            result = self.get(block_number, to_address, calldata)
+            if result is not None:
+                return {"jsonrpc": "2.0", "id": 0, "result": result}
+            response = make_request(method, params)
+            if "error" not in response and isinstance(response.get("result"), str):
+                self.put(block_number, to_address, calldata, response["result"])
+            return response
+        return middleware
@@ -0,0 +1,235 @@
+import json
+import sqlite3
+import time
+
+from .abi import ABIReference
+from .multicall import is_batch_size_error
+
+from hexbytes import HexBytes
+from web3 import Web3
+from web3._utils.events import event_abi_to_log_topic
+
+
+"""------------------------------------------ LENDING POOL EVENT INDEXER --------------------------------------------"""
+class LendingPoolIndexer:
+    """
+    Streams the LendingPool events below with eth_getLogs and stores the decoded rows in a local SQLite database.
+
+    - Block ranges are adaptive: a range is halved when the provider rejects it (too many results or too wide a range)
+      and doubled while responses stay sparse. Other errors (timeouts, rate limits, connection resets) are raised.
+    - Only blocks at least 'confirmations' deep are indexed. Every chunk is committed together with a checkpoint, so an
+      interrupted run resumes where it stopped.
+    - If a stored checkpoint is no longer on the canonical chain (a reorg deeper than 'confirmations'), the indexer
+      rolls back to the newest checkpoint that still matches the chain and re-indexes from there.
+
+    Usage:
+        indexer = aave_client.get_event_indexer("aave_events.db", start_block=11362579)
+        indexer.run()
+        borrowers = indexer.accounts(event="Borrow")
+    """
+    EVENTS = ("Deposit", "Withdraw", "Borrow", "Repay", "LiquidationCall", "Swap", "ReserveDataUpdated")
+    # Event -> (reserve argument, account argument) stored in their own indexed columns
+    COLUMN_ARGS = {
+        "Deposit": ("reserve", "onBehalfOf"),
+        "Withdraw": ("reserve", "user"),
+        "Borrow": ("reserve", "onBehalfOf"),
+        "Repay": ("reserve", "user"),
+        "LiquidationCall": ("collateralAsset", "user"),
+        "Swap": ("reserve", "user"),
+        "ReserveDataUpdated": ("reserve", None),
+    }
+    CHECKPOINT_HISTORY = 64  # Number of past checkpoints kept to find a common ancestor after a reorg
+    # eth_getLogs error messages of providers capping the results or the block range of one request
+    LOG_LIMIT_ERRORS = ("query returned more than", "block range", "limit exceeded", "too many logs",
+                        "too many results")
+
+    def __init__(self, w3: Web3, lending_pool_address: str, database_path: str = "aave_events.db",
+                 start_block: int = 0, confirmations: int = 12, initial_chunk_size: int = 2000,
+                 min_chunk_size: int = 1, max_chunk_size: int = 100000, target_logs_per_chunk: int = 2000):
+        self.w3 = w3
+        self.lending_pool_address = Web3.toChecksumAddress(lending_pool_address)
+        self.start_block = start_block
+        self.confirmations = confirmations
+        self.chunk_size = initial_chunk_size
+        self.min_chunk_size = min_chunk_size
+        self.max_chunk_size = max_chunk_size
+        self.target_logs_per_chunk = target_logs_per_chunk
+
+        self.lending_pool_contract = self.w3.eth.contract(address=self.lending_pool_address,
+                                                          abi=ABIReference.lending_pool_abi)
+        self._event_topics = {}
+        for event_abi in ABIReference.lending_pool_abi:
+            if event_abi["type"] == "event" and event_abi["name"] in self.EVENTS:
+                self._event_topics[Web3.toHex(event_abi_to_log_topic(event_abi))] = event_abi["name"]
+
+        self.db = sqlite3.connect(database_path)
+        self.db.row_factory = sqlite3.Row
+        self._create_tables()
+
+    def _create_tables(self) -> None:
+        with self.db:
+            self.db.execute("""
+                CREATE TABLE IF NOT EXISTS events (
+                    block_number INTEGER NOT NULL,
+                    block_hash TEXT NOT NULL,
+                    transaction_hash TEXT NOT NULL,
+                    log_index INTEGER NOT NULL,
+                    event TEXT NOT NULL,
+                    reserve TEXT,
+                    account TEXT,
+                    args TEXT NOT NULL,
+                    PRIMARY KEY (transaction_hash, log_index)
+                )""")
+            self.db.execute("CREATE INDEX IF NOT EXISTS events_block ON events (block_number)")
+            self.db.execute("CREATE INDEX IF NOT EXISTS events_account ON events (account, event)")
+            self.db.execute("CREATE INDEX IF NOT EXISTS events_reserve ON events (reserve, event)")
+            self.db.execute("""
+                CREATE TABLE IF NOT EXISTS checkpoints (
+                    lending_pool TEXT NOT NULL,
+                    block_number INTEGER NOT NULL,
+                    block_hash TEXT NOT NULL,
+                    PRIMARY KEY (lending_pool, block_number)
+                )""")
+
+    @property
+    def checkpoint(self) -> int:
+        """The last fully indexed block number (start_block - 1 if nothing has been indexed yet)"""
+        row = self.db.execute("SELECT MAX(block_number) FROM checkpoints WHERE lending_pool = ?",
+                              (self.lending_pool_address,)).fetchone()
+        return row[0] if row[0] is not None else self.start_block - 1
+
+    def run(self, to_block: int = None) -> int:
+        """
+        Indexes every event from the last checkpoint up to 'to_block' (defaults to the latest block minus the
+        confirmation depth).
+
+        Returns:
+            The number of events stored
+        """
+        self._rollback_reorged_blocks()
+        safe_block = self.w3.eth.block_number - self.confirmations
+        to_block = safe_block if to_block is None else min(to_block, safe_block)
+
+        stored = 0
+        from_block = self.checkpoint + 1
+        while from_block <= to_block:
+            chunk_end = min(from_block + self.chunk_size - 1, to_block)
+            try:
+                logs = self._get_logs(from_block, chunk_end)
+            except Exception as exc:
+                if not self.is_log_limit_error(exc):
+                    raise
+                if self.chunk_size <= self.min_chunk_size:
+                    raise Exception(f"Could not fetch LendingPool logs for blocks {from_block}-{chunk_end} - "
+                                    f"Error: {exc}")
+                self.chunk_size = max(self.min_chunk_size, self.chunk_size // 2)
+                continue
+
+            self._store_chunk(logs, chunk_end)
+            stored += len(logs)
+
+            # Grow the block range while responses are sparse, shrink it when they are dense
+            if len(logs) < self.target_logs_per_chunk // 4:
+                self.chunk_size = min(self.max_chunk_size, self.chunk_size * 2)
+            elif len(logs) > self.target_logs_per_chunk:
+                self.chunk_size = max(self.min_chunk_size, self.chunk_size // 2)
+            from_block = chunk_end + 1
+        return stored
+
+    @classmethod
+    def is_log_limit_error(cls, exc: Exception) -> bool:
+        """Whether an eth_getLogs request failed because of the size of its block range, so a smaller one may succeed"""
+        message = str(exc).lower()
+        return any(pattern in message for pattern in cls.LOG_LIMIT_ERRORS) or is_batch_size_error(exc)
+
+    def run_forever(self, poll_interval: float = 15) -> None:
+        """Keeps indexing new confirmed blocks every 'poll_interval' seconds"""
+        while True:
+            self.run()
+            time.sleep(poll_interval)
+
+    def events(self, event: str = None, account: str = None, reserve: str = None,
+               from_block: int = None, to_block: int = None) -> list[dict]:
+        """
+        Returns the stored events (oldest first) matching every passed filter.
+        Each event is a dict with the block number, block hash, transaction hash, log index, event name, reserve,
+        account and the decoded event 'args' dict.
+        """
+        query, params = "SELECT * FROM events WHERE 1 = 1", []
+        for column, value in (("event", event), ("account", account), ("reserve", reserve)):
+            if value is not None:
+                query += f" AND {column} = ?"
+                params.append(Web3.toChecksumAddress(value) if column != "event" else value)
+        if from_block is not None:
+            query += " AND block_number >= ?"
+            params.append(from_block)
+        if to_block is not None:
+            query += " AND block_number <= ?"
+            params.append(to_block)
+        query += " ORDER BY block_number, log_index"
+
+        return [dict(row, args=json.loads(row["args"])) for row in self.db.execute(query, params)]
+
+    def accounts(self, event: str = None) -> list[str]:
+        """Returns every distinct account address seen in the stored events (optionally for one event type)"""
+        query, params = "SELECT DISTINCT account FROM events WHERE account IS NOT NULL", []
+        if event is not None:
+            query += " AND event = ?"
+            params.append(event)
+        return [row[0] for row in self.db.execute(query, params)]
+
+    def close(self) -> None:
+        self.db.close()
+
+    def _get_logs(self, from_block: int, to_block: int) -> list:
+        return self.w3.eth.get_logs({
+            "address": self.lending_pool_address,
+            "fromBlock": from_block,
+            "toBlock": to_block,
+            "topics": [list(self._event_topics.keys())],
+        })
+
+    def _store_chunk(self, logs: list, chunk_end: int) -> None:
+        """Stores the decoded logs and the new checkpoint in one SQLite transaction"""
+        rows = []
+        for log in logs:
+            event_name = self._event_topics.get(Web3.toHex(log["topics"][0]))
+            if event_name is None:
+                continue
+            args = dict(getattr(self.lending_pool_contract.events, event_name)().processLog(log)["args"])
+            reserve_arg, account_arg = self.COLUMN_ARGS[event_name]
+            rows.append((log["blockNumber"], Web3.toHex(log["blockHash"]), Web3.toHex(log["transactionHash"]),
+                         log["logIndex"], event_name, args.get(reserve_arg),
+                         args.get(account_arg) if account_arg is not None else None,
+                         json.dumps(args, default=lambda value: Web3.toHex(value) if isinstance(value, (bytes, HexBytes))
+                                    else str(value))))
+
+        chunk_end_hash = Web3.toHex(self.w3.eth.get_block(chunk_end)["hash"])
+        with self.db:
+            self.db.executemany("INSERT OR REPLACE INTO events VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            self.db.execute("INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?)",
+                            (self.lending_pool_address, chunk_end, chunk_end_hash))
+            self.db.execute("""
+                DELETE FROM checkpoints WHERE lending_pool = ? AND block_number NOT IN (
+                    SELECT block_number FROM checkpoints WHERE lending_pool = ? ORDER BY block_number DESC LIMIT ?
+                )""", (self.lending_pool_address, self.lending_pool_address, self.CHECKPOINT_HISTORY))
+
+    def _rollback_reorged_blocks(self) -> None:
+        """Rolls back to the newest stored checkpoint whose block hash still matches the canonical chain"""
+        checkpoints = self.db.execute("SELECT block_number, block_hash FROM checkpoints WHERE lending_pool = ? "
+                                      "ORDER BY block_number DESC", (self.lending_pool_address,)).fetchall()
+        if len(checkpoints) == 0:
+            return
+
+        valid_block = self.start_block - 1
+        for block_number, block_hash in checkpoints:
+            if Web3.toHex(self.w3.eth.get_block(block_number)["hash"]) == block_hash:
+                valid_block = block_number
+                break
+            print(f"Checkpoint at block {block_number} is no longer on the canonical chain - rolling back")
+
+        if valid_block != checkpoints[0][0]:
+            with self.db:
+                self.db.execute("DELETE FROM events WHERE block_number > ?", (valid_block,))
+                self.db.execute("DELETE FROM checkpoints WHERE lending_pool = ? AND block_number > ?",
+                                (self.lending_pool_address, valid_block))
@@ -0,0 +1,126 @@
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Mapping
+
+import numpy as np
+
+RAY = 10 ** 27
+
+
+"""------------------------------------ Column-Oriented Market State Snapshot -------------------------------------"""
+@dataclass(frozen=True)
+class MarketSnapshot:
+    """
+    Protocol-wide reserve state at one block, stored as one NumPy array per field (one element per reserve) so that
+    risk math can run across every reserve at once. Use 'symbol_index' to find the position of a reserve.
+
+    Units:
+        - Liquidity and debt amounts are in token units (divided by 10 ^ decimals)
+        - Rates are fractions per year (divided by 1e27, e.g. 0.035 = 3.5% APR)
+        - Indexes are multiples (divided by 1e27)
+        - LTV, liquidation threshold, liquidation bonus and reserve factor are in basis points (1e4 = 100%)
+        - Prices are the Aave oracle price in ETH
+
+    See AaveClient.get_market_snapshot()
+    """
+    block_number: int
+    symbols: tuple
+    symbol_index: Mapping[str, int]
+    addresses: tuple
+    decimals: np.ndarray
+    available_liquidity: np.ndarray
+    total_stable_debt: np.ndarray
+    total_variable_debt: np.ndarray
+    liquidity_rate: np.ndarray
+    variable_borrow_rate: np.ndarray
+    stable_borrow_rate: np.ndarray
+    average_stable_borrow_rate: np.ndarray
+    liquidity_index: np.ndarray
+    variable_borrow_index: np.ndarray
+    last_update_timestamp: np.ndarray
+    ltv: np.ndarray
+    liquidation_threshold: np.ndarray
+    liquidation_bonus: np.ndarray
+    reserve_factor: np.ndarray
+    usage_as_collateral_enabled: np.ndarray
+    borrowing_enabled: np.ndarray
+    stable_borrow_rate_enabled: np.ndarray
+    is_active: np.ndarray
+    is_frozen: np.ndarray
+    prices_eth: np.ndarray
+
+    @classmethod
+    def from_reserve_data(cls, block_number: int, reserve_tokens: list, reserve_data: list,
+                          configuration_data: list, prices: list) -> "MarketSnapshot":
+        """
+        Builds the snapshot from the raw protocol data provider outputs of every reserve.
+
+        Parameters:
+            reserve_tokens: The ReserveToken objects, in the same order as the data lists
+            reserve_data: getReserveData() output of each reserve
+            configuration_data: getReserveConfigurationData() output of each reserve
+            prices: getAssetsPrices() output (in wei) for the reserves
+        """
+        reserve_data = np.array(reserve_data, dtype=object).reshape(len(reserve_tokens), 10)
+        configuration_data = np.array(configuration_data, dtype=object).reshape(len(reserve_tokens), 10)
+        decimals = configuration_data[:, 0].astype(np.int64)
+        token_units = 10.0 ** decimals
+
+        def amounts(column: int) -> np.ndarray:
+            return reserve_data[:, column].astype(np.float64) / token_units
+
+        def rays(column: int) -> np.ndarray:
+            return reserve_data[:, column].astype(np.float64) / RAY
+
+        symbols = tuple(token.symbol for token in reserve_tokens)
+        columns = dict(
+            decimals=decimals,
+            available_liquidity=amounts(0),
+            total_stable_debt=amounts(1),
+            total_variable_debt=amounts(2),
+            liquidity_rate=rays(3),
+            variable_borrow_rate=rays(4),
+            stable_borrow_rate=rays(5),
+            average_stable_borrow_rate=rays(6),
+            liquidity_index=rays(7),
+            variable_borrow_index=rays(8),
+            last_update_timestamp=reserve_data[:, 9].astype(np.int64),
+            ltv=configuration_data[:, 1].astype(np.int64),
+            liquidation_threshold=configuration_data[:, 2].astype(np.int64),
+            liquidation_bonus=configuration_data[:, 3].astype(np.int64),
+            reserve_factor=configuration_data[:, 4].astype(np.int64),
+            usage_as_collateral_enabled=configuration_data[:, 5].astype(bool),
+            borrowing_enabled=configuration_data[:, 6].astype(bool),
+            stable_borrow_rate_enabled=configuration_data[:, 7].astype(bool),
+            is_active=configuration_data[:, 8].astype(bool),
+            is_frozen=configuration_data[:, 9].astype(bool),
+            prices_eth=np.array([int(price) for price in prices], dtype=object).astype(np.float64) / 1e18,
+        )
+        for array in columns.values():
+            array.setflags(write=False)
+
+        return cls(block_number=block_number,
+                   symbols=symbols,
+                   symbol_index=MappingProxyType({symbol: i for i, symbol in enumerate(symbols)}),
+                   addresses=tuple(token.address for token in reserve_tokens),
+                   **columns)
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    @property
+    def total_debt(self) -> np.ndarray:
+        """Stable plus variable debt of each reserve (token units)"""
+        return self.total_stable_debt + self.total_variable_debt
+
+    @property
+    def utilization(self) -> np.ndarray:
+        """Total debt / (available liquidity + total debt) of each reserve (0 for empty reserves)"""
+        total_supply = self.available_liquidity + self.total_debt
+        return np.divide(self.total_debt, total_supply, out=np.zeros_like(total_supply), where=total_supply > 0)
+
+    def reserve(self, symbol: str) -> dict:
+        """Returns every field of one reserve as a dict (for inspection, not for hot loops)"""
+        i = self.symbol_index[symbol]
+        return {name: getattr(self, name)[i] for name in self.__dataclass_fields__
+                if isinstance(getattr(self, name), np.ndarray)}
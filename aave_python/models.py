@@ -1,6 +1,9 @@
 from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Mapping
 
 from .abi import ABIReference
+from .contracts import get_contract_cache
 
 import web3.eth
 from web3 import Web3
@@ -20,7 +23,61 @@ class ReserveToken:
     variableDebtTokenSymbol: str = None  # Not being used, None for mainnet to speed up loading
 
     def get_erc20_contract(self, w3: Web3) -> web3.eth.Contract:
-        return w3.eth.contract(address=Web3.toChecksumAddress(self.address), abi=ABIReference.erc20_abi)
+        return get_contract_cache(w3).contract(self.address, ABIReference.erc20_abi)
+
+
+"""------------------------------------ Immutable Index of Aave Reserve Tokens -------------------------------------"""
+class ReserveTokenIndex:
+    """
+    Read-only O(1) lookup index over a list of ReserveToken objects, by symbol or by any of the reserve's addresses
+    (underlying asset, aToken, stable debt token, variable debt token). Addresses and symbols are case-insensitive.
+
+    The index is never mutated - when the reserve tokens change, a new index is built and swapped in.
+    """
+    TOKEN_KINDS = {
+        "underlying": "address",
+        "aToken": "aTokenAddress",
+        "stableDebtToken": "stableDebtTokenAddress",
+        "variableDebtToken": "variableDebtTokenAddress",
+    }
+
+    def __init__(self, tokens: list[ReserveToken]):
+        self.tokens = tuple(tokens)
+        by_symbol = {}
+        by_address = {}
+        for token in self.tokens:
+            by_symbol.setdefault(token.symbol.lower(), token)
+            for kind, attribute in self.TOKEN_KINDS.items():
+                address = getattr(token, attribute)
+                if address is not None:
+                    by_address.setdefault(address.lower(), (token, kind))
+        self._by_symbol = MappingProxyType(by_symbol)
+        self._by_address = MappingProxyType(by_address)
+
+    def __len__(self) -> int:
+        return len(self.tokens)
+
+    def __iter__(self):
+        return iter(self.tokens)
+
+    def by_symbol(self, symbol: str) -> ReserveToken:
+        """Returns the ReserveToken with the underlying asset symbol, or None"""
+        return self._by_symbol.get(symbol.lower())
+
+    def by_address(self, address: str, kind: str = None) -> ReserveToken:
+        """
+        Returns the ReserveToken that the address belongs to, or None.
+        If 'kind' is passed ('underlying', 'aToken', 'stableDebtToken' or 'variableDebtToken'), only addresses of that
+        kind are matched.
+        """
+        match = self.resolve(address)
+        if match is None or (kind is not None and match[1] != kind):
+            return None
+        return match[0]
+
+    def resolve(self, address: str) -> tuple:
+        """Returns a (ReserveToken, kind) tuple for any reserve address (see ReserveTokenIndex.TOKEN_KINDS), or None"""
+        return self._by_address.get(address.lower())
 
 
 """--------------------------- Dataclass to Neatly Handle Transaction Receipts ----------------------------"""
@@ -39,4 +96,36 @@ class AaveTrade:
     asset_amount: float  # In the token amount (not decimal units)
     asset_amount_decimal_units: int  # In decimal units (amount * 10^asset decimals)
     interest_rate_mode: str  # "stable", "variable", or None
-    operation: str  # The operation description (e.g. deposit, borrow)
\ No newline at end of file
+    operation: str  # The operation description (e.g. deposit, borrow)
+
+
+"""------------------------------- Dataclass for Block-Pinned Snapshots of Aave Reads -------------------------------"""
+@dataclass(frozen=True)
+class AaveSnapshot:
+    """Immutable set of reads for one wallet, all taken at the same block - see AaveClient.snapshot()"""
+    block_number: int
+    wallet_address: str
+    user_data: tuple  # Same format as AaveClient.get_user_data() (wei decimal units)
+    user_reserve_data: Mapping[str, tuple]  # Reserve symbol -> same format as AaveClient.get_user_reserve_data()
+    prices: Mapping[str, float]  # Reserve symbol -> oracle price in ETH
+    reserve_data: Mapping[str, tuple]  # Reserve symbol -> protocol data provider getReserveData() output
+
+    @property
+    def available_borrows_eth(self) -> int:
+        return self.user_data[0]
+
+    @property
+    def total_debt_eth(self) -> int:
+        return self.user_data[1]
+
+    @property
+    def total_collateral_eth(self) -> int:
+        return self.user_data[2]
+
+    @property
+    def health_factor(self) -> int:
+        return self.user_data[5]
+
+    def pair_price(self, base_symbol: str, quote_symbol: str) -> float:
+        """Returns the BASE/QUOTE pair price from the snapshot's oracle prices"""
+        return self.prices[base_symbol] / self.prices[quote_symbol]
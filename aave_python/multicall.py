@@ -0,0 +1,137 @@
+from .abi import ABIReference
+from .contracts import get_contract_cache
+
+from web3 import Web3
+from web3._utils.abi import get_abi_output_types, map_abi_data
+from web3._utils.normalizers import BASE_RETURN_NORMALIZERS
+from web3.exceptions import ContractLogicError
+
+# Error messages of an aggregated eth_call that a smaller batch may not hit
+BATCH_SIZE_ERRORS = ("out of gas", "gas required exceeds", "gas limit", "gas cap", "execution reverted",
+                     "too large", "too big", "response size")
+
+
+def decode_function_result(w3: Web3, function_call, return_data: bytes):
+    """
+    Decodes the raw return data of a contract function call the same way web3's ContractFunction.call() does.
+    Single output values are unwrapped, multiple outputs are returned as a list.
+    """
+    output_types = get_abi_output_types(function_call.abi)
+    decoded = w3.codec.decode_abi(output_types, return_data)
+    normalized = map_abi_data(BASE_RETURN_NORMALIZERS, output_types, decoded)
+    return normalized[0] if len(normalized) == 1 else normalized
+
+
+def is_batch_size_error(exc: Exception) -> bool:
+    """
+    Whether an aggregated eth_call failed because of the size of its batch (out of gas, too large a request or
+    response, or a reverted aggregate), so that splitting the batch may succeed. Transport errors (timeouts, rate
+    limits, connection resets) are not - they are left to the provider's retries and failover.
+    """
+    if isinstance(exc, ContractLogicError):
+        return True
+    message = str(exc).lower()
+    return any(pattern in message for pattern in BATCH_SIZE_ERRORS)
+
+
+"""------------------------------------------ MULTICALL READ AGGREGATOR ---------------------------------------------"""
+class Multicall:
+    """
+    Aggregates many read-only contract calls into as few eth_call requests as possible using the Multicall3 contract:
+    https://github.com/mds1/multicall
+
+    Calls are sent in batches of up to 'max_batch_size'. If a batch fails because of its size (e.g. the provider rejects
+    the request because it is too large or exceeds the eth_call gas cap), it is split in half and retried, and the
+    smaller batch size is remembered for subsequent calls. Any other error is raised.
+    """
+    def __init__(self, w3: Web3, multicall_address: str, max_batch_size: int = 250, gas_limit: int = None):
+        self.w3 = w3
+        self.contract = get_contract_cache(self.w3).contract(multicall_address, ABIReference.multicall3_abi)
+        self._try_aggregate_function = get_contract_cache(self.w3).function(multicall_address,
+                                                                            ABIReference.multicall3_abi,
+                                                                            "tryAggregate")
+        self.max_batch_size = max_batch_size
+        self.batch_size = max_batch_size
+        self.gas_limit = gas_limit  # Optional gas cap passed to eth_call (None = provider default)
+        self._available = None
+
+    def is_available(self) -> bool:
+        """
+        Returns True if the Multicall3 contract is deployed on the connected network. The answer is cached once the
+        contract code was read, while a failed read returns False and is retried on the next call.
+        """
+        if self._available is None:
+            try:
+                self._available = len(self.w3.eth.get_code(self.contract.address)) > 0
+            except Exception:
+                return False
+        return self._available
+
+    def aggregate(self, calls: list, block_identifier="latest", allow_failure: bool = False) -> list:
+        """
+        Executes every contract function call in 'calls' and returns the decoded results in the same order.
+
+        Parameters:
+            calls: A list of web3 ContractFunction objects (e.g. erc20.functions.balanceOf(wallet_address)) and/or
+                   PreparedCall objects (see ./contracts.py)
+
+            block_identifier: The block to run every call against, so that all results are consistent.
+
+            allow_failure: If True, reverted calls return None instead of raising an exception.
+
+        Returns:
+            list of decoded return values (same format as ContractFunction.call())
+        """
+        results = []
+        start = 0
+        while start < len(calls):
+            batch = calls[start:start + self.batch_size]
+            results.extend(self._aggregate_batch(batch, block_identifier, allow_failure))
+            start += len(batch)
+        return results
+
+    def _aggregate_batch(self, batch: list, block_identifier, allow_failure: bool) -> list:
+        try:
+            return_data = self._try_aggregate(batch, block_identifier)
+        except Exception as exc:
+            if not is_batch_size_error(exc):
+                raise
+            if len(batch) == 1:
+                # The single call could not be aggregated, so issue it directly
+                try:
+                    return [batch[0].call(block_identifier=block_identifier)]
+                except Exception as call_exc:
+                    if allow_failure:
+                        return [None]
+                    raise Exception(f"Multicall could not execute {batch[0].fn_name} on {batch[0].address} - "
+                                    f"Error: {call_exc}")
+
+            # Shrink the batch size for all future calls and retry each half
+            half = len(batch) // 2
+            self.batch_size = max(1, min(self.batch_size, half))
+            return self._aggregate_batch(batch[:half], block_identifier, allow_failure) + \
+                self._aggregate_batch(batch[half:], block_identifier, allow_failure)
+
+        return self.decode_batch(batch, return_data, allow_failure)
+
+    def encode_batch(self, batch: list):
+        """Returns the prepared tryAggregate call (see ./contracts.py) that executes every call in 'batch'"""
+        encoded_calls = [(function_call.address, Web3.toBytes(hexstr=function_call._encode_transaction_data()))
+                         for function_call in batch]
+        return self._try_aggregate_function(False, encoded_calls)
+
+    def decode_batch(self, batch: list, return_data: list, allow_failure: bool = False) -> list:
+        """Decodes the (success, returnData) results of a tryAggregate call into the return values of each call"""
+        output = []
+        for function_call, (success, data) in zip(batch, return_data):
+            if not success or len(data) == 0:
+                if allow_failure:
+                    output.append(None)
+                    continue
+                raise Exception(f"Multicall call to {function_call.fn_name} on {function_call.address} reverted")
+            output.append(decode_function_result(self.w3, function_call, data))
+        return output
+
+    def _try_aggregate(self, batch: list, block_identifier) -> list:
+        transaction = {} if self.gas_limit is None else {"gas": self.gas_limit}
+        return self.encode_batch(batch).call(transaction, block_identifier=block_identifier)
@@ -1,6 +1,5 @@
 from .models import ReserveToken
-
-import requests
+from .transport import HTTPTransport
 
 
 """----------------------------------- NETWORK CONFIG & ABI REFERENCE CLASSES ----------------------------------"""
@@ -12,15 +11,18 @@ class MainnetConfig:
         self.lending_pool_addresses_provider = '0xB53C1a33016B2DC2fF3653530bfF1848a515c8c5'
         self.protocol_data_provider = '0x057835Ad21a177dbdd3090bB1CAE03EaCF78Fc6d'
         self.weth_token = '0xc02aaa39b223fe8d0a0e5c4f27ead9083c756cc2'
+        self.multicall_address = '0xcA11bde05977b3631167028862bE2a173976CA11'
         self.rpc_url = mainnet_rpc_url
         self.aave_tokenlist_url = "https://aave.github.io/aave-addresses/mainnet.json"
-        self.aave_tokens = [ReserveToken(**token_data) for token_data in self.fetch_aave_tokens()]
-        # self.aave_tokens: list[ReserveToken] = []  # Starts as empty list
+        # Starts as empty list, to be populated by AaveClient from the reserve token cache
+        self.aave_tokens: list[ReserveToken] = []
 
-    def fetch_aave_tokens(self) -> dict:
+    def fetch_aave_tokens(self, transport: HTTPTransport = None) -> dict:
+        """Fetches the Aave tokenlist, on the pooled connections of the client's transport if one is passed"""
         try:
-            # r =
-            return requests.get(self.aave_tokenlist_url).json()['proto']
+            if transport is None:
+                transport = HTTPTransport()
+            return transport.get_json(self.aave_tokenlist_url)['proto']
         except:
             raise ConnectionError("Could not fetch Aave tokenlist for the Mainnet network from URL: "
                                   "https://aave.github.io/aave-addresses/mainnet.json")
@@ -33,7 +35,9 @@ class GoerliConfig:
         self.lending_pool_addresses_provider = '0x5E52dEc931FFb32f609681B8438A51c675cc232d'
         self.protocol_data_provider = '0x927F584d4321C1dCcBf5e2902368124b02419a1E'
         self.weth_token = '0xB4FBF271143F4FBf7B91A5ded31805e42b2208d6'
+        self.multicall_address = '0xcA11bde05977b3631167028862bE2a173976CA11'
         self.rpc_url = goerli_rpc_url
+        self.aave_tokenlist_url = None
         self.aave_tokens: list[ReserveToken] = []  # Starts as empty list, to be populated by AaveClient
         
         # NEED TO FIGURE OUT IF THERE'S A TOKEN ADDRESS LIST FOR GÖRLI, SIMILAR TO THE ONE FOR MAINNET & KOVAN,
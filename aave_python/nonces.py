@@ -0,0 +1,126 @@
+import heapq
+import threading
+
+from web3 import Web3
+
+
+"""-------------------------------------------- LOCAL NONCE MANAGER -------------------------------------------------"""
+class NonceManager:
+    """
+    Thread-safe local nonce allocator for one wallet.
+
+    The next nonce is read once from the chain (the "pending" transaction count) and then handed out locally, so sending
+    a transaction costs no eth_getTransactionCount call and several transactions can be in flight at once.
+
+    When a transaction fails to send, its nonce is released: the last handed out nonce is simply reused, while an
+    earlier one is kept in a free list and handed out before any new nonce, so the gap is filled without touching the
+    nonces other threads have reserved. reconcile() compares the local state with the node's pending nonce - nonces the
+    node does not know about (dropped or never broadcast) are reported as gaps and handed out again.
+    """
+    def __init__(self, w3: Web3, address: str):
+        self.w3 = w3
+        self.address = Web3.toChecksumAddress(address)
+        self._next_nonce = None
+        self._in_flight = {}  # Nonce -> transaction hash of the sent transactions that are not known to be mined
+        self._reserved = set()  # Nonces handed out whose transactions are neither sent nor released yet
+        self._released = []  # Min-heap of nonces below self._next_nonce to hand out again
+        self._lock = threading.RLock()
+
+    def sync(self) -> int:
+        """Resets the next nonce to the chain's pending transaction count and returns it"""
+        with self._lock:
+            self._next_nonce = self.w3.eth.get_transaction_count(self.address, "pending")
+            self._in_flight = {nonce: tx_hash for nonce, tx_hash in self._in_flight.items()
+                               if nonce < self._next_nonce}
+            self._released = []
+            return self._next_nonce
+
+    def next_nonce(self) -> int:
+        """Reserves and returns the next nonce (synced from the chain on first use)"""
+        with self._lock:
+            if self._next_nonce is None:
+                self.sync()
+            if self._released:
+                nonce = heapq.heappop(self._released)
+            else:
+                nonce = self._next_nonce
+                self._next_nonce += 1
+            self._reserved.add(nonce)
+            return nonce
+
+    def peek(self) -> int:
+        """Returns the nonce the next transaction will use, without reserving it"""
+        with self._lock:
+            if self._next_nonce is None:
+                self.sync()
+            return self._released[0] if self._released else self._next_nonce
+
+    def mark_sent(self, nonce: int, tx_hash) -> None:
+        """Records that the transaction with the nonce was broadcast"""
+        with self._lock:
+            self._reserved.discard(nonce)
+            self._in_flight[nonce] = tx_hash
+
+    def mark_mined(self, nonce: int) -> None:
+        """Records that the transaction with the nonce was mined, so it and every earlier nonce are no longer in flight"""
+        with self._lock:
+            self._in_flight = {in_flight: tx_hash for in_flight, tx_hash in self._in_flight.items() if in_flight > nonce}
+
+    def release(self, nonce: int) -> None:
+        """
+        Returns a reserved nonce whose transaction was never broadcast (e.g. gas estimation or sending failed).
+        The last handed out nonce is reused directly, while an earlier one is handed out again by the next next_nonce().
+        """
+        with self._lock:
+            self._reserved.discard(nonce)
+            if self._next_nonce is None or nonce >= self._next_nonce or nonce in self._released:
+                return
+            if nonce == self._next_nonce - 1:
+                self._next_nonce = nonce
+                # Released nonces right below the counter are no longer gaps either
+                while self._released and max(self._released) == self._next_nonce - 1:
+                    self._released.remove(self._next_nonce - 1)
+                    self._next_nonce -= 1
+                heapq.heapify(self._released)
+            else:
+                heapq.heappush(self._released, nonce)
+
+    def reconcile(self) -> list[int]:
+        """
+        Reconciles the local state with the chain's mined and pending transaction counts.
+
+        - If other senders used the wallet, the next nonce moves forward to the pending count.
+        - If the node does not know about nonces that were handed out locally (dropped or failed transactions), they
+          are handed out again by the next transactions. Nonces currently reserved by other threads are left alone: the
+          next nonce only moves back to just above the highest of them, and the gaps below it go to the free list.
+
+        Returns:
+            The gap: nonces that were handed out locally but are unknown to the node (excluding the reserved ones), in
+            ascending order
+        """
+        with self._lock:
+            mined_count = self.w3.eth.get_transaction_count(self.address, "latest")
+            pending_count = self.w3.eth.get_transaction_count(self.address, "pending")
+            self._in_flight = {nonce: tx_hash for nonce, tx_hash in self._in_flight.items() if nonce >= mined_count}
+
+            gaps = []
+            if self._next_nonce is not None and pending_count < self._next_nonce:
+                gaps = [nonce for nonce in range(pending_count, self._next_nonce) if nonce not in self._reserved]
+            if gaps:
+                dropped = [nonce for nonce in gaps if nonce in self._in_flight]
+                print(f"Nonce gap detected for {self.address}: nonces {gaps[0]}-{gaps[-1]} are unknown to the node "
+                      f"({len(dropped)} were broadcast and dropped) - handing them out again")
+                for nonce in dropped:
+                    del self._in_flight[nonce]
+
+            live = [nonce for nonce in self._reserved if nonce >= pending_count]
+            self._next_nonce = max(pending_count, max(live) + 1 if live else pending_count)
+            self._released = [nonce for nonce in gaps if nonce < self._next_nonce]
+            heapq.heapify(self._released)
+            return gaps
+
+    @property
+    def in_flight(self) -> dict:
+        """Nonce -> transaction hash of the broadcast transactions that are not known to be mined"""
+        with self._lock:
+            return dict(self._in_flight)
@@ -0,0 +1,66 @@
+from dataclasses import dataclass
+
+from web3 import Web3
+
+
+"""----------------------------------------------- Operation Plans --------------------------------------------------"""
+@dataclass(frozen=True)
+class OperationPlan:
+    """
+    The steps the client runs for one operation, in order. Possible steps:
+        - "ensure_allowance": check the cached allowance and send an approval if it is too low
+        - "<operation>": the LendingPool (or WETH) transaction itself
+        - "read_account_data": a getUserAccountData() read after the transaction to report the remaining position
+    """
+    operation: str
+    asset_address: str
+    amount_in_decimal_units: int
+    steps: tuple
+
+    @property
+    def requires_allowance(self) -> bool:
+        return "ensure_allowance" in self.steps
+
+    @property
+    def reads_account_data(self) -> bool:
+        return "read_account_data" in self.steps
+
+
+"""----------------------------------------------- OPERATION PLANNER ------------------------------------------------"""
+class OperationPlanner:
+    """
+    Decides from the operation type which steps are required around the main transaction:
+        - Only operations where the LendingPool pulls the underlying asset from the wallet (deposit, repay) need an
+          ERC20 allowance. Withdrawals burn aTokens and borrows mint debt tokens, so neither needs an approval.
+        - Reporting the remaining position after a borrow or repay costs a getUserAccountData() read, so it is only
+          planned when 'report_account_data' is True.
+    """
+    # Operation -> whether the LendingPool transfers the underlying asset out of the wallet
+    PULLS_UNDERLYING = {
+        "Deposit": True,
+        "Repay": True,
+        "Withdraw": False,
+        "Borrow": False,
+        "Convert ETH to WETH": False,
+    }
+    REPORTED_OPERATIONS = ("Borrow", "Repay")
+
+    def __init__(self, report_account_data: bool = False):
+        self.report_account_data = report_account_data
+
+    def plan(self, operation: str, asset_address: str, amount_in_decimal_units: int) -> OperationPlan:
+        """Returns the OperationPlan for an operation ('Deposit', 'Withdraw', 'Borrow', 'Repay', ...)"""
+        if operation not in self.PULLS_UNDERLYING:
+            raise ValueError(f"Unknown operation '{operation}' - Valid operations are {list(self.PULLS_UNDERLYING)}")
+
+        steps = []
+        if self.PULLS_UNDERLYING[operation]:
+            steps.append("ensure_allowance")
+        steps.append(operation.lower())
+        if self.report_account_data and operation in self.REPORTED_OPERATIONS:
+            steps.append("read_account_data")
+
+        return OperationPlan(operation=operation,
+                             asset_address=Web3.toChecksumAddress(asset_address),
+                             amount_in_decimal_units=amount_in_decimal_units,
+                             steps=tuple(steps))
@@ -0,0 +1,135 @@
+from concurrent.futures import Future
+import threading
+import time
+
+from hexbytes import HexBytes
+from web3 import Web3
+from web3.exceptions import TimeExhausted, TransactionNotFound
+
+
+"""--------------------------------------------- SHARED RECEIPT WATCHER ---------------------------------------------"""
+class ReceiptWatcher:
+    """
+    Resolves the receipts of many pending transactions from one background thread.
+
+    watch() returns a concurrent.futures.Future right away. The watcher thread polls the chain head and, for every new
+    block, matches the block's transaction hashes against all pending hashes, so that the cost of waiting is one
+    eth_getBlockByNumber per block (plus one receipt request per mined transaction) no matter how many transactions are
+    pending. Newly watched hashes are checked directly once, in case they were mined before being watched.
+
+    Futures are resolved with the transaction receipt, or fail with web3's TimeExhausted after their timeout.
+    """
+    MAX_BLOCKS_PER_POLL = 32  # If the watcher falls further behind, pending receipts are requested directly
+
+    def __init__(self, w3: Web3, poll_interval: float = 1.0, on_timeout=None):
+        """
+        Parameters:
+            poll_interval: Seconds between chain head checks while transactions are pending
+
+            on_timeout: Optional callable run with the transaction hash when a transaction times out (e.g. to reconcile
+                        the nonces)
+        """
+        self.w3 = w3
+        self.poll_interval = poll_interval
+        self.on_timeout = on_timeout
+        self._pending = {}  # Transaction hash (hex) -> (future, deadline)
+        self._unchecked = set()
+        self._last_block = None
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = False
+        self._thread = None
+
+    @property
+    def pending(self) -> int:
+        """The number of transactions being watched"""
+        with self._lock:
+            return len(self._pending)
+
+    def watch(self, tx_hash, timeout: float = 120) -> Future:
+        """Returns a Future that resolves with the receipt of the transaction hash"""
+        tx_hash = Web3.toHex(HexBytes(tx_hash))
+        with self._lock:
+            if tx_hash in self._pending:
+                return self._pending[tx_hash][0]
+
+            future = Future()
+            self._pending[tx_hash] = (future, time.monotonic() + timeout)
+            self._unchecked.add(tx_hash)
+            if self._thread is None or not self._thread.is_alive():
+                self._stopped = False
+                self._thread = threading.Thread(target=self._run, name="aave-receipt-watcher", daemon=True)
+                self._thread.start()
+        self._wakeup.set()
+        return future
+
+    def notify_new_head(self, head=None) -> None:
+        """Wakes the watcher thread up to check the new block right away (e.g. from a HeadTracker callback)"""
+        self._wakeup.set()
+
+    def stop(self) -> None:
+        """Stops the watcher thread (pending futures stay unresolved until watched again)"""
+        self._stopped = True
+        self._wakeup.set()
+
+    def _run(self) -> None:
+        while not self._stopped:
+            if self.pending == 0:
+                self._wakeup.wait()
+                self._wakeup.clear()
+                continue
+            try:
+                self._poll()
+            except Exception as exc:
+                print(f"Receipt watcher poll failed - Error: {exc}")
+            self._expire()
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+
+    def _poll(self) -> None:
+        with self._lock:
+            unchecked, self._unchecked = self._unchecked, set()
+        for tx_hash in unchecked:
+            self._check_receipt(tx_hash)
+
+        head = self.w3.eth.block_number
+        if self._last_block is None or head - self._last_block > self.MAX_BLOCKS_PER_POLL:
+            with self._lock:
+                pending = list(self._pending)
+            for tx_hash in pending:
+                self._check_receipt(tx_hash)
+            self._last_block = head
+            return
+
+        for block_number in range(self._last_block + 1, head + 1):
+            block_hashes = {Web3.toHex(tx_hash) for tx_hash in self.w3.eth.get_block(block_number)["transactions"]}
+            with self._lock:
+                mined = block_hashes.intersection(self._pending)
+            for tx_hash in mined:
+                self._check_receipt(tx_hash)
+            self._last_block = block_number
+
+    def _check_receipt(self, tx_hash: str) -> None:
+        try:
+            receipt = self.w3.eth.get_transaction_receipt(tx_hash)
+        except TransactionNotFound:
+            return
+        if receipt is None:
+            return
+        with self._lock:
+            entry = self._pending.pop(tx_hash, None)
+        if entry is not None:
+            entry[0].set_result(receipt)
+
+    def _expire(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            expired = [tx_hash for tx_hash, (_, deadline) in self._pending.items() if deadline <= now]
+            entries = [self._pending.pop(tx_hash) for tx_hash in expired]
+        for tx_hash, (future, _) in zip(expired, entries):
+            if self.on_timeout is not None:
+                try:
+                    self.on_timeout(tx_hash)
+                except Exception as exc:
+                    print(f"Receipt watcher timeout handler failed - Error: {exc}")
+            future.set_exception(TimeExhausted(f"Transaction {tx_hash} is not in the chain after the timeout"))
@@ -0,0 +1,132 @@
+import time
+
+from .abi import ABIReference
+
+from web3 import Web3
+from web3._utils.events import event_abi_to_log_topic
+
+
+"""---------------------------------- LENDING POOL ADDRESSES PROVIDER REGISTRY ----------------------------------"""
+class ProtocolAddressRegistry:
+    """
+    Resolves the contracts registered with the LendingPoolAddressesProvider once, keeps them in memory, and only
+    invalidates an entry when the addresses provider emits an event that replaces it.
+
+    The provider's logs are checked at most once every 'sync_interval' seconds (one eth_blockNumber and one eth_getLogs
+    call), so regular reads never pay for an address lookup.
+
+    https://docs.aave.com/developers/v/2.0/the-core-protocol/addresses-provider
+    """
+    # Registry key -> LendingPoolAddressesProvider getter
+    TARGETS = {
+        "lending_pool": "getLendingPool",
+        "price_oracle": "getPriceOracle",
+        "collateral_manager": "getLendingPoolCollateralManager",
+        "configurator": "getLendingPoolConfigurator",
+        "rate_oracle": "getLendingRateOracle",
+    }
+    # Addresses provider event -> registry key that it replaces
+    EVENT_TARGETS = {
+        "LendingPoolUpdated": "lending_pool",
+        "PriceOracleUpdated": "price_oracle",
+        "LendingPoolCollateralManagerUpdated": "collateral_manager",
+        "LendingPoolConfiguratorUpdated": "configurator",
+        "LendingRateOracleUpdated": "rate_oracle",
+    }
+    # AddressSet(bytes32 id, ...) ids used by the addresses provider -> registry key
+    ADDRESS_IDS = {
+        b"LENDING_POOL": "lending_pool",
+        b"PRICE_ORACLE": "price_oracle",
+        b"COLLATERAL_MANAGER": "collateral_manager",
+        b"LENDING_POOL_CONFIGURATOR": "configurator",
+        b"LENDING_RATE_ORACLE": "rate_oracle",
+    }
+
+    def __init__(self, w3: Web3, addresses_provider_address: str, multicall=None, sync_interval: float = 60):
+        self.w3 = w3
+        self.multicall = multicall
+        self.sync_interval = sync_interval
+        self.provider_contract = self.w3.eth.contract(address=Web3.toChecksumAddress(addresses_provider_address),
+                                                      abi=ABIReference.lending_pool_addresses_provider_abi)
+        self._addresses = {}
+        self._last_synced_block = None
+        self._last_synced_at = 0
+
+        self._event_topics = {}
+        for event_abi in ABIReference.lending_pool_addresses_provider_abi:
+            if event_abi["type"] == "event" and (event_abi["name"] in self.EVENT_TARGETS
+                                                 or event_abi["name"] == "AddressSet"):
+                self._event_topics[Web3.toHex(event_abi_to_log_topic(event_abi))] = event_abi["name"]
+
+    def get(self, name: str) -> str:
+        """Returns the checksum address registered for 'name' (one of the keys in ProtocolAddressRegistry.TARGETS)"""
+        if name not in self.TARGETS:
+            raise ValueError(f"Unknown protocol address '{name}' - Valid names are {list(self.TARGETS.keys())}")
+
+        if self._last_synced_block is None:
+            self.resolve_all()
+        elif time.time() - self._last_synced_at >= self.sync_interval:
+            self.sync()
+
+        if name not in self._addresses:
+            self._addresses[name] = getattr(self.provider_contract.functions, self.TARGETS[name])().call()
+        return self._addresses[name]
+
+    def resolve_all(self) -> dict:
+        """Resolves every target address (in a single aggregated call if Multicall is available)"""
+        names = list(self.TARGETS.keys())
+        calls = [getattr(self.provider_contract.functions, self.TARGETS[name])() for name in names]
+        if self.multicall is not None and self.multicall.is_available():
+            *addresses, block_number = self.multicall.aggregate(
+                calls + [self.multicall.contract.functions.getBlockNumber()])
+        else:
+            block_number = self.w3.eth.block_number
+            addresses = [call.call(block_identifier=block_number) for call in calls]
+
+        self._addresses = dict(zip(names, addresses))
+        self._last_synced_block = block_number
+        self._last_synced_at = time.time()
+        return dict(self._addresses)
+
+    def sync(self) -> list:
+        """
+        Checks the addresses provider logs emitted since the last sync, and invalidates every entry that was replaced.
+        Invalidated entries are lazily resolved again by the next self.get() call.
+
+        Returns:
+            list of the invalidated registry keys
+        """
+        latest_block = self.w3.eth.block_number
+        invalidated = []
+        if self._last_synced_block is not None and latest_block > self._last_synced_block:
+            logs = self.w3.eth.get_logs({
+                "address": self.provider_contract.address,
+                "fromBlock": self._last_synced_block + 1,
+                "toBlock": latest_block,
+                "topics": [list(self._event_topics.keys())],
+            })
+            for log in logs:
+                invalidated.extend(self._targets_for_log(log))
+            for name in set(invalidated):
+                self.invalidate(name)
+
+        self._last_synced_block = latest_block
+        self._last_synced_at = time.time()
+        return sorted(set(invalidated))
+
+    def invalidate(self, name: str = None) -> None:
+        """Drops one cached address (or every cached address if name is None)"""
+        if name is None:
+            self._addresses.clear()
+        else:
+            self._addresses.pop(name, None)
+
+    def _targets_for_log(self, log) -> list:
+        event_name = self._event_topics.get(Web3.toHex(log["topics"][0]))
+        if event_name == "AddressSet":
+            address_id = getattr(self.provider_contract.events, event_name)().processLog(log)["args"]["id"]
+            target = self.ADDRESS_IDS.get(bytes(address_id).rstrip(b"\x00"))
+            return [target] if target is not None else []
+        elif event_name is not None:
+            return [self.EVENT_TARGETS[event_name]]
+        return []
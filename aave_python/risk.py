@@ -0,0 +1,185 @@
+from dataclasses import dataclass
+from typing import Mapping
+
+import numpy as np
+
+from .market import MarketSnapshot
+
+
+"""------------------------------------------ Local Account Data Results --------------------------------------------"""
+@dataclass(frozen=True)
+class AccountState:
+    """
+    Account data computed by the HealthFactorEngine, one element per evaluated scenario.
+    Same fields as LendingPool.getUserAccountData(), in ETH / fractions instead of wei / basis points:
+        - total_collateral_eth, total_debt_eth, available_borrows_eth: ETH
+        - current_liquidation_threshold, ltv: fractions (e.g. 0.825 = 82.5%)
+        - health_factor: np.inf when the account has no debt
+    """
+    total_collateral_eth: np.ndarray
+    total_debt_eth: np.ndarray
+    available_borrows_eth: np.ndarray
+    current_liquidation_threshold: np.ndarray
+    ltv: np.ndarray
+    health_factor: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.health_factor)
+
+    @property
+    def is_healthy(self) -> np.ndarray:
+        """True for every scenario that cannot be liquidated (health factor >= 1)"""
+        return self.health_factor >= 1
+
+
+"""------------------------------------------ LOCAL HEALTH FACTOR ENGINE --------------------------------------------"""
+class HealthFactorEngine:
+    """
+    Recomputes a user's account data locally with the same formulas as the Aave V2 LendingPool
+    (GenericLogic.calculateUserAccountData), so that hypothetical deposits, withdrawals, borrows and repays can be
+    evaluated without any RPC calls or transactions.
+
+    Scenarios are evaluated as a batch: the per-reserve amounts of every scenario form one (scenarios x reserves) matrix
+    and the account data of all scenarios is computed with a handful of NumPy operations.
+
+    The math runs in float64 on ETH values, so results match the on-chain values to float precision (the contract's
+    wei rounding is not reproduced).
+
+    Usage:
+        engine = aave_client.get_health_factor_engine()
+        states = engine.what_if(borrows=[{"USDC": amount} for amount in (100, 500, 1000)])
+        print(states.health_factor)
+    """
+    def __init__(self, market: MarketSnapshot, collateral: np.ndarray, debt: np.ndarray,
+                 usage_as_collateral: np.ndarray):
+        """
+        Parameters:
+            market: The MarketSnapshot providing the prices, LTV and liquidation threshold of every reserve
+
+            collateral: The aToken balance of each reserve (token units, in the order of market.symbols)
+
+            debt: The stable plus variable debt of each reserve (token units, in the order of market.symbols)
+
+            usage_as_collateral: Whether each reserve is enabled as collateral by the user
+        """
+        self.market = market
+        self.collateral = np.asarray(collateral, dtype=np.float64)
+        self.debt = np.asarray(debt, dtype=np.float64)
+        self.usage_as_collateral = np.asarray(usage_as_collateral, dtype=bool)
+        if not (self.collateral.shape == self.debt.shape == self.usage_as_collateral.shape == (len(market),)):
+            raise ValueError(f"Expected one collateral, debt and collateral usage value per reserve ({len(market)})")
+
+        self.prices_eth = market.prices_eth
+        self.ltv = market.ltv / 1e4
+        self.liquidation_threshold = market.liquidation_threshold / 1e4
+
+    @classmethod
+    def from_user_reserve_data(cls, market: MarketSnapshot,
+                               user_reserve_data: Mapping[str, tuple]) -> "HealthFactorEngine":
+        """
+        Builds the engine from the protocol data provider getUserReserveData() output of each reserve, keyed by reserve
+        symbol (the format of AaveSnapshot.user_reserve_data). Reserves missing from the mapping are treated as empty.
+        """
+        collateral = np.zeros(len(market))
+        debt = np.zeros(len(market))
+        usage_as_collateral = np.zeros(len(market), dtype=bool)
+        units = 10.0 ** market.decimals
+        for symbol, data in user_reserve_data.items():
+            i = market.symbol_index[symbol]
+            collateral[i] = data[0] / units[i]
+            debt[i] = (data[1] + data[2]) / units[i]
+            usage_as_collateral[i] = data[8]
+        return cls(market, collateral, debt, usage_as_collateral)
+
+    def account_data(self) -> AccountState:
+        """Returns the current account data (a single scenario without any changes)"""
+        return self.evaluate(self.collateral[np.newaxis, :], self.debt[np.newaxis, :])
+
+    def evaluate(self, collateral: np.ndarray, debt: np.ndarray, usage_as_collateral: np.ndarray = None) -> AccountState:
+        """
+        Computes the account data of every scenario.
+
+        Parameters:
+            collateral: (scenarios x reserves) matrix of aToken balances (token units)
+
+            debt: (scenarios x reserves) matrix of stable plus variable debt (token units)
+
+            usage_as_collateral: (scenarios x reserves) or (reserves,) collateral flags (defaults to the user's flags)
+
+        Returns:
+            The AccountState with one element per scenario
+        """
+        usage_as_collateral = self.usage_as_collateral if usage_as_collateral is None else usage_as_collateral
+        collateral_eth = np.where(usage_as_collateral & (self.liquidation_threshold > 0),
+                                  collateral * self.prices_eth, 0.0)
+        total_collateral_eth = collateral_eth.sum(axis=1)
+        total_debt_eth = (debt * self.prices_eth).sum(axis=1)
+
+        has_collateral = total_collateral_eth > 0
+        safe_collateral = np.where(has_collateral, total_collateral_eth, 1.0)
+        ltv = np.where(has_collateral, collateral_eth @ self.ltv / safe_collateral, 0.0)
+        liquidation_threshold = np.where(has_collateral, collateral_eth @ self.liquidation_threshold / safe_collateral,
+                                         0.0)
+
+        has_debt = total_debt_eth > 0
+        health_factor = np.where(has_debt, total_collateral_eth * liquidation_threshold
+                                 / np.where(has_debt, total_debt_eth, 1.0), np.inf)
+        available_borrows_eth = np.maximum(total_collateral_eth * ltv - total_debt_eth, 0.0)
+
+        return AccountState(total_collateral_eth=total_collateral_eth,
+                            total_debt_eth=total_debt_eth,
+                            available_borrows_eth=available_borrows_eth,
+                            current_liquidation_threshold=liquidation_threshold,
+                            ltv=ltv,
+                            health_factor=health_factor)
+
+    def what_if(self, deposits=None, withdrawals=None, borrows=None, repays=None) -> AccountState:
+        """
+        Evaluates a batch of hypothetical operations applied to the user's current positions.
+
+        Parameters:
+            deposits, withdrawals, borrows, repays: Either one {symbol: token amount} dict (a single scenario), a list of
+            such dicts (one per scenario), or a (scenarios x reserves) NumPy array of token amounts. All passed
+            arguments must describe the same number of scenarios.
+
+        Withdrawals and repays are capped at the current balance / debt. As on-chain, a deposit into a reserve the user
+        holds no balance of enables it as collateral.
+
+        Returns:
+            The AccountState with one element per scenario
+        """
+        deltas = {name: self._scenario_matrix(operations) for name, operations in
+                  (("deposits", deposits), ("withdrawals", withdrawals), ("borrows", borrows), ("repays", repays))
+                  if operations is not None}
+        scenarios = {len(matrix) for matrix in deltas.values()}
+        if len(scenarios) > 1:
+            raise ValueError(f"All operations must describe the same number of scenarios - Got {sorted(scenarios)}")
+        shape = (scenarios.pop() if scenarios else 1, len(self.market))
+        zeros = np.zeros(shape)
+
+        deposited = deltas.get("deposits", zeros)
+        collateral = np.maximum(self.collateral + deposited - deltas.get("withdrawals", zeros), 0.0)
+        debt = np.maximum(self.debt + deltas.get("borrows", zeros) - deltas.get("repays", zeros), 0.0)
+        usage_as_collateral = self.usage_as_collateral | ((self.collateral == 0) & (deposited > 0))
+        return self.evaluate(collateral, debt, usage_as_collateral)
+
+    def max_borrow(self, symbol: str) -> float:
+        """Returns the amount of the reserve (token units) the user can currently borrow, based on the LTV"""
+        available_borrows_eth = self.account_data().available_borrows_eth[0]
+        return available_borrows_eth / self.prices_eth[self.market.symbol_index[symbol]]
+
+    def _scenario_matrix(self, operations) -> np.ndarray:
+        """Converts a {symbol: amount} dict, a list of them, or an array to a (scenarios x reserves) matrix"""
+        if isinstance(operations, np.ndarray):
+            matrix = np.atleast_2d(operations).astype(np.float64)
+            if matrix.shape[1] != len(self.market):
+                raise ValueError(f"Expected {len(self.market)} columns (one per reserve) - Got {matrix.shape[1]}")
+            return matrix
+
+        if isinstance(operations, dict):
+            operations = [operations]
+        matrix = np.zeros((len(operations), len(self.market)))
+        for row, scenario in enumerate(operations):
+            for symbol, amount in scenario.items():
+                matrix[row, self.market.symbol_index[symbol]] += amount
+        return matrix
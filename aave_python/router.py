@@ -0,0 +1,234 @@
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import threading
+import time
+
+from .hedging import HedgePolicy
+from .transport import HTTPTransport
+
+from web3.providers.base import JSONBaseProvider
+
+
+"""------------------------------------------------ ENDPOINT HEALTH -------------------------------------------------"""
+class RPCEndpoint:
+    """
+    One RPC endpoint of a RoutedHTTPProvider, with its health statistics:
+        - ewma_latency: exponentially weighted moving average of the response time of successful requests (seconds)
+        - error_rate: exponentially weighted moving average of the share of failed requests
+        - The circuit breaker opens after 'failure_threshold' consecutive failures, and the endpoint is skipped until
+          its cooldown has passed. It then gets a single trial request: a success closes the breaker, while another
+          failure opens it again for twice as long (up to 'max_cooldown').
+    """
+    def __init__(self, url: str, provider, smoothing: float = 0.2, failure_threshold: int = 3,
+                 cooldown: float = 10, max_cooldown: float = 300):
+        self.url = url
+        self.provider = provider
+        self.smoothing = smoothing
+        self.failure_threshold = failure_threshold
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+
+        self.ewma_latency = None
+        self.error_rate = 0.0
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.cooldown = cooldown
+        self.open_until = 0.0
+
+    @property
+    def available(self) -> bool:
+        """Whether the circuit breaker lets requests through (closed, or open with its cooldown passed)"""
+        return time.monotonic() >= self.open_until
+
+    @property
+    def score(self) -> float:
+        """Lower is better - endpoints without samples score 0, so every endpoint is tried early on"""
+        if self.ewma_latency is None:
+            return 0.0
+        return self.ewma_latency * (1 + 10 * self.error_rate)
+
+    def record_success(self, latency: float) -> None:
+        self.requests += 1
+        self.ewma_latency = latency if self.ewma_latency is None else \
+            self.smoothing * latency + (1 - self.smoothing) * self.ewma_latency
+        self.error_rate *= (1 - self.smoothing)
+        self.consecutive_failures = 0
+        self.cooldown = self.base_cooldown
+        self.open_until = 0.0
+
+    def record_failure(self) -> None:
+        self.requests += 1
+        self.failures += 1
+        self.error_rate = self.smoothing + (1 - self.smoothing) * self.error_rate
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= self.failure_threshold:
+            if self.open_until > 0:  # The trial request of an open breaker failed
+                self.cooldown = min(self.cooldown * 2, self.max_cooldown)
+            self.open_until = time.monotonic() + self.cooldown
+            print(f"RPC endpoint {self.url} failed {self.consecutive_failures} times in a row - skipping it for "
+                  f"{self.cooldown:.0f} seconds")
+
+    def stats(self) -> dict:
+        return {"url": self.url, "ewma_latency": self.ewma_latency, "error_rate": self.error_rate,
+                "requests": self.requests, "failures": self.failures, "available": self.available}
+
+
+"""---------------------------------------------- ROUTED RPC PROVIDER -----------------------------------------------"""
+class RoutedHTTPProvider(JSONBaseProvider):
+    """
+    web3 provider spreading the requests of one client over a pool of RPC endpoints of the same network.
+
+    - Reads go to the available endpoint with the best score (EWMA latency weighted by the error rate), and fail over
+      to the next best endpoint on connection errors, timeouts, HTTP errors and rate limit responses.
+    - Transactions and the reads they depend on (PINNED_METHODS, e.g. nonces) always go to the same pinned endpoint,
+      so that a pending transaction is seen by the node it was sent to. The pin only moves when that endpoint fails.
+    - JSON-RPC errors of the request itself (e.g. a reverted eth_call) are returned as-is, without failing over.
+    - With a HedgePolicy, idempotent reads that have not answered within the policy's delay are sent again to the
+      next best endpoint (or the same one, if there is only one), and the first answer wins (see ./hedging.py).
+    """
+    PINNED_METHODS = frozenset({"eth_sendRawTransaction", "eth_sendTransaction", "eth_getTransactionCount",
+                                "eth_estimateGas"})
+    RATE_LIMIT_ERROR_CODES = (-32005, 429)
+    RATE_LIMIT_MESSAGES = ("rate limit", "too many requests", "limit exceeded", "capacity")
+
+    def __init__(self, rpc_urls: list, transport: HTTPTransport = None, hedge_policy: HedgePolicy = None,
+                 **endpoint_kwargs):
+        """
+        Parameters:
+            rpc_urls: The RPC URLs of the endpoints - the first one is the initially pinned endpoint
+
+            transport: The HTTPTransport every endpoint sends its requests on (see ./transport.py)
+
+            hedge_policy: Enables hedged reads if set (see ./hedging.py)
+
+            endpoint_kwargs: Passed to every RPCEndpoint (smoothing, failure_threshold, cooldown, max_cooldown)
+        """
+        super().__init__()
+        if len(rpc_urls) == 0:
+            raise ValueError("RoutedHTTPProvider requires at least one RPC URL")
+        self.transport = HTTPTransport() if transport is None else transport
+        self.endpoints = [RPCEndpoint(url, self.transport.provider(url), **endpoint_kwargs) for url in rpc_urls]
+        self.pinned = self.endpoints[0]
+        self.hedge_policy = hedge_policy
+        self._hedge_executor = None
+        self._lock = threading.Lock()
+
+    def __str__(self) -> str:
+        return f"Routed RPC connection to {len(self.endpoints)} endpoints"
+
+    @property
+    def endpoint_uri(self) -> str:
+        return self.pinned.url
+
+    def ranked_endpoints(self) -> list:
+        """The available endpoints, best score first (or every endpoint, if all circuit breakers are open)"""
+        with self._lock:
+            available = [endpoint for endpoint in self.endpoints if endpoint.available]
+            return sorted(available or self.endpoints, key=lambda endpoint: endpoint.score)
+
+    def endpoint_stats(self) -> list:
+        """The health statistics of every endpoint"""
+        with self._lock:
+            return [endpoint.stats() for endpoint in self.endpoints]
+
+    def make_request(self, method, params):
+        if method in self.PINNED_METHODS:
+            with self._lock:
+                pinned = self.pinned
+            ranked = [endpoint for endpoint in self.ranked_endpoints() if endpoint is not pinned]
+            candidates = [pinned] + ranked if pinned.available or not ranked else ranked
+        else:
+            candidates = self.ranked_endpoints()
+            if self.hedge_policy is not None and method in self.hedge_policy.HEDGED_METHODS:
+                return self._make_hedged_request(method, params, candidates)
+        return self._make_request_with_failover(method, params, candidates)
+
+    def _make_request_with_failover(self, method, params, candidates: list):
+        last_error = None
+        for endpoint in candidates:
+            try:
+                response = self.request_endpoint(endpoint, method, params)
+            except Exception as exc:
+                last_error = exc
+                continue
+            if method in self.PINNED_METHODS and endpoint is not self.pinned:
+                with self._lock:
+                    print(f"Pinning transactions to RPC endpoint {endpoint.url}")
+                    self.pinned = endpoint
+            return response
+        raise ConnectionError(f"All {len(candidates)} RPC endpoints failed for {method} - Last error: {last_error}")
+
+    def _make_hedged_request(self, method, params, candidates: list):
+        """
+        Sends the read to the best endpoint and, if it has not answered after the hedge delay (and the hedge budget
+        allows it), to the next best endpoint too. Returns the first successful answer, and falls back to the other
+        endpoints one by one if both fail.
+        """
+        policy = self.hedge_policy
+        policy.start_request()
+        with self._lock:
+            if self._hedge_executor is None:
+                self._hedge_executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="aave-hedged-read")
+
+        start = time.monotonic()
+        primary = candidates[0]
+        original = self._hedge_executor.submit(self.request_endpoint, primary, method, params)
+        # The response time of the original request is recorded even if the hedge wins, so that the hedge delay
+        # follows the true latency distribution instead of the hedged one
+        def record_latency(future):
+            if future.exception() is None:
+                policy.record(method, time.monotonic() - start)
+        original.add_done_callback(record_latency)
+
+        sent = [primary]
+        pending = {original}
+        done, _ = wait(pending, timeout=policy.delay(method))
+        if not done and policy.try_hedge():
+            backup = candidates[1] if len(candidates) > 1 else primary
+            pending.add(self._hedge_executor.submit(self.request_endpoint, backup, method, params))
+            sent.append(backup)
+
+        errors = []
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is not original:
+                        policy.record_hedge_win()
+                    return future.result()
+                errors.append(future.exception())
+
+        # Fail over to the endpoints that were not sent the request (including the backup if no hedge was sent)
+        remaining = [endpoint for endpoint in candidates if not any(endpoint is tried for tried in sent)]
+        if len(remaining) == 0:
+            raise ConnectionError(f"All RPC endpoints failed for {method} - Last error: {errors[-1]}")
+        return self._make_request_with_failover(method, params, remaining)
+
+    def request_endpoint(self, endpoint: RPCEndpoint, method, params):
+        """Sends the request to one endpoint and records its latency or failure"""
+        start = time.monotonic()
+        try:
+            response = endpoint.provider.make_request(method, params)
+        except Exception:
+            with self._lock:
+                endpoint.record_failure()
+            raise
+        if self._is_rate_limited(response):
+            with self._lock:
+                endpoint.record_failure()
+            raise ConnectionError(f"RPC endpoint {endpoint.url} is rate limited: {response['error']}")
+        with self._lock:
+            endpoint.record_success(time.monotonic() - start)
+        return response
+
+    @classmethod
+    def _is_rate_limited(cls, response: dict) -> bool:
+        error = response.get("error") if isinstance(response, dict) else None
+        if not isinstance(error, dict):
+            return False
+        message = str(error.get("message", "")).lower()
+        return error.get("code") in cls.RATE_LIMIT_ERROR_CODES or any(text in message
+                                                                      for text in cls.RATE_LIMIT_MESSAGES)
+
+    def isConnected(self) -> bool:
+        return any(endpoint.provider.isConnected() for endpoint in self.endpoints)
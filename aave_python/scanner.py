@@ -0,0 +1,167 @@
+from dataclasses import dataclass
+import concurrent.futures
+import threading
+
+from .abi import ABIReference
+from .contracts import get_contract_cache
+from .multicall import is_batch_size_error
+
+import numpy as np
+from eth_utils import function_abi_to_4byte_selector
+from web3 import Web3
+
+UINT256_MAX = 2 ** 256 - 1
+
+
+"""------------------------------------------- Account Scan Result Arrays -------------------------------------------"""
+@dataclass(frozen=True)
+class AccountScan:
+    """
+    getUserAccountData() of many accounts at one block, one array element per scanned address (in input order).
+    Units match AccountState (./risk.py): ETH amounts, LTV / liquidation threshold as fractions and np.inf health
+    factors for accounts without debt. Accounts whose call failed have 'success' False and NaN values.
+    """
+    block_number: int
+    addresses: np.ndarray
+    success: np.ndarray
+    total_collateral_eth: np.ndarray
+    total_debt_eth: np.ndarray
+    available_borrows_eth: np.ndarray
+    current_liquidation_threshold: np.ndarray
+    ltv: np.ndarray
+    health_factor: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.addresses)
+
+    def below(self, health_factor: float = 1.0) -> np.ndarray:
+        """Returns the addresses whose health factor is below the passed value (default: liquidatable accounts)"""
+        return self.addresses[self.health_factor < health_factor]
+
+
+"""------------------------------------------ MASS ACCOUNT DATA SCANNER ---------------------------------------------"""
+class AccountScanner:
+    """
+    Watch-only scanner that reads LendingPool.getUserAccountData() for thousands of addresses through Multicall3.
+
+    - Every batch is one tryAggregate eth_call sent with the 'gas_cap' gas limit, and the batch size is calibrated
+      from an eth_estimateGas of a sample batch so that a full batch stays under the cap.
+    - Batches that still fail because of their size are split in half (and the smaller size is kept), the same way as
+      Multicall. Other errors (timeouts, rate limits, connection resets) are raised.
+    - Batches run concurrently on 'max_workers' threads, all pinned to the same block.
+    - Calldata is built and return data is parsed directly (getUserAccountData takes one address and returns six
+      uint256 values), avoiding per-call ABI codec overhead.
+
+    Usage:
+        scanner = aave_client.get_account_scanner()
+        scan = scanner.scan(borrower_addresses)
+        at_risk = scan.addresses[scan.health_factor < 1.05]
+    """
+    def __init__(self, w3: Web3, lending_pool_address: str, multicall_address: str, gas_cap: int = 50_000_000,
+                 max_workers: int = 8, max_batch_size: int = 2000):
+        self.w3 = w3
+        self.lending_pool_address = Web3.toChecksumAddress(lending_pool_address)
+        self.gas_cap = gas_cap
+        self.max_workers = max_workers
+        self.max_batch_size = max_batch_size
+        self.batch_size = None  # Calibrated on the first scan
+
+        self._try_aggregate_function = get_contract_cache(self.w3).function(multicall_address,
+                                                                            ABIReference.multicall3_abi,
+                                                                            "tryAggregate")
+        fn_abi = [entry for entry in ABIReference.lending_pool_abi
+                  if entry.get("type") == "function" and entry.get("name") == "getUserAccountData"][0]
+        self._selector = function_abi_to_4byte_selector(fn_abi)
+        self._lock = threading.Lock()
+
+    def scan(self, addresses: list[str], block_identifier="latest") -> AccountScan:
+        """
+        Reads the account data of every address at one block.
+
+        Parameters:
+            addresses: The wallet addresses to scan (hex strings)
+
+            block_identifier: The block number or block tag to read at, resolved once so every batch reads the same block
+
+        Returns:
+            The AccountScan object with one NumPy array per getUserAccountData() field
+        """
+        if isinstance(block_identifier, int):
+            block_number = block_identifier
+        elif block_identifier == "latest":
+            block_number = self.w3.eth.block_number
+        else:
+            block_number = self.w3.eth.get_block(block_identifier)["number"]
+
+        calldata = [self._selector + bytes(12) + bytes.fromhex(address[2:]) for address in addresses]
+        if self.batch_size is None and len(calldata) > 0:
+            self.calibrate(calldata[:50], block_number)
+
+        values = np.full((len(calldata), 6), np.nan)
+        batches = [(start, calldata[start:start + self.batch_size])
+                   for start in range(0, len(calldata), self.batch_size)]
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(self._scan_batch, batch, block_number) for _, batch in batches]
+            for (start, batch), future in zip(batches, futures):
+                values[start:start + len(batch)] = future.result()
+
+        success = ~np.isnan(values[:, 0])
+        values[:, :3] /= 1e18
+        values[:, 3:5] /= 1e4
+        return AccountScan(block_number=block_number,
+                           addresses=np.array(addresses, dtype=object),
+                           success=success,
+                           total_collateral_eth=values[:, 0],
+                           total_debt_eth=values[:, 1],
+                           available_borrows_eth=values[:, 2],
+                           current_liquidation_threshold=values[:, 3],
+                           ltv=values[:, 4],
+                           health_factor=values[:, 5] / 1e18)
+
+    def calibrate(self, sample_calldata: list[bytes], block_identifier="latest") -> int:
+        """
+        Sets the batch size from the estimated gas of a tryAggregate over the sample, leaving a 20% margin under the
+        gas cap. Falls back to the maximum batch size if the estimate fails.
+
+        Returns:
+            The new batch size
+        """
+        try:
+            transaction = {"to": self._try_aggregate_function.address,
+                           "data": self._encode_batch(sample_calldata), "gas": self.gas_cap}
+            gas_per_call = self.w3.eth.estimate_gas(transaction, block_identifier) / len(sample_calldata)
+            batch_size = int(self.gas_cap * 0.8 / gas_per_call)
+        except Exception:
+            batch_size = self.max_batch_size
+
+        with self._lock:
+            self.batch_size = max(1, min(self.max_batch_size, batch_size))
+        return self.batch_size
+
+    def _scan_batch(self, batch: list[bytes], block_number: int) -> np.ndarray:
+        try:
+            return_data = self._try_aggregate_function.decode(self.w3.eth.call(
+                {"to": self._try_aggregate_function.address, "data": self._encode_batch(batch), "gas": self.gas_cap},
+                block_number))
+        except Exception as exc:
+            if not is_batch_size_error(exc):
+                raise
+            if len(batch) == 1:
+                return np.full((1, 6), np.nan)
+
+            # Shrink the batch size for all future batches and retry each half
+            half = len(batch) // 2
+            with self._lock:
+                self.batch_size = max(1, min(self.batch_size, half))
+            return np.vstack([self._scan_batch(batch[:half], block_number),
+                              self._scan_batch(batch[half:], block_number)])
+
+        values = np.full((len(batch), 6), np.nan)
+        for i, (success, data) in enumerate(return_data):
+            if success and len(data) == 192:
+                fields = [int.from_bytes(data[j:j + 32], "big") for j in range(0, 192, 32)]
+                values[i] = fields[:5] + [np.inf if fields[5] == UINT256_MAX else fields[5]]
+        return values
+
+    def _encode_batch(self, batch: list[bytes]) -> str:
+        return self._try_aggregate_function.encode(False, [(self.lending_pool_address, data) for data in batch])
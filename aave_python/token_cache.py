@@ -0,0 +1,59 @@
+from dataclasses import asdict
+import json
+import os
+
+from .models import ReserveToken
+
+
+"""---------------------------------------- ON-DISK RESERVE TOKEN CACHE ----------------------------------------"""
+class ReserveTokenCache:
+    """
+    Versioned on-disk cache of the ReserveToken records for one market, keyed by chain id and data provider address.
+
+    The cache is only trusted for reserves that are still listed by the data provider (see
+    AaveClient._store_reserve_tokens), so new reserves are fetched incrementally and removed ones are dropped.
+    """
+    VERSION = 1
+
+    def __init__(self, chain_id: int, data_provider_address: str, cache_dir: str = None):
+        self.chain_id = chain_id
+        self.data_provider_address = data_provider_address.lower()
+        self.cache_dir = cache_dir if cache_dir is not None else self.default_cache_dir()
+        self.path = os.path.join(self.cache_dir, f"reserve_tokens_{chain_id}_{self.data_provider_address}.json")
+
+    @staticmethod
+    def default_cache_dir() -> str:
+        """$AAVE_PYTHON_CACHE_DIR if set, otherwise ~/.cache/aave_python"""
+        return os.getenv("AAVE_PYTHON_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "aave_python"))
+
+    def load(self) -> list[ReserveToken]:
+        """Returns the cached ReserveToken objects, or an empty list if the cache is missing, stale or unreadable"""
+        try:
+            with open(self.path) as infile:
+                cache = json.load(infile)
+            if cache["version"] != self.VERSION or cache["chain_id"] != self.chain_id \
+                    or cache["data_provider"] != self.data_provider_address:
+                return []
+            return [ReserveToken(**token_data) for token_data in cache["tokens"]]
+        except (OSError, ValueError, KeyError, TypeError):
+            return []
+
+    def save(self, tokens: list[ReserveToken]) -> None:
+        """Atomically replaces the cache file with the passed ReserveToken objects"""
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            temp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(temp_path, "w") as outfile:
+                json.dump({"version": self.VERSION, "chain_id": self.chain_id,
+                           "data_provider": self.data_provider_address,
+                           "tokens": [asdict(token) for token in tokens]}, outfile, indent=2)
+            os.replace(temp_path, self.path)
+        except OSError as exc:
+            print(f"Could not write reserve token cache to {self.path} - Error: {exc}")
+
+    def clear(self) -> None:
+        """Deletes the cache file"""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,147 @@
+from contextlib import contextmanager
+
+import requests
+from requests.adapters import HTTPAdapter
+from web3.datastructures import NamedElementOnion
+from web3.middleware import http_retry_request_middleware
+from web3.providers.base import JSONBaseProvider
+
+
+"""------------------------------------------------- HTTP TRANSPORT -------------------------------------------------"""
+class HTTPTransport:
+    """
+    One keep-alive connection pool shared by every HTTP request of the client: JSON-RPC requests to the node, the Aave
+    tokenlist and Etherscan ABI fetches. Reusing pooled connections skips the TCP and TLS handshakes of all but the
+    first request to each host.
+
+    Responses are requested gzip-compressed. With http2=True, requests are multiplexed over HTTP/2 connections with
+    httpx (optional dependency - pip install httpx[http2]), otherwise a requests.Session is used. Either way, failures
+    are raised as requests exceptions (ConnectionError, Timeout, HTTPError).
+    """
+    def __init__(self, pool_connections: int = 10, pool_maxsize: int = 20, connect_timeout: float = 5,
+                 read_timeout: float = 30, max_retries: int = 0, http2: bool = False, headers: dict = None):
+        """
+        Parameters:
+            pool_connections: The number of hosts to keep connection pools for
+
+            pool_maxsize: The maximum number of connections kept alive per host (e.g. the number of threads sending
+                          requests concurrently)
+
+            connect_timeout: Seconds to wait for a connection to be established
+
+            read_timeout: Seconds to wait for a response
+
+            max_retries: How many times failed connections are retried (requests are never retried once sent)
+
+            http2: Whether to use HTTP/2 (requires httpx[http2])
+
+            headers: Extra headers sent with every request
+        """
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.http2 = http2
+        self.headers = {"Accept-Encoding": "gzip, deflate", "Connection": "keep-alive", **(headers or {})}
+
+        if http2:
+            try:
+                import httpx
+            except ImportError:
+                raise ImportError("HTTP/2 transport requires httpx - Install it with: pip install httpx[http2]")
+            # httpx ignores the client's 'limits' when a custom transport is passed, so they go to the transport
+            limits = httpx.Limits(max_connections=pool_connections * pool_maxsize,
+                                  max_keepalive_connections=pool_maxsize)
+            self.session = httpx.Client(http2=True, headers=self.headers,
+                                        timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+                                        transport=httpx.HTTPTransport(http2=True, limits=limits, retries=max_retries))
+        else:
+            self.session = requests.Session()
+            self.session.headers.update(self.headers)
+            adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize,
+                                  max_retries=max_retries)
+            self.session.mount("https://", adapter)
+            self.session.mount("http://", adapter)
+
+    @property
+    def timeout(self) -> tuple:
+        """The (connect, read) timeouts of the transport"""
+        return self.connect_timeout, self.read_timeout
+
+    def get(self, url: str, **kwargs):
+        """Sends a GET request on the pooled session"""
+        if self.http2:
+            with self._httpx_errors():
+                response = self.session.get(url, **kwargs)
+                response.raise_for_status()
+            return response
+        response = self.session.get(url, timeout=self.timeout, **kwargs)
+        response.raise_for_status()
+        return response
+
+    def post(self, url: str, data: bytes, **kwargs):
+        """Sends a POST request on the pooled session"""
+        if self.http2:
+            with self._httpx_errors():
+                response = self.session.post(url, content=data, **kwargs)
+                response.raise_for_status()
+            return response
+        response = self.session.post(url, data=data, timeout=self.timeout, **kwargs)
+        response.raise_for_status()
+        return response
+
+    @staticmethod
+    @contextmanager
+    def _httpx_errors():
+        """Raises httpx errors as the equivalent requests exceptions, which web3's retry middleware handles"""
+        import httpx
+        try:
+            yield
+        except httpx.TimeoutException as exc:
+            raise requests.Timeout(str(exc)) from exc
+        except httpx.HTTPStatusError as exc:
+            raise requests.HTTPError(str(exc)) from exc
+        except httpx.TransportError as exc:
+            raise requests.ConnectionError(str(exc)) from exc
+
+    def get_json(self, url: str, **kwargs):
+        """Sends a GET request on the pooled session and decodes the JSON response"""
+        return self.get(url, **kwargs).json()
+
+    def provider(self, rpc_url: str):
+        """
+        Returns a web3 HTTP provider for the RPC URL sending its requests on this transport. web3's own HTTPProvider is
+        not used, since it caches a passed session per thread and gives every other thread a default session.
+        """
+        return PooledHTTPProvider(rpc_url, self)
+
+    def close(self) -> None:
+        """Closes the pooled connections"""
+        self.session.close()
+
+
+class PooledHTTPProvider(JSONBaseProvider):
+    """
+    web3 JSON-RPC provider sending the requests of every thread on the pooled session of an HTTPTransport. Like web3's
+    HTTPProvider, idempotent requests that fail with a connection error, timeout or HTTP error are retried by web3's
+    http_retry_request_middleware.
+    """
+    _middlewares = NamedElementOnion([(http_retry_request_middleware, "http_retry_request")])
+
+    def __init__(self, endpoint_uri: str, transport: HTTPTransport):
+        super().__init__()
+        self.endpoint_uri = endpoint_uri
+        self.transport = transport
+
+    def __str__(self) -> str:
+        return f"RPC connection {self.endpoint_uri}"
+
+    def make_request(self, method, params):
+        request_data = self.encode_rpc_request(method, params)
+        response = self.transport.post(self.endpoint_uri, request_data, headers={"Content-Type": "application/json"})
+        return self.decode_rpc_response(response.content)
+
+    def isConnected(self) -> bool:
+        try:
+            response = self.make_request("web3_clientVersion", [])
+        except Exception:
+            return False
+        return "jsonrpc" in response and "error" not in response
@@ -0,0 +1,32 @@
+import pytest
+
+from aave_python.market import RAY, MarketSnapshot
+from aave_python.models import ReserveToken
+
+
+def reserve_token(symbol: str, address: str, decimals: int) -> ReserveToken:
+    """A ReserveToken whose aToken and debt token addresses are the underlying address starting with a, b and c"""
+    return ReserveToken(symbol=symbol, address=address, decimals=decimals, aTokenAddress=f"0xa{address[3:]}",
+                        aTokenSymbol=f"a{symbol}", stableDebtTokenAddress=f"0xb{address[3:]}",
+                        variableDebtTokenAddress=f"0xc{address[3:]}")
+
+
+@pytest.fixture
+def market() -> MarketSnapshot:
+    """WETH (1 ETH) and USDC (0.0005 ETH) reserves at block 100"""
+    tokens = [reserve_token("WETH", "0x000000000000000000000000000000000000e001", 18),
+              reserve_token("USDC", "0x000000000000000000000000000000000000e002", 6)]
+    reserve_data = [
+        # availableLiquidity, totalStableDebt, totalVariableDebt, liquidityRate, variableBorrowRate, stableBorrowRate,
+        # averageStableBorrowRate, liquidityIndex, variableBorrowIndex, lastUpdateTimestamp
+        (300 * 10 ** 18, 20 * 10 ** 18, 80 * 10 ** 18, RAY // 100, RAY * 3 // 100, RAY * 5 // 100, RAY * 4 // 100,
+         RAY * 11 // 10, RAY * 12 // 10, 1_700_000_000),
+        (0, 0, 0, 0, 0, 0, 0, RAY, RAY, 1_700_000_001),
+    ]
+    configuration_data = [
+        # decimals, ltv, liquidationThreshold, liquidationBonus, reserveFactor, usageAsCollateralEnabled,
+        # borrowingEnabled, stableBorrowRateEnabled, isActive, isFrozen
+        (18, 8000, 8250, 10500, 1000, True, True, True, True, False),
+        (6, 8000, 8500, 10500, 1000, True, True, False, True, True),
+    ]
+    return MarketSnapshot.from_reserve_data(100, tokens, reserve_data, configuration_data, [10 ** 18, 5 * 10 ** 14])
@@ -0,0 +1,91 @@
+from concurrent.futures import Future
+from types import SimpleNamespace
+
+import pytest
+
+from aave_python.allowances import UNLIMITED_ALLOWANCE, ApprovalPolicy
+from aave_python.client import AaveClient
+from aave_python.gas import GasLimitModel
+
+USDT = "0xdAC17F958D2ee523a2206206994597C13D831ec7"
+DAI = "0x6B175474E89094C44Da98b954EedeAC495271d0F"
+LENDING_POOL = "0x7d2768dE32b0b80b7a3454c06BdAc94A69DDc7A9"
+
+
+@pytest.mark.parametrize("mode, expected", [("exact", 100), ("buffered", 1000), ("unlimited", UNLIMITED_ALLOWANCE)])
+def test_approval_amounts(mode, expected):
+    assert ApprovalPolicy(mode, buffer_multiplier=10).approval_amount(100) == expected
+
+
+def test_invalid_policies_raise():
+    with pytest.raises(ValueError):
+        ApprovalPolicy("infinite")
+    with pytest.raises(ValueError):
+        ApprovalPolicy("buffered", buffer_multiplier=0.5)
+
+
+def test_only_nonzero_allowances_of_zero_first_tokens_are_reset():
+    policy = ApprovalPolicy("buffered")
+
+    assert policy.requires_reset(USDT, 5)
+    assert not policy.requires_reset(USDT, 0)
+    assert not policy.requires_reset(DAI, 5)
+    assert ApprovalPolicy(zero_first_tokens=[DAI]).requires_reset(DAI, 5)
+
+
+class StubAllowances:
+    def __init__(self, allowance: int):
+        self.allowance = allowance
+
+    def get(self, token_address, spender_address):
+        return self.allowance
+
+    def set(self, token_address, spender_address, allowance, tx_hash=None):
+        self.allowance = allowance
+
+
+class ApprovingClient(AaveClient):
+    lending_pool_contract = SimpleNamespace(address=LENDING_POOL)
+
+
+def approving_client(allowance: int) -> tuple:
+    """An AaveClient with only the parts submit_approve_erc20() uses, recording every (calldata, nonce) sent"""
+    sent = []
+    erc20 = SimpleNamespace(functions=SimpleNamespace(approve=lambda spender, amount: ("approve", amount)))
+
+    def send_transaction(function_call, nonce=None, gas_key=None):
+        sent.append((function_call, nonce))
+        return f"0x{len(sent):064x}"
+
+    receipt = Future()
+    receipt.set_result({"status": 1, "gasUsed": 46_000})
+    client = ApprovingClient.__new__(ApprovingClient)
+    client.__dict__.update(approval_policy=ApprovalPolicy("buffered", buffer_multiplier=10),
+                           allowances=StubAllowances(allowance), gas_limits=GasLimitModel(), timeout=1,
+                           receipts=SimpleNamespace(watch=lambda tx_hash, timeout: receipt),
+                           _get_erc20_contract=lambda address: erc20, _send_transaction=send_transaction)
+    return client, sent
+
+
+def test_zero_first_token_is_approved_to_zero_before_a_new_amount():
+    client, sent = approving_client(allowance=5)
+    approval, next_nonce = client._submit_approval(USDT, 100, nonce=7)
+
+    assert sent == [(("approve", 0), 7), (("approve", 1000), 8)]
+    assert next_nonce == 9
+    assert client.allowances.allowance == 1000
+
+
+def test_other_tokens_are_approved_directly():
+    client, sent = approving_client(allowance=5)
+    approval, next_nonce = client._submit_approval(DAI, 100, nonce=7)
+
+    assert sent == [(("approve", 1000), 7)]
+    assert next_nonce == 8
+
+
+def test_sufficient_allowance_sends_nothing():
+    client, sent = approving_client(allowance=1000)
+
+    assert client._submit_approval(USDT, 100, nonce=7) == (None, 7)
+    assert sent == []
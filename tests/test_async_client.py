@@ -0,0 +1,27 @@
+import asyncio
+from types import SimpleNamespace
+
+from aave_python.async_client import AsyncAaveClient
+
+
+class StubAsyncEth:
+    def __init__(self, transaction_count: int):
+        self.transaction_count = transaction_count
+
+    async def get_transaction_count(self, address):
+        return self.transaction_count
+
+
+def async_client(transaction_count: int) -> AsyncAaveClient:
+    client = AsyncAaveClient.__new__(AsyncAaveClient)
+    client.w3 = SimpleNamespace(eth=StubAsyncEth(transaction_count))
+    client.wallet_address = "0x000000000000000000000000000000000000abcd"
+    return client
+
+
+def test_explicit_nonce_zero_is_used():
+    assert asyncio.run(async_client(5)._get_nonce(0)) == 0
+
+
+def test_missing_nonce_is_read_from_the_chain():
+    assert asyncio.run(async_client(5)._get_nonce()) == 5
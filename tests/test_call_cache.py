@@ -0,0 +1,81 @@
+from types import SimpleNamespace
+
+from aave_python.call_cache import BlockCallCache
+from aave_python.heads import BlockHead
+
+CALL = {"to": "0x000000000000000000000000000000000000abcd", "data": "0x1234"}
+
+
+class StubHeads:
+    def __init__(self, number: int = None):
+        self.running = number is not None
+        self.head = None if number is None else BlockHead(number=number, hash="0x", timestamp=0, received_at=0)
+
+
+def cached_make_request(cache: BlockCallCache):
+    sent = []
+
+    def make_request(method, params):
+        sent.append((method, params))
+        return {"jsonrpc": "2.0", "id": 1, "result": f"0x{len(sent):064x}"}
+    return cache.middleware(make_request, None), sent
+
+
+def test_latest_read_is_sent_for_the_tracked_head():
+    cache = BlockCallCache(StubHeads(100))
+    make_request, sent = cached_make_request(cache)
+    make_request("eth_call", (CALL, "latest"))
+
+    assert sent == [("eth_call", (CALL, hex(100)))]
+
+
+def test_latest_and_explicit_reads_share_one_result():
+    cache = BlockCallCache(StubHeads(100))
+    make_request, sent = cached_make_request(cache)
+    latest = make_request("eth_call", (CALL, "latest"))
+    explicit = make_request("eth_call", (CALL, hex(100)))
+
+    assert latest == explicit
+    assert len(sent) == 1
+    assert cache.stats()["hits"] == 1
+
+
+def test_latest_read_without_head_is_not_cached():
+    cache = BlockCallCache(StubHeads())
+    make_request, sent = cached_make_request(cache)
+    make_request("eth_call", (CALL, "latest"))
+    make_request("eth_call", (CALL, "latest"))
+
+    assert sent == [("eth_call", (CALL, "latest"))] * 2
+    assert len(cache) == 0
+
+
+def test_pending_reads_and_errors_are_not_cached():
+    cache = BlockCallCache(StubHeads(100))
+    make_request, sent = cached_make_request(cache)
+    make_request("eth_call", (CALL, "pending"))
+    failing = cache.middleware(lambda method, params: {"jsonrpc": "2.0", "id": 1, "error": {"code": 3}}, None)
+    failing("eth_call", (CALL, hex(5)))
+
+    assert len(cache) == 0
+
+
+def test_lru_eviction_and_clear():
+    cache = BlockCallCache(StubHeads(100), max_entries=2)
+    make_request, sent = cached_make_request(cache)
+    for block_number in (1, 2, 3):
+        make_request("eth_call", (CALL, hex(block_number)))
+
+    assert len(cache) == 2
+    assert cache.stats()["evictions"] == 1
+    cache.clear(SimpleNamespace(number=101))
+    assert len(cache) == 0
+
+
+def test_chain_id_is_requested_once():
+    cache = BlockCallCache()
+    make_request, sent = cached_make_request(cache)
+    make_request("eth_chainId", ())
+    make_request("eth_chainId", ())
+
+    assert len(sent) == 1
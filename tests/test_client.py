@@ -0,0 +1,204 @@
+from collections import OrderedDict
+from types import SimpleNamespace
+import threading
+
+from web3 import Web3
+
+from aave_python.client import AaveClient
+from aave_python.contracts import ContractCache
+from aave_python.models import ReserveToken
+
+from conftest import reserve_token
+
+LENDING_POOL = "0x7d2768dE32b0b80b7a3454c06BdAc94A69DDc7A9"
+PRICE_ORACLE = "0xA50ba011c48153De246E5192C8f9258A2ba79Ca9"
+WALLET = "0x000000000000000000000000000000000000bEEF"
+WETH = reserve_token("WETH", "0x000000000000000000000000000000000000e001", 18)
+USDC = reserve_token("USDC", "0x000000000000000000000000000000000000e002", 6)
+LINK = "0x000000000000000000000000000000000000E003"
+DATA_PROVIDER = "0x057835Ad21a177dbdd3090bB1CAE03EaCF78Fc6d"
+PRICES = {WETH.address: 10 ** 18, USDC.address: 5 * 10 ** 14, LINK.lower(): 6 * 10 ** 15}
+
+
+class StubOracleEth:
+    """Answers getAssetsPrices(address[]) eth_calls from PRICES, recording the (assets, block) of each call"""
+    def __init__(self):
+        self.calls = []
+
+    def call(self, transaction, block_identifier):
+        assert transaction["to"] == PRICE_ORACLE
+        assets = Web3().codec.decode_abi(["address[]"], bytes.fromhex(transaction["data"][10:]))[0]
+        self.calls.append(([asset.lower() for asset in assets], block_identifier))
+        return Web3().codec.encode_abi(["uint256[]"], [[PRICES[asset.lower()] for asset in assets]])
+
+
+def pricing_client() -> AaveClient:
+    """An AaveClient with only the parts get_asset_prices() uses"""
+    client = AaveClient.__new__(AaveClient)
+    client.__dict__.update(contracts=ContractCache(SimpleNamespace(eth=StubOracleEth(), codec=Web3().codec)),
+                           addresses=SimpleNamespace(get=lambda name: PRICE_ORACLE))
+    return client
+
+
+def test_every_price_is_read_in_one_call():
+    client = pricing_client()
+    prices = client.get_asset_prices([WETH, USDC, LINK], block_identifier=100)
+
+    assert prices == {"WETH": 1.0, "USDC": 0.0005, LINK: 0.006}
+    assert client.contracts.w3.eth.calls == [([WETH.address, USDC.address, LINK.lower()], 100)]
+
+
+def test_prices_as_list_keep_the_token_order():
+    client = pricing_client()
+
+    assert client.get_asset_prices([LINK, WETH], as_dict=False) == [0.006, 1.0]
+    assert client.get_asset_prices([], as_dict=False) == []
+    assert client.get_asset_prices([]) == {}
+    assert len(client.contracts.w3.eth.calls) == 1
+
+
+def test_pair_price_reads_both_legs_in_one_call():
+    client = pricing_client()
+
+    assert client.get_asset_price(WETH.address, USDC.address) == 2000
+    assert client.get_asset_price(USDC.address) == 0.0005
+    assert len(client.contracts.w3.eth.calls) == 2
+
+
+def token_addresses(address: str) -> list:
+    """The aToken, stable debt token and variable debt token addresses that the stubs list for a reserve"""
+    return [f"0x{prefix}{address[3:]}" for prefix in "abc"]
+
+
+def token_symbol(address: str) -> str:
+    prefix = {"a": "a", "b": "stableDebt", "c": "variableDebt"}[address[2].lower()]
+    return prefix + {"1": "WETH", "2": "USDC"}[address[-1]]
+
+
+class StubMulticall:
+    """Answers aggregated decimals(), getReserveTokensAddresses() and symbol() calls, recording each round's size"""
+    def __init__(self, available: bool = True):
+        self.available = available
+        self.rounds = []
+
+    def is_available(self) -> bool:
+        return self.available
+
+    def aggregate(self, calls: list) -> list:
+        self.rounds.append(len(calls))
+        answers = {"decimals": lambda call: 18 if call.address.endswith("1") else 6,
+                   "getReserveTokensAddresses": lambda call: token_addresses(call.args[0]),
+                   "symbol": lambda call: token_symbol(call.address)}
+        return [answers[call.fn_name](call) for call in calls]
+
+
+def discovery_client(multicall: StubMulticall) -> AaveClient:
+    """An AaveClient with only the parts _fetch_reserve_tokens() uses, recording the thread of each direct read"""
+    threads = set()
+
+    def read(value):
+        def call():
+            threads.add(threading.get_ident())
+            return value
+        return SimpleNamespace(call=call)
+
+    def erc20_contract(address):
+        return SimpleNamespace(functions=SimpleNamespace(decimals=lambda: read(18 if address.endswith("1") else 6),
+                                                         symbol=lambda: read(token_symbol(address))))
+
+    data_provider = SimpleNamespace(functions=SimpleNamespace(
+        getReserveTokensAddresses=lambda address: read(token_addresses(address))))
+    client = AaveClient.__new__(AaveClient)
+    client.__dict__.update(threads=threads, multicall=multicall, contracts=ContractCache(Web3()),
+                           active_network=SimpleNamespace(protocol_data_provider=DATA_PROVIDER),
+                           data_provider_contract=data_provider, _get_erc20_contract=erc20_contract)
+    return client
+
+
+EXPECTED_TOKENS = [ReserveToken("WETH", WETH.address, 18, aTokenAddress=WETH.aTokenAddress, aTokenSymbol="aWETH",
+                                stableDebtTokenAddress=WETH.stableDebtTokenAddress,
+                                variableDebtTokenAddress=WETH.variableDebtTokenAddress,
+                                stableDebtTokenSymbol="stableDebtWETH", variableDebtTokenSymbol="variableDebtWETH"),
+                   ReserveToken("USDC", USDC.address, 6, aTokenAddress=USDC.aTokenAddress, aTokenSymbol="aUSDC",
+                                stableDebtTokenAddress=USDC.stableDebtTokenAddress,
+                                variableDebtTokenAddress=USDC.variableDebtTokenAddress,
+                                stableDebtTokenSymbol="stableDebtUSDC", variableDebtTokenSymbol="variableDebtUSDC")]
+
+
+def test_reserve_tokens_are_discovered_in_two_rounds():
+    client = discovery_client(StubMulticall())
+
+    assert client._fetch_reserve_tokens([("WETH", WETH.address), ("USDC", USDC.address)]) == EXPECTED_TOKENS
+    # decimals() and getReserveTokensAddresses() of each reserve, then the symbol() of its 3 tokens
+    assert client.multicall.rounds == [4, 6]
+    assert client._fetch_reserve_tokens([]) == []
+
+
+def test_reserve_tokens_are_fetched_in_a_thread_pool_without_multicall():
+    client = discovery_client(StubMulticall(available=False))
+
+    assert client._fetch_reserve_tokens([("WETH", WETH.address), ("USDC", USDC.address)]) == EXPECTED_TOKENS
+    assert client.multicall.rounds == []
+    assert threading.get_ident() not in client.threads
+
+
+class StubSnapshotMulticall:
+    """Answers the aggregated reads of AaveClient.snapshot(), recording the (number of calls, block) of each batch"""
+    def __init__(self):
+        self.batches = []
+
+    def is_available(self) -> bool:
+        return True
+
+    def aggregate(self, calls: list, block_identifier="latest") -> list:
+        self.batches.append((len(calls), block_identifier))
+        answers = {"getUserAccountData": lambda call: (300, 100, 140, 8250, 8000, 2 * 10 ** 18),
+                   "getAssetsPrices": lambda call: [PRICES[address.lower()] for address in call.args[0]],
+                   "getUserReserveData": lambda call: (int(call.args[0], 16),) + (0,) * 8,
+                   "getReserveData": lambda call: (block_identifier,) + (0,) * 9}
+        return [answers[call.fn_name](call) for call in calls]
+
+
+def snapshot_client(head: int = 100) -> AaveClient:
+    """An AaveClient with only the parts snapshot() uses, whose head tracker is at block 'head'"""
+    addresses = {"lending_pool": LENDING_POOL, "price_oracle": PRICE_ORACLE}
+    client = AaveClient.__new__(AaveClient)
+    client.__dict__.update(wallet_address=WALLET, multicall=StubSnapshotMulticall(), contracts=ContractCache(Web3()),
+                           active_network=SimpleNamespace(aave_tokens=[WETH, USDC],
+                                                          protocol_data_provider=DATA_PROVIDER),
+                           addresses=SimpleNamespace(get=addresses.get), heads=SimpleNamespace(block_number=head),
+                           _snapshots=OrderedDict())
+    return client
+
+
+def test_snapshot_reads_every_value_at_one_block():
+    client = snapshot_client(head=100)
+    snapshot = client.snapshot()
+
+    # getUserAccountData and getAssetsPrices, then getUserReserveData and getReserveData of each reserve
+    assert client.multicall.batches == [(6, 100)]
+    assert snapshot.block_number == 100
+    assert snapshot.health_factor == 2 * 10 ** 18
+    assert dict(snapshot.prices) == {"WETH": 1.0, "USDC": 0.0005}
+    assert snapshot.user_reserve_data["USDC"][0] == int(USDC.address, 16)
+    assert {data[0] for data in snapshot.reserve_data.values()} == {100}
+
+
+def test_snapshots_are_memoized_per_block_and_reserves():
+    client = snapshot_client(head=100)
+    latest = client.snapshot()
+
+    assert client.snapshot(100) is latest
+    assert client.snapshot(99) is not latest
+    assert list(client.snapshot(100, reserve_tokens=[USDC]).prices) == ["USDC"]
+    assert client.multicall.batches == [(6, 100), (6, 99), (4, 100)]
+
+
+def test_memoized_snapshots_are_bounded():
+    client = snapshot_client()
+    for block_number in range(20):
+        client.snapshot(block_number)
+    client.snapshot(19)
+
+    assert len(client._snapshots) == 16
+    assert len(client.multicall.batches) == 20
@@ -0,0 +1,102 @@
+from types import SimpleNamespace
+
+import pytest
+from web3 import Web3
+
+from aave_python.fees import SPEED_TIERS, FeeEstimator
+
+GWEI = Web3.toWei(1, "gwei")
+
+
+def fee_history(rewards: list, gas_used_ratios: list, base_fees: list, oldest_block: int = 100) -> dict:
+    return {"oldestBlock": oldest_block, "reward": rewards, "gasUsedRatio": gas_used_ratios,
+            "baseFeePerGas": base_fees}
+
+
+class StubEth:
+    def __init__(self, history: dict = None, error: Exception = None):
+        self.history = history
+        self.error = error
+        self.requests = 0
+        self.block_number = 100
+        self.gas_price = 30 * GWEI
+
+    def fee_history(self, block_count, newest_block, reward_percentiles):
+        self.requests += 1
+        if self.error is not None:
+            raise self.error
+        if list(reward_percentiles) != sorted(reward_percentiles):
+            raise ValueError({"code": -32602, "message": f"invalid reward percentile: {reward_percentiles}"})
+        if self.history is None:
+            raise ValueError({"code": -32601, "message": "the method eth_feeHistory does not exist"})
+        return self.history
+
+
+def test_priority_fees_are_medians_over_non_empty_blocks():
+    view = FeeEstimator.view_from_fee_history(fee_history(
+        # Columns are the 10th, 25th, 50th and 90th percentiles
+        rewards=[[1 * GWEI, 2 * GWEI, 3 * GWEI, 4 * GWEI],
+                 [100 * GWEI, 100 * GWEI, 100 * GWEI, 100 * GWEI],  # Empty block, ignored
+                 [1 * GWEI, 2 * GWEI, 5 * GWEI, 6 * GWEI],
+                 [0, 3 * GWEI, 4 * GWEI, 8 * GWEI]],
+        gas_used_ratios=[0.5, 0.0, 0.4, 0.9],
+        base_fees=[10 * GWEI, 11 * GWEI, 12 * GWEI, 13 * GWEI, 14 * GWEI]))
+
+    assert view.block_number == 103
+    assert view.base_fee_per_gas == 14 * GWEI
+    assert dict(view.priority_fees) == {"fast": 6 * GWEI, "medium": 4 * GWEI, "slow": 2 * GWEI, "glacial": GWEI}
+
+
+def test_priority_fees_have_a_floor_and_all_empty_blocks_are_used():
+    view = FeeEstimator.view_from_fee_history(fee_history(rewards=[[0, 0, 0, 0]] * 2, gas_used_ratios=[0.0, 0.0],
+                                                          base_fees=[GWEI] * 3))
+
+    assert set(view.priority_fees.values()) == {FeeEstimator.MIN_PRIORITY_FEE}
+
+
+@pytest.mark.parametrize("speed", list(SPEED_TIERS))
+def test_max_fee_covers_base_fee_growth(speed):
+    view = FeeEstimator.view_from_fee_history(fee_history(rewards=[[2 * GWEI] * 4], gas_used_ratios=[0.5],
+                                                          base_fees=[GWEI, 10 * GWEI]))
+    fees = view.transaction_fees(speed)
+
+    assert fees["maxPriorityFeePerGas"] == 2 * GWEI
+    assert fees["maxFeePerGas"] == int(10 * GWEI * SPEED_TIERS[speed].base_fee_multiplier) + 2 * GWEI
+
+
+def test_reward_percentiles_are_requested_in_ascending_order():
+    eth = StubEth(fee_history(rewards=[[GWEI, 2 * GWEI, 3 * GWEI, 4 * GWEI]], gas_used_ratios=[0.5],
+                              base_fees=[GWEI, GWEI]))
+    fees = FeeEstimator(SimpleNamespace(eth=eth), "fast").transaction_fees()
+
+    assert fees["maxPriorityFeePerGas"] == 4 * GWEI
+
+
+def test_fee_view_is_cached_until_invalidated():
+    eth = StubEth(fee_history(rewards=[[GWEI] * 4], gas_used_ratios=[0.5], base_fees=[GWEI, GWEI]))
+    estimator = FeeEstimator(SimpleNamespace(eth=eth), "fast", cache_ttl=60)
+    estimator.transaction_fees()
+    estimator.transaction_fees("slow")
+    assert eth.requests == 1
+
+    estimator.invalidate()
+    estimator.transaction_fees()
+    assert eth.requests == 2
+
+
+def test_networks_without_fee_history_use_legacy_gas_price():
+    estimator = FeeEstimator(SimpleNamespace(eth=StubEth()))
+
+    assert estimator.transaction_fees() == {"gasPrice": 30 * GWEI}
+
+
+def test_other_fee_history_errors_are_raised():
+    eth = StubEth(error=TimeoutError("read timed out"))
+
+    with pytest.raises(TimeoutError):
+        FeeEstimator(SimpleNamespace(eth=eth)).transaction_fees()
+
+
+def test_invalid_speed_raises():
+    with pytest.raises(ValueError):
+        FeeEstimator(SimpleNamespace(eth=StubEth()), "instant")
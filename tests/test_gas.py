@@ -0,0 +1,88 @@
+from aave_python.gas import GasLimitModel
+
+RESERVE = "0x000000000000000000000000000000000000ABCD"
+
+
+def test_learned_limit_is_highest_recent_gas_used_plus_margin():
+    model = GasLimitModel(safety_margin=0.25, headroom=30_000, window=2)
+    key = model.key("Borrow", RESERVE)
+    assert model.gas_limit(key) is None
+
+    for gas_used in (200_000, 100_000, 120_000):
+        model.record(key, {"status": 1, "gasUsed": gas_used})
+
+    # The 200k sample fell out of the window of 2
+    assert model.gas_limit(key) == 120_000 * 1.25 + 30_000
+
+
+def test_keys_ignore_address_case():
+    assert GasLimitModel.key("Deposit", RESERVE) == GasLimitModel.key("Deposit", RESERVE.lower())
+
+
+def test_pending_approval_uses_default_until_learned():
+    model = GasLimitModel()
+    pending = model.key("Deposit", RESERVE, "pending_approval")
+    assert model.gas_limit(pending) == GasLimitModel.PENDING_APPROVAL_GAS_LIMITS["Deposit"]
+    assert model.gas_limit(model.key("Deposit", RESERVE, "approved")) is None
+
+    model.record(pending, {"status": 1, "gasUsed": 200_000})
+    assert model.gas_limit(pending) == 280_000
+
+
+def test_disabled_model_always_estimates():
+    model = GasLimitModel(enabled=False)
+    key = model.key("Repay", RESERVE, "approved")
+    model.record(key, {"status": 1, "gasUsed": 200_000})
+
+    assert model.gas_limit(key) is None
+
+
+def test_out_of_gas_failure_drops_learned_limit():
+    model = GasLimitModel()
+    key = model.key("Withdraw", RESERVE)
+    model.record(key, {"status": 1, "gasUsed": 100_000})
+    model.record(key, {"status": 0, "gasUsed": 60_000}, gas_limit=155_000)  # Reverted, not out of gas
+    assert model.gas_limit(key) == 155_000
+
+    model.record(key, {"status": 0, "gasUsed": 155_000}, gas_limit=155_000)
+    assert model.gas_limit(key) is None
+
+
+def test_learned_limit_covers_a_more_expensive_later_call():
+    model = GasLimitModel()
+    key = model.key("Deposit", RESERVE, "approved")
+    # A deposit into a reserve already used as collateral, whose gasUsed is net of a refund of up to 20%
+    model.record(key, {"status": 1, "gasUsed": 180_000})
+
+    # The next deposit gets no refund and enables the reserve as collateral (~20k more gas)
+    assert model.gas_limit(key) >= 180_000 / 0.8 + 20_000
+
+    # Small operations, where the relative margin alone is a few thousand gas
+    key = model.key("Convert ETH to WETH", RESERVE)
+    model.record(key, {"status": 1, "gasUsed": 27_000})
+    assert model.gas_limit(key) >= 27_000 / 0.8 + 20_000
+
+
+def test_approvals_from_zero_and_nonzero_allowances_are_learned_apart():
+    model = GasLimitModel()
+    from_nonzero = model.approval_key(RESERVE, current_allowance=5, approval_amount=10)
+    from_zero = model.approval_key(RESERVE, current_allowance=0, approval_amount=10)
+    assert from_zero != from_nonzero
+
+    model.record(from_nonzero, {"status": 1, "gasUsed": 29_000})
+    assert model.gas_limit(from_zero) is None
+
+
+def test_approvals_to_zero_are_always_estimated():
+    assert GasLimitModel.approval_key(RESERVE, current_allowance=5, approval_amount=0) is None
+
+
+def test_forget_one_operation():
+    model = GasLimitModel()
+    borrow, repay = model.key("Borrow", RESERVE), model.key("Repay", RESERVE, "approved")
+    model.record(borrow, {"status": 1, "gasUsed": 100_000})
+    model.record(repay, {"status": 1, "gasUsed": 100_000})
+    model.forget("Borrow")
+
+    assert model.gas_limit(borrow) is None
+    assert model.gas_limit(repay) is not None
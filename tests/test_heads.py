@@ -0,0 +1,106 @@
+import json
+import socket
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from aave_python.heads import HeadTracker
+
+
+def new_head_message(number: int, block_hash: str = None) -> dict:
+    block_hash = f"0x{number:064x}" if block_hash is None else block_hash
+    return {"jsonrpc": "2.0", "method": "eth_subscription",
+            "params": {"subscription": "0x1", "result": {"number": hex(number), "hash": block_hash,
+                                                         "timestamp": hex(1_700_000_000 + number)}}}
+
+
+class StubEth:
+    """Answers eth_getBlockByNumber("latest") with block 'block_number'"""
+    def __init__(self, block_number: int):
+        self.block_number = block_number
+
+    def get_block(self, block_identifier) -> dict:
+        return {"number": self.block_number, "hash": f"0x{self.block_number:064x}", "timestamp": 0}
+
+
+def head_tracker(block_number: int = 100, **kwargs) -> HeadTracker:
+    return HeadTracker(SimpleNamespace(eth=StubEth(block_number)), poll_interval=0.01, **kwargs)
+
+
+def test_new_head_messages_update_the_head_and_run_callbacks():
+    tracker = head_tracker()
+    received = []
+    tracker.on_new_head(received.append)
+    tracker._handle_message({"jsonrpc": "2.0", "id": 1, "result": "0x1"})  # The subscription id reply
+    tracker._handle_message(new_head_message(200))
+    tracker._handle_message(new_head_message(200))  # Same block again
+    tracker._handle_message(new_head_message(199))  # Older block
+    tracker._handle_message(new_head_message(200, block_hash="0x" + "ab" * 32))  # Reorg at the same height
+
+    assert [(head.number, head.hash[:6]) for head in received] == [(200, "0x0000"), (200, "0xabab")]
+    assert tracker.head.timestamp == 1_700_000_200
+
+
+def test_subscription_errors_raise():
+    with pytest.raises(ConnectionError):
+        head_tracker()._handle_message({"jsonrpc": "2.0", "id": 1, "error": {"code": -32601,
+                                                                             "message": "notifications not supported"}})
+
+
+def test_polling_without_subscription_url():
+    tracker = head_tracker(block_number=100).start()
+    try:
+        assert tracker.wait_for_block(100, timeout=5).number == 100
+        assert tracker.mode == "polling"
+
+        tracker.w3.eth.block_number = 101
+        assert tracker.wait_for_block(101, timeout=5).number == 101
+    finally:
+        tracker.stop()
+
+
+def test_block_number_asks_the_node_until_the_tracker_runs():
+    tracker = head_tracker(block_number=100)
+    tracker._handle_message(new_head_message(90))
+
+    assert tracker.block_number == 100
+
+
+def test_ipc_subscription_falls_back_to_polling_when_dropped(tmp_path):
+    socket_path = str(tmp_path / "node.ipc")
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(socket_path)
+    server.listen(1)
+    requests = []
+    release = threading.Event()
+
+    def serve():
+        connection, _ = server.accept()
+        requests.append(json.loads(connection.recv(65536)))
+        # Concatenated messages, the last one split across two reads
+        messages = (json.dumps({"jsonrpc": "2.0", "id": 1, "result": "0x1"}) + json.dumps(new_head_message(200))
+                    + json.dumps(new_head_message(201))).encode()
+        connection.sendall(messages[:-20])
+        release.wait(5)
+        connection.sendall(messages[-20:])
+        release.wait(5)
+        connection.close()  # Dropped subscription
+
+    threading.Thread(target=serve, daemon=True).start()
+    tracker = head_tracker(block_number=300, subscription_url=socket_path, reconnect_delay=60)
+    received = []
+    tracker.on_new_head(lambda head: received.append(head.number))
+    tracker.start()
+    try:
+        assert tracker.wait_for_block(200, timeout=5).number == 200
+        assert tracker.mode == "subscription"
+        assert requests[0]["method"] == "eth_subscribe" and requests[0]["params"] == ["newHeads"]
+        release.set()
+
+        assert tracker.wait_for_block(300, timeout=5).number == 300
+        assert tracker.mode == "polling"
+        assert received == [200, 201, 300]
+    finally:
+        tracker.stop()
+        server.close()
@@ -0,0 +1,71 @@
+import os
+
+from aave_python.history_cache import HistoricalCallCache
+
+TO = "0x000000000000000000000000000000000000abcd"
+
+
+def history_cache(tmp_path, **kwargs) -> HistoricalCallCache:
+    return HistoricalCallCache(1, str(tmp_path), finality_depth=10, **kwargs)
+
+
+def random_result() -> str:
+    """A random 1 KB result, so that every entry compresses to about the same size"""
+    return "0x" + os.urandom(1024).hex()
+
+
+def test_final_reads_are_answered_from_disk_across_instances(tmp_path):
+    sent = []
+
+    def make_request(method, params):
+        sent.append(method)
+        return {"jsonrpc": "2.0", "id": 1, "result": "0x64" if method == "eth_blockNumber" else "0x2a"}
+
+    params = ({"to": TO, "data": "0x1234"}, hex(50))
+    cache = history_cache(tmp_path)
+    assert cache.middleware(make_request, None)("eth_call", params)["result"] == "0x2a"
+    cache.close()
+
+    cache = history_cache(tmp_path)
+    assert cache.middleware(make_request, None)("eth_call", params)["result"] == "0x2a"
+    assert sent == ["eth_blockNumber", "eth_call", "eth_blockNumber"]
+
+
+def test_non_final_reads_are_not_stored(tmp_path):
+    cache = history_cache(tmp_path)
+    make_request = lambda method, params: {"jsonrpc": "2.0", "id": 1,
+                                           "result": "0x64" if method == "eth_blockNumber" else "0x2a"}
+    cache.middleware(make_request, None)("eth_call", ({"to": TO, "data": "0x1234"}, hex(95)))
+
+    assert cache.stats()["entries"] == 0
+
+
+def test_hits_are_not_written_until_flushed(tmp_path):
+    cache = history_cache(tmp_path)
+    cache.put(1, TO, "0x01", "0x2a")
+    last_used = cache.db.execute("SELECT last_used FROM results").fetchone()[0]
+    assert cache.get(1, TO, "0x01") == "0x2a"
+
+    assert cache.db.execute("SELECT last_used FROM results").fetchone()[0] == last_used
+    cache._flush_touched()
+    assert cache.db.execute("SELECT last_used FROM results").fetchone()[0] > last_used
+
+
+def test_least_recently_used_results_are_evicted(tmp_path):
+    cache = history_cache(tmp_path)
+    for block_number in range(9):
+        cache.put(block_number, TO, "0x01", random_result())
+    cache.max_bytes = int(cache.size * 10 / 9 * 1.05)  # Room for 10 entries
+    cache.get(0, TO, "0x01")  # The oldest entry becomes the most recently used
+
+    cache.put(9, TO, "0x01", random_result())
+    assert cache.stats()["evictions"] == 0
+    cache.put(10, TO, "0x01", random_result())  # 11 entries - evicted down to 90% of the cap
+
+    assert cache.size <= cache.max_bytes * 0.9
+    assert cache.size == cache.db.execute("SELECT SUM(size) FROM results").fetchone()[0]
+    assert cache.stats()["evictions"] == 2
+    assert cache.get(0, TO, "0x01") is not None
+    assert cache.get(1, TO, "0x01") is None
+    assert cache.get(2, TO, "0x01") is None
+    assert cache.get(3, TO, "0x01") is not None
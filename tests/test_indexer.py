@@ -0,0 +1,120 @@
+from types import SimpleNamespace
+
+import pytest
+from hexbytes import HexBytes
+from web3 import Web3
+from web3._utils.events import event_abi_to_log_topic
+
+from aave_python.abi import ABIReference
+from aave_python.indexer import LendingPoolIndexer
+
+LENDING_POOL = "0x7d2768dE32b0b80b7a3454c06BdAc94A69DDc7A9"
+RESERVE = "0x6B175474E89094C44Da98b954EedeAC495271d0F"
+RESERVE_DATA_UPDATED = event_abi_to_log_topic([entry for entry in ABIReference.lending_pool_abi
+                                               if entry.get("name") == "ReserveDataUpdated"][0])
+
+
+class StubChain:
+    """
+    A chain of 'head' + 1 blocks with one ReserveDataUpdated log per block, whose liquidityRate is the block number
+    (plus 1000 for blocks replaced by reorg()). eth_getLogs requests over more than 'max_range' blocks fail with
+    'range_error'.
+    """
+    def __init__(self, head: int = 40, max_range: int = None, range_error: Exception = None):
+        self.block_number = head
+        self.max_range = max_range
+        self.range_error = range_error
+        self.reorged_from = None
+        self.requests = []
+
+    def reorg(self, from_block: int) -> None:
+        """Replaces every block from 'from_block' on"""
+        self.reorged_from = from_block
+
+    def fork(self, block_number: int) -> int:
+        return 1 if self.reorged_from is not None and block_number >= self.reorged_from else 0
+
+    def block_hash(self, block_number: int) -> HexBytes:
+        return HexBytes(Web3.keccak(text=f"{self.fork(block_number)}-{block_number}"))
+
+    def get_block(self, block_number: int) -> dict:
+        return {"hash": self.block_hash(block_number)}
+
+    def contract(self, **kwargs):
+        return Web3().eth.contract(**kwargs)
+
+    def get_logs(self, log_filter: dict) -> list:
+        from_block, to_block = log_filter["fromBlock"], log_filter["toBlock"]
+        self.requests.append((from_block, to_block))
+        if self.max_range is not None and to_block - from_block + 1 > self.max_range:
+            raise self.range_error
+        return [self.log(block_number) for block_number in range(from_block, to_block + 1)]
+
+    def log(self, block_number: int) -> dict:
+        data = (self.fork(block_number) * 1000 + block_number).to_bytes(32, "big") + bytes(32 * 4)
+        return {"address": LENDING_POOL, "blockNumber": block_number, "blockHash": self.block_hash(block_number),
+                "transactionHash": HexBytes(Web3.keccak(text=f"tx-{self.fork(block_number)}-{block_number}")),
+                "transactionIndex": 0, "logIndex": 0, "data": Web3.toHex(data),
+                "topics": [HexBytes(RESERVE_DATA_UPDATED), HexBytes(bytes(12) + HexBytes(RESERVE))]}
+
+
+def lending_pool_indexer(tmp_path, chain: StubChain, **kwargs) -> LendingPoolIndexer:
+    kwargs = {"start_block": 10, "confirmations": 0, "initial_chunk_size": 5, "max_chunk_size": 5, **kwargs}
+    return LendingPoolIndexer(SimpleNamespace(eth=chain), LENDING_POOL, str(tmp_path / "events.db"), **kwargs)
+
+
+def liquidity_rates(indexer: LendingPoolIndexer) -> list:
+    return [event["args"]["liquidityRate"] for event in indexer.events(event="ReserveDataUpdated")]
+
+
+def test_events_are_indexed_and_decoded(tmp_path):
+    indexer = lending_pool_indexer(tmp_path, StubChain())
+
+    assert indexer.run(to_block=20) == 11
+    assert indexer.checkpoint == 20
+    assert liquidity_rates(indexer) == list(range(10, 21))
+    assert indexer.events(reserve=RESERVE)[0]["reserve"] == RESERVE
+
+
+@pytest.mark.parametrize("error", [ValueError({"code": -32005, "message": "query returned more than 10000 results"}),
+                                   ValueError({"code": -32602, "message": "eth_getLogs block range is too wide"})])
+def test_log_limit_errors_split_the_range(tmp_path, error):
+    chain = StubChain(max_range=2, range_error=error)
+    indexer = lending_pool_indexer(tmp_path, chain, target_logs_per_chunk=4)  # Never grows back
+
+    assert indexer.run(to_block=20) == 11
+    assert indexer.chunk_size == 2
+    assert liquidity_rates(indexer) == list(range(10, 21))
+
+
+def test_transport_errors_are_raised_without_shrinking(tmp_path):
+    chain = StubChain(max_range=2, range_error=ConnectionError("Connection reset by peer"))
+    indexer = lending_pool_indexer(tmp_path, chain)
+    with pytest.raises(ConnectionError):
+        indexer.run(to_block=20)
+
+    assert chain.requests == [(10, 14)]
+    assert indexer.chunk_size == 5
+
+
+def test_interrupted_run_resumes_from_the_checkpoint(tmp_path):
+    chain = StubChain()
+    lending_pool_indexer(tmp_path, chain).run(to_block=20)
+    chain.requests.clear()
+
+    indexer = lending_pool_indexer(tmp_path, chain)
+    assert indexer.run(to_block=30) == 10
+    assert chain.requests[0][0] == 21
+    assert liquidity_rates(indexer) == list(range(10, 31))
+
+
+def test_reorged_blocks_are_rolled_back_and_reindexed(tmp_path):
+    chain = StubChain()
+    indexer = lending_pool_indexer(tmp_path, chain)
+    indexer.run(to_block=29)  # Checkpoints at blocks 14, 19, 24 and 29
+
+    # The checkpoints at 24 and 29 no longer match, so blocks 20-29 are re-indexed
+    chain.reorg(from_block=22)
+    indexer.run(to_block=29)
+
+    assert liquidity_rates(indexer) == list(range(10, 22)) + list(range(1022, 1030))
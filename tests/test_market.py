@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+
+def test_reserve_data_columns_are_mapped_with_units(market):
+    weth = market.reserve("WETH")
+
+    assert market.block_number == 100
+    assert market.symbols == ("WETH", "USDC")
+    assert market.symbol_index["USDC"] == 1
+    assert weth["decimals"] == 18
+    assert weth["available_liquidity"] == 300
+    assert weth["total_stable_debt"] == 20
+    assert weth["total_variable_debt"] == 80
+    assert weth["liquidity_rate"] == pytest.approx(0.01)
+    assert weth["variable_borrow_rate"] == pytest.approx(0.03)
+    assert weth["stable_borrow_rate"] == pytest.approx(0.05)
+    assert weth["average_stable_borrow_rate"] == pytest.approx(0.04)
+    assert weth["liquidity_index"] == pytest.approx(1.1)
+    assert weth["variable_borrow_index"] == pytest.approx(1.2)
+    assert weth["last_update_timestamp"] == 1_700_000_000
+
+
+def test_configuration_columns_are_mapped(market):
+    assert list(market.ltv) == [8000, 8000]
+    assert list(market.liquidation_threshold) == [8250, 8500]
+    assert list(market.liquidation_bonus) == [10500, 10500]
+    assert list(market.reserve_factor) == [1000, 1000]
+    assert list(market.stable_borrow_rate_enabled) == [True, False]
+    assert list(market.is_frozen) == [False, True]
+    assert market.usage_as_collateral_enabled.all() and market.borrowing_enabled.all() and market.is_active.all()
+
+
+def test_prices_and_derived_columns(market):
+    assert np.allclose(market.prices_eth, [1.0, 0.0005])
+    assert np.allclose(market.total_debt, [100, 0])
+    # Empty reserves have a 0 utilization instead of a division by zero
+    assert np.allclose(market.utilization, [0.25, 0])
+
+
+def test_columns_are_read_only(market):
+    with pytest.raises(ValueError):
+        market.ltv[0] = 0
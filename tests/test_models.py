@@ -0,0 +1,42 @@
+from aave_python.models import ReserveTokenIndex
+
+from conftest import reserve_token
+
+WETH = reserve_token("WETH", "0x000000000000000000000000000000000000E001", 18)
+USDC = reserve_token("USDC", "0x000000000000000000000000000000000000E002", 6)
+
+
+def test_lookup_by_symbol_is_case_insensitive():
+    index = ReserveTokenIndex([WETH, USDC])
+
+    assert index.by_symbol("weth") is WETH
+    assert index.by_symbol("USDC") is USDC
+    assert index.by_symbol("DAI") is None
+
+
+def test_every_reserve_address_resolves_to_its_kind():
+    index = ReserveTokenIndex([WETH, USDC])
+
+    assert index.resolve(USDC.address.lower()) == (USDC, "underlying")
+    assert index.resolve(USDC.aTokenAddress.upper().replace("0X", "0x")) == (USDC, "aToken")
+    assert index.resolve(USDC.stableDebtTokenAddress) == (USDC, "stableDebtToken")
+    assert index.resolve(USDC.variableDebtTokenAddress) == (USDC, "variableDebtToken")
+    assert index.resolve("0x000000000000000000000000000000000000dead") is None
+
+
+def test_lookup_by_address_filters_by_kind():
+    index = ReserveTokenIndex([WETH, USDC])
+
+    assert index.by_address(WETH.aTokenAddress) is WETH
+    assert index.by_address(WETH.aTokenAddress, kind="aToken") is WETH
+    assert index.by_address(WETH.aTokenAddress, kind="underlying") is None
+
+
+def test_first_token_wins_on_duplicates():
+    duplicate = reserve_token("WETH", WETH.address, 18)
+    index = ReserveTokenIndex([WETH, duplicate])
+
+    assert index.by_symbol("WETH") is WETH
+    assert index.by_address(WETH.address) is WETH
+    assert list(index) == [WETH, duplicate]
+    assert len(index) == 2
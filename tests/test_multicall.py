@@ -0,0 +1,85 @@
+from types import SimpleNamespace
+
+import pytest
+from web3 import Web3
+from web3.exceptions import ContractLogicError
+
+from aave_python.multicall import Multicall, is_batch_size_error
+
+MULTICALL_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+
+
+class StubMulticall(Multicall):
+    """Answers tryAggregate with each call's own value, raising 'error' for batches larger than 'max_size'"""
+    def __init__(self, error: Exception, max_size: int = 0, max_batch_size: int = 8):
+        super().__init__(Web3(), MULTICALL_ADDRESS, max_batch_size=max_batch_size)
+        self.error = error
+        self.max_size = max_size
+        self.batches = []
+
+    def _try_aggregate(self, batch: list, block_identifier) -> list:
+        self.batches.append(len(batch))
+        if len(batch) > self.max_size:
+            raise self.error
+        return batch
+
+    def decode_batch(self, batch: list, return_data: list, allow_failure: bool = False) -> list:
+        return list(return_data)
+
+
+@pytest.mark.parametrize("error", [ValueError({"code": -32000, "message": "out of gas"}),
+                                   ValueError("gas required exceeds allowance (50000000)"),
+                                   ContractLogicError("execution reverted"),
+                                   Exception("413 Client Error: Payload Too Large")])
+def test_size_errors_split_the_batch(error):
+    multicall = StubMulticall(error, max_size=2)
+
+    assert multicall.aggregate(list(range(8))) == list(range(8))
+    assert multicall.batch_size == 2
+    assert is_batch_size_error(error)
+
+
+@pytest.mark.parametrize("error", [ConnectionError("Connection reset by peer"),
+                                   TimeoutError("read timed out"),
+                                   ValueError({"code": 429, "message": "Too Many Requests"})])
+def test_transport_errors_are_raised_without_splitting(error):
+    multicall = StubMulticall(error)
+    with pytest.raises(type(error)):
+        multicall.aggregate(list(range(8)))
+
+    assert multicall.batches == [8]
+    assert multicall.batch_size == 8
+    assert not is_batch_size_error(error)
+
+
+class StubCodeEth:
+    """Answers eth_getCode with 'code', after failing the first 'failures' requests"""
+    def __init__(self, code: bytes, failures: int = 0):
+        self.code = code
+        self.failures = failures
+        self.requests = 0
+
+    def get_code(self, address):
+        self.requests += 1
+        if self.requests <= self.failures:
+            raise TimeoutError("read timed out")
+        return self.code
+
+
+@pytest.mark.parametrize("code, available", [(b"\x60\x80", True), (b"", False)])
+def test_availability_is_checked_once(code, available):
+    multicall = Multicall(Web3(), MULTICALL_ADDRESS)
+    multicall.w3 = SimpleNamespace(eth=StubCodeEth(code))
+
+    assert multicall.is_available() == available
+    assert multicall.is_available() == available
+    assert multicall.w3.eth.requests == 1
+
+
+def test_failed_availability_check_is_retried():
+    multicall = Multicall(Web3(), MULTICALL_ADDRESS)
+    multicall.w3 = SimpleNamespace(eth=StubCodeEth(b"\x60\x80", failures=1))
+
+    assert not multicall.is_available()
+    assert multicall.is_available()
+    assert multicall.w3.eth.requests == 2
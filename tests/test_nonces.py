@@ -0,0 +1,97 @@
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+from aave_python.nonces import NonceManager
+
+WALLET = "0x000000000000000000000000000000000000abcd"
+
+
+class StubEth:
+    """Transaction counts of one wallet: 'mined' for "latest" and 'pending' for "pending" """
+    def __init__(self, mined: int = 0, pending: int = None):
+        self.mined = mined
+        self.pending = mined if pending is None else pending
+        self.requests = 0
+
+    def get_transaction_count(self, address, block_identifier):
+        self.requests += 1
+        return self.pending if block_identifier == "pending" else self.mined
+
+
+def nonce_manager(mined: int = 0, pending: int = None) -> NonceManager:
+    return NonceManager(SimpleNamespace(eth=StubEth(mined, pending)), WALLET)
+
+
+def test_nonces_are_synced_once_and_handed_out_locally():
+    nonces = nonce_manager(mined=5, pending=7)
+
+    assert [nonces.next_nonce() for _ in range(3)] == [7, 8, 9]
+    assert nonces.peek() == 10
+    assert nonces.w3.eth.requests == 1
+
+
+def test_concurrent_reservations_are_unique():
+    nonces = nonce_manager()
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        reserved = list(executor.map(lambda _: nonces.next_nonce(), range(200)))
+
+    assert sorted(reserved) == list(range(200))
+
+
+def test_releasing_the_last_nonce_reuses_it():
+    nonces = nonce_manager()
+    nonces.next_nonce()
+    nonces.release(nonces.next_nonce())
+
+    assert nonces.next_nonce() == 1
+
+
+def test_releasing_an_earlier_nonce_does_not_reissue_live_reservations():
+    nonces = nonce_manager()
+    first, second = nonces.next_nonce(), nonces.next_nonce()
+    nonces.release(first)  # 'second' is still reserved by another thread
+
+    assert nonces.next_nonce() == first
+    assert nonces.next_nonce() == second + 1
+    assert nonces.w3.eth.requests == 1
+
+
+def test_released_nonces_below_the_counter_collapse():
+    nonces = nonce_manager()
+    reserved = [nonces.next_nonce() for _ in range(3)]
+    nonces.release(reserved[1])
+    nonces.release(reserved[2])
+
+    assert nonces.peek() == 1
+    assert nonces.next_nonce() == 1
+    assert nonces.next_nonce() == 2
+
+
+def test_reconcile_moves_forward_when_others_used_the_wallet():
+    nonces = nonce_manager()
+    nonces.next_nonce()
+    nonces.w3.eth.mined = nonces.w3.eth.pending = 10
+
+    assert nonces.reconcile() == []
+    assert nonces.next_nonce() == 10
+
+
+def test_reconcile_refills_dropped_nonces_without_touching_reservations():
+    nonces = nonce_manager()
+    for nonce in range(3):
+        nonces.mark_sent(nonces.next_nonce(), f"0x{nonce}")
+    live = nonces.next_nonce()  # 3, about to be sent by another thread
+    nonces.w3.eth.pending = 1  # Nonces 1 and 2 were dropped
+
+    assert nonces.reconcile() == [1, 2]
+    assert set(nonces.in_flight) == {0}
+    assert [nonces.next_nonce() for _ in range(3)] == [1, 2, live + 1]
+
+
+def test_mined_transactions_are_no_longer_in_flight():
+    nonces = nonce_manager()
+    for nonce in range(3):
+        nonces.mark_sent(nonces.next_nonce(), f"0x{nonce}")
+    nonces.mark_mined(1)
+
+    assert nonces.in_flight == {2: "0x2"}
@@ -0,0 +1,32 @@
+import pytest
+
+from aave_python.planner import OperationPlanner
+
+ASSET = "0x6b175474e89094c44da98b954eedeac495271d0f"
+
+
+@pytest.mark.parametrize("operation, requires_allowance", [("Deposit", True), ("Repay", True), ("Withdraw", False),
+                                                           ("Borrow", False), ("Convert ETH to WETH", False)])
+def test_only_operations_pulling_the_underlying_need_an_allowance(operation, requires_allowance):
+    plan = OperationPlanner().plan(operation, ASSET, 10)
+
+    assert plan.requires_allowance == requires_allowance
+    assert plan.steps[-1] == operation.lower()
+
+
+def test_account_data_is_read_only_when_reported():
+    assert not OperationPlanner().plan("Borrow", ASSET, 10).reads_account_data
+
+    planner = OperationPlanner(report_account_data=True)
+    assert planner.plan("Repay", ASSET, 10).steps == ("ensure_allowance", "repay", "read_account_data")
+    assert planner.plan("Borrow", ASSET, 10).reads_account_data
+    assert not planner.plan("Deposit", ASSET, 10).reads_account_data
+
+
+def test_plan_checksums_the_asset_address():
+    assert OperationPlanner().plan("Deposit", ASSET, 10).asset_address == "0x6B175474E89094C44Da98b954EedeAC495271d0F"
+
+
+def test_unknown_operation_raises():
+    with pytest.raises(ValueError):
+        OperationPlanner().plan("Liquidate", ASSET, 10)
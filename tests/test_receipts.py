@@ -0,0 +1,89 @@
+from types import SimpleNamespace
+
+import pytest
+from hexbytes import HexBytes
+from web3.exceptions import TimeExhausted, TransactionNotFound
+
+from aave_python.nonces import NonceManager
+from aave_python.receipts import ReceiptWatcher
+
+WALLET = "0x000000000000000000000000000000000000abcd"
+
+
+def tx_hash(n: int) -> str:
+    return f"0x{n:064x}"
+
+
+class StubChain:
+    """Mines the transactions passed to mine() in a new block, and counts every receipt request"""
+    def __init__(self):
+        self.block_number = 100
+        self.blocks = {}
+        self.receipts = {}
+        self.receipt_requests = 0
+        self.transaction_count = 0
+
+    def mine(self, *tx_hashes: str) -> None:
+        for tx_hash in tx_hashes:
+            self.receipts[tx_hash] = {"transactionHash": HexBytes(tx_hash), "status": 1}
+        self.blocks[self.block_number + 1] = [HexBytes(tx_hash) for tx_hash in tx_hashes]
+        self.block_number += 1
+
+    def get_block(self, block_number: int) -> dict:
+        return {"number": block_number, "transactions": self.blocks.get(block_number, [])}
+
+    def get_transaction_receipt(self, tx_hash: str) -> dict:
+        self.receipt_requests += 1
+        if tx_hash not in self.receipts:
+            raise TransactionNotFound(f"Transaction with hash: '{tx_hash}' not found.")
+        return self.receipts[tx_hash]
+
+    def get_transaction_count(self, address, block_identifier) -> int:
+        return self.transaction_count
+
+
+def receipt_watcher(chain: StubChain, **kwargs) -> ReceiptWatcher:
+    return ReceiptWatcher(SimpleNamespace(eth=chain), poll_interval=0.01, **kwargs)
+
+
+def test_already_mined_transaction_resolves():
+    chain = StubChain()
+    chain.mine(tx_hash(1))
+    watcher = receipt_watcher(chain)
+
+    assert watcher.watch(tx_hash(1)).result(timeout=5)["status"] == 1
+    watcher.stop()
+
+
+def test_pending_transactions_cost_one_block_read_per_block():
+    chain = StubChain()
+    watcher = receipt_watcher(chain)
+    watcher._thread = SimpleNamespace(is_alive=lambda: True)  # Polled by the test instead of the watcher thread
+    futures = [watcher.watch(HexBytes(tx_hash(n))) for n in range(1, 4)]
+    assert watcher.watch(tx_hash(1)) is futures[0]
+    watcher._poll()
+    chain.receipt_requests = 0
+
+    chain.mine(tx_hash(1), tx_hash(2))
+    chain.mine()
+    chain.mine(tx_hash(3), tx_hash(4))
+    watcher._poll()
+
+    assert [future.result(timeout=0)["transactionHash"] for future in futures] == [HexBytes(tx_hash(n))
+                                                                                   for n in range(1, 4)]
+    # Only the watched transactions of the new blocks are requested
+    assert chain.receipt_requests == 3
+    assert watcher.pending == 0
+
+
+def test_timeout_fails_the_future_and_reconciles_the_nonces():
+    chain = StubChain()
+    nonces = NonceManager(SimpleNamespace(eth=chain), WALLET)
+    nonces.mark_sent(nonces.next_nonce(), tx_hash(1))
+    watcher = receipt_watcher(chain, on_timeout=lambda tx_hash: nonces.reconcile())
+
+    with pytest.raises(TimeExhausted):
+        watcher.watch(tx_hash(1), timeout=0.05).result(timeout=5)
+    # The dropped transaction's nonce is handed out again
+    assert nonces.next_nonce() == 0
+    watcher.stop()
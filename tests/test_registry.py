@@ -0,0 +1,103 @@
+from eth_utils import function_abi_to_4byte_selector
+from web3 import Web3
+from web3._utils.events import event_abi_to_log_topic
+from web3.providers.base import BaseProvider
+
+from aave_python.abi import ABIReference
+from aave_python.registry import ProtocolAddressRegistry
+
+ADDRESSES_PROVIDER = "0xB53C1a33016B2DC2fF3653530bfF1848a515c8c5"
+EVENTS = {entry["name"]: Web3.toHex(event_abi_to_log_topic(entry))
+          for entry in ABIReference.lending_pool_addresses_provider_abi if entry["type"] == "event"}
+GETTERS = {Web3.toHex(function_abi_to_4byte_selector(entry)): entry["name"]
+           for entry in ABIReference.lending_pool_addresses_provider_abi if entry["type"] == "function"}
+
+
+def address(n: int) -> str:
+    return Web3.toChecksumAddress(f"0x{n:040x}")
+
+
+class StubAddressesProvider(BaseProvider):
+    """
+    A LendingPoolAddressesProvider whose getters answer from 'targets' (getter name -> address). emit() replaces a
+    target and adds the matching log to the current block.
+    """
+    def __init__(self):
+        self.block_number = 100
+        self.targets = {getter: address(i + 1) for i, getter in enumerate(ProtocolAddressRegistry.TARGETS.values())}
+        self.logs = []
+        self.requests = []
+
+    def emit(self, getter: str, new_address: str, event: str, data: bytes = b"") -> None:
+        self.targets[getter] = new_address
+        self.logs.append({"address": ADDRESSES_PROVIDER, "blockNumber": hex(self.block_number),
+                          "blockHash": "0x" + "00" * 32, "transactionHash": "0x" + "00" * 32,
+                          "transactionIndex": "0x0", "logIndex": hex(len(self.logs)), "removed": False,
+                          "data": Web3.toHex(data),
+                          "topics": [EVENTS[event], Web3.toHex(bytes(12) + Web3.toBytes(hexstr=new_address))]})
+
+    def make_request(self, method, params):
+        self.requests.append(method)
+        if method == "eth_blockNumber":
+            result = hex(self.block_number)
+        elif method == "eth_call":
+            getter = GETTERS[params[0]["data"][:10]]
+            result = Web3.toHex(bytes(12) + Web3.toBytes(hexstr=self.targets[getter]))
+        elif method == "eth_getLogs":
+            from_block, to_block = int(params[0]["fromBlock"], 16), int(params[0]["toBlock"], 16)
+            result = [log for log in self.logs if from_block <= int(log["blockNumber"], 16) <= to_block
+                      and log["topics"][0] in params[0]["topics"][0]]
+        else:
+            raise ValueError(f"Unexpected request {method}")
+        return {"jsonrpc": "2.0", "id": 1, "result": result}
+
+
+def address_registry(**kwargs) -> tuple:
+    provider = StubAddressesProvider()
+    return ProtocolAddressRegistry(Web3(provider, middlewares=[]), ADDRESSES_PROVIDER, **kwargs), provider
+
+
+def test_addresses_are_resolved_once():
+    registry, provider = address_registry()
+
+    assert registry.get("price_oracle") == provider.targets["getPriceOracle"]
+    assert registry.get("lending_pool") == provider.targets["getLendingPool"]
+    assert provider.requests.count("eth_call") == len(ProtocolAddressRegistry.TARGETS)
+    assert "eth_getLogs" not in provider.requests
+
+
+def test_updated_events_invalidate_their_target():
+    registry, provider = address_registry(sync_interval=0)
+    registry.get("lending_pool")
+    provider.block_number = 101
+    provider.emit("getPriceOracle", address(100), "PriceOracleUpdated")
+
+    assert registry.sync() == ["price_oracle"]
+    assert registry.get("price_oracle") == address(100)
+
+
+def test_address_set_events_invalidate_their_target():
+    registry, provider = address_registry(sync_interval=0)
+    registry.get("lending_pool")
+    provider.block_number = 101
+    provider.emit("getLendingPoolCollateralManager", address(100), "AddressSet",
+                  data=b"COLLATERAL_MANAGER".ljust(32, b"\x00") + bytes(32))
+
+    assert registry.get("collateral_manager") == address(100)
+    assert registry.get("lending_pool") == address(1)
+
+
+def test_logs_are_checked_at_most_once_per_sync_interval():
+    registry, provider = address_registry(sync_interval=3600)
+    registry.get("lending_pool")
+    provider.block_number = 101
+    provider.emit("getLendingPool", address(100), "LendingPoolUpdated")
+
+    # Within the interval the cached address is returned without any request
+    requests = len(provider.requests)
+    assert registry.get("lending_pool") == address(1)
+    assert len(provider.requests) == requests
+
+    registry._last_synced_at -= 3600
+    assert registry.get("lending_pool") == address(100)
+    assert provider.requests.count("eth_getLogs") == 1
@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from aave_python.risk import HealthFactorEngine
+
+
+@pytest.fixture
+def engine(market) -> HealthFactorEngine:
+    """10 WETH of collateral against 5000 USDC (2.5 ETH) of debt"""
+    return HealthFactorEngine(market, collateral=[10, 0], debt=[0, 5000], usage_as_collateral=[True, False])
+
+
+def test_account_data_matches_aave_formulas(engine):
+    state = engine.account_data()
+
+    assert state.total_collateral_eth[0] == pytest.approx(10)
+    assert state.total_debt_eth[0] == pytest.approx(2.5)
+    assert state.ltv[0] == pytest.approx(0.8)
+    assert state.current_liquidation_threshold[0] == pytest.approx(0.825)
+    assert state.available_borrows_eth[0] == pytest.approx(5.5)
+    assert state.health_factor[0] == pytest.approx(10 * 0.825 / 2.5)
+
+
+def test_accounts_without_debt_have_infinite_health_factor(market):
+    state = HealthFactorEngine(market, [10, 0], [0, 0], [True, False]).account_data()
+
+    assert state.health_factor[0] == np.inf
+    assert state.is_healthy[0]
+
+
+def test_what_if_evaluates_every_scenario(engine):
+    states = engine.what_if(borrows=[{"USDC": 1000}, {"USDC": 11000}, {"USDC": 15000}])
+
+    assert np.allclose(states.health_factor, [8.25 / 3.0, 8.25 / 8.0, 8.25 / 10.0])
+    assert list(states.is_healthy) == [True, True, False]
+    assert engine.max_borrow("USDC") == pytest.approx(11000)
+
+
+def test_withdrawals_and_repays_are_capped(engine):
+    state = engine.what_if(withdrawals={"WETH": 20}, repays={"USDC": 9000})
+
+    assert state.total_collateral_eth[0] == 0
+    assert state.total_debt_eth[0] == 0
+
+
+def test_deposit_into_an_empty_reserve_enables_it_as_collateral(engine):
+    state = engine.what_if(deposits={"USDC": 2000})
+
+    assert state.total_collateral_eth[0] == pytest.approx(11)
+    assert state.current_liquidation_threshold[0] == pytest.approx((10 * 0.825 + 1 * 0.85) / 11)
+
+
+def test_array_scenarios_match_dict_scenarios(engine):
+    from_dicts = engine.what_if(borrows=[{"USDC": 1000}, {"WETH": 1}])
+    from_array = engine.what_if(borrows=np.array([[0, 1000], [1, 0]]))
+
+    assert np.allclose(from_dicts.health_factor, from_array.health_factor)
+
+
+def test_from_user_reserve_data(market):
+    engine = HealthFactorEngine.from_user_reserve_data(market, {
+        # currentATokenBalance, currentStableDebt, currentVariableDebt, ..., usageAsCollateralEnabled
+        "WETH": (10 * 10 ** 18, 0, 0, 0, 0, 0, 0, 0, True),
+        "USDC": (0, 1000 * 10 ** 6, 4000 * 10 ** 6, 0, 0, 0, 0, 0, False),
+    })
+
+    assert np.allclose(engine.collateral, [10, 0])
+    assert np.allclose(engine.debt, [0, 5000])
+    assert list(engine.usage_as_collateral) == [True, False]
+
+
+def test_mismatched_inputs_raise(market, engine):
+    with pytest.raises(ValueError):
+        HealthFactorEngine(market, [10], [0], [True])
+    with pytest.raises(ValueError):
+        engine.what_if(deposits=[{"WETH": 1}], borrows=[{"USDC": 1}, {"USDC": 2}])
@@ -0,0 +1,198 @@
+import threading
+import time
+
+import pytest
+
+from aave_python.hedging import HedgePolicy
+from aave_python.router import RoutedHTTPProvider
+
+
+class StubProvider:
+    """Answers every request with 'result', fails with 'error', or waits on 'gate' first"""
+    def __init__(self, result="0x1", error=None, gate: threading.Event = None):
+        self.result = result
+        self.error = error
+        self.gate = gate
+        self.requests = []
+
+    def make_request(self, method, params):
+        self.requests.append(method)
+        if self.gate is not None:
+            self.gate.wait(5)
+        if self.error is not None:
+            raise self.error
+        return {"jsonrpc": "2.0", "id": 1, "result": self.result}
+
+    def isConnected(self) -> bool:
+        return self.error is None
+
+
+def routed_provider(providers: list, hedge_policy: HedgePolicy = None, **endpoint_kwargs) -> RoutedHTTPProvider:
+    router = RoutedHTTPProvider([f"http://endpoint-{i}" for i in range(len(providers))],
+                                hedge_policy=hedge_policy, **endpoint_kwargs)
+    for endpoint, provider in zip(router.endpoints, providers):
+        endpoint.provider = provider
+    return router
+
+
+def test_read_fails_over_to_next_endpoint():
+    failing, healthy = StubProvider(error=ConnectionError("refused")), StubProvider(result="0x2")
+    router = routed_provider([failing, healthy])
+
+    assert router.make_request("eth_call", [{}, "latest"])["result"] == "0x2"
+    assert router.endpoints[0].failures == 1
+
+
+def test_rate_limited_response_fails_over():
+    limited = StubProvider()
+    limited.make_request = lambda method, params: {"jsonrpc": "2.0", "id": 1,
+                                                   "error": {"code": -32005, "message": "rate limited"}}
+    router = routed_provider([limited, StubProvider(result="0x2")])
+
+    assert router.make_request("eth_call", [{}, "latest"])["result"] == "0x2"
+
+
+def test_all_endpoints_failing_raises():
+    router = routed_provider([StubProvider(error=ConnectionError("refused")),
+                              StubProvider(error=ConnectionError("refused"))])
+    with pytest.raises(ConnectionError):
+        router.make_request("eth_call", [{}, "latest"])
+
+
+def test_circuit_breaker_skips_failing_endpoint():
+    failing, healthy = StubProvider(error=ConnectionError("refused")), StubProvider()
+    router = routed_provider([failing, healthy], failure_threshold=2, cooldown=60)
+    for _ in range(5):
+        router.make_request("eth_blockNumber", [])
+
+    assert len(failing.requests) == 2
+    assert not router.endpoints[0].available
+
+
+def test_pinned_methods_stay_on_pinned_endpoint():
+    first, second = StubProvider(result="0x1"), StubProvider(result="0x2")
+    router = routed_provider([first, second])
+    router.endpoints[1].record_success(0.001)  # Faster, so reads prefer it
+    router.endpoints[0].record_success(1.0)
+
+    assert router.make_request("eth_call", [{}, "latest"])["result"] == "0x2"
+    assert router.make_request("eth_getTransactionCount", ["0x0", "pending"])["result"] == "0x1"
+
+
+def test_pin_moves_when_pinned_endpoint_fails():
+    router = routed_provider([StubProvider(error=ConnectionError("refused")), StubProvider(result="0x2")])
+
+    assert router.make_request("eth_sendRawTransaction", ["0x00"])["result"] == "0x2"
+    assert router.pinned is router.endpoints[1]
+
+
+def test_reverted_call_is_returned_without_failover():
+    reverted = StubProvider()
+    reverted.make_request = lambda method, params: {"jsonrpc": "2.0", "id": 1,
+                                                    "error": {"code": 3, "message": "execution reverted"}}
+    second = StubProvider()
+    router = routed_provider([reverted, second])
+
+    assert router.make_request("eth_call", [{}, "latest"])["error"]["code"] == 3
+    assert second.requests == []
+    assert router.endpoints[0].failures == 0
+
+
+def test_reads_prefer_the_best_scoring_endpoint():
+    router = routed_provider([StubProvider(result="0x1"), StubProvider(result="0x2"), StubProvider(result="0x3")])
+    router.endpoints[0].record_success(0.5)
+    router.endpoints[1].record_success(0.1)
+    router.endpoints[2].record_success(0.1)
+    router.endpoints[2].record_failure()  # Same latency, but a higher error rate
+
+    assert router.ranked_endpoints() == [router.endpoints[1], router.endpoints[2], router.endpoints[0]]
+    assert router.make_request("eth_blockNumber", [])["result"] == "0x2"
+
+
+def test_failed_trial_request_doubles_the_cooldown():
+    failing = StubProvider(error=ConnectionError("refused"))
+    router = routed_provider([failing, StubProvider()], failure_threshold=1, cooldown=60, max_cooldown=100)
+    endpoint = router.endpoints[0]
+    router.make_request("eth_blockNumber", [])
+    assert endpoint.cooldown == 60
+
+    for expected_cooldown in (100, 100):  # Doubled, up to max_cooldown
+        endpoint.open_until = time.monotonic() - 1  # The cooldown has passed
+        router.make_request("eth_blockNumber", [])
+        assert endpoint.cooldown == expected_cooldown
+        assert not endpoint.available
+
+    failing.error = None
+    endpoint.open_until = time.monotonic() - 1
+    router.make_request("eth_blockNumber", [])
+    assert endpoint.available
+    assert endpoint.cooldown == 60
+    assert len(failing.requests) == 4
+
+
+def test_open_breakers_are_tried_when_every_endpoint_is_open():
+    first, second = StubProvider(error=ConnectionError("refused")), StubProvider(error=ConnectionError("refused"))
+    router = routed_provider([first, second], failure_threshold=1, cooldown=60)
+    with pytest.raises(ConnectionError):
+        router.make_request("eth_blockNumber", [])
+    assert not any(endpoint.available for endpoint in router.endpoints)
+
+    second.error = None
+    assert router.make_request("eth_blockNumber", [])["result"] == "0x1"
+
+
+def test_pin_stays_on_the_new_endpoint():
+    first, second = StubProvider(error=ConnectionError("refused")), StubProvider(result="0x2")
+    router = routed_provider([first, second], failure_threshold=1, cooldown=60)
+    router.make_request("eth_sendRawTransaction", ["0x00"])
+    first.error = None
+    router.endpoints[0].open_until = 0.0
+
+    # The first endpoint recovered, but pending transactions are on the second one's node
+    assert router.make_request("eth_getTransactionCount", ["0x0", "pending"])["result"] == "0x2"
+    assert router.endpoint_uri == "http://endpoint-1"
+
+
+def test_hedged_read_fails_over_when_primary_fails_early():
+    failing, healthy = StubProvider(error=ConnectionError("refused")), StubProvider(result="0x2")
+    router = routed_provider([failing, healthy], hedge_policy=HedgePolicy(default_delay=1.0))
+
+    assert router.make_request("eth_call", [{}, "latest"])["result"] == "0x2"
+    assert router.hedge_policy.hedges == 0
+
+
+def test_hedged_read_fails_over_when_budget_is_spent():
+    failing, healthy = StubProvider(error=ConnectionError("refused")), StubProvider(result="0x2")
+    router = routed_provider([failing, healthy], hedge_policy=HedgePolicy(default_delay=0.0, max_burst=0))
+
+    assert router.make_request("eth_call", [{}, "latest"])["result"] == "0x2"
+
+
+def test_slow_read_is_hedged_and_first_answer_wins():
+    gate = threading.Event()
+    slow, fast = StubProvider(result="0x1", gate=gate), StubProvider(result="0x2")
+    router = routed_provider([slow, fast], hedge_policy=HedgePolicy(default_delay=0.01))
+    try:
+        assert router.make_request("eth_call", [{}, "latest"])["result"] == "0x2"
+    finally:
+        gate.set()
+    assert router.hedge_policy.hedges == 1
+    assert router.hedge_policy.hedge_wins == 1
+
+
+def test_transactions_are_never_hedged():
+    gate = threading.Event()
+    gate.set()
+    first, second = StubProvider(gate=gate), StubProvider()
+    router = routed_provider([first, second], hedge_policy=HedgePolicy(default_delay=0.0))
+    router.make_request("eth_sendRawTransaction", ["0x00"])
+
+    assert second.requests == []
+
+
+def test_hedge_budget_caps_extra_requests():
+    policy = HedgePolicy(budget=0.1, max_burst=1)
+    for _ in range(20):
+        policy.start_request()
+    assert policy.try_hedge()
+    assert not policy.try_hedge()
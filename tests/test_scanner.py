@@ -0,0 +1,63 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from web3 import Web3
+
+from aave_python.scanner import AccountScanner
+
+LENDING_POOL_ADDRESS = "0x7d2768dE32b0b80b7a3454c06BdAc94A69DDc7A9"
+MULTICALL_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+ADDRESSES = [f"0x{i:040x}" for i in range(1, 9)]
+
+
+class StubEth:
+    """Answers tryAggregate(getUserAccountData) eth_calls, raising 'error' for batches larger than 'max_size'"""
+    def __init__(self, error: Exception = None, max_size: int = 0):
+        self.error = error
+        self.max_size = max_size
+        self.batches = []
+        self.block_number = 100
+
+    def call(self, transaction, block_identifier):
+        aggregated = Web3().codec.decode_abi(["bool", "(address,bytes)[]"], bytes.fromhex(transaction["data"][10:]))
+        self.batches.append(len(aggregated[1]))
+        if self.error is not None and len(aggregated[1]) > self.max_size:
+            raise self.error
+        results = [(True, bytes(32) * 5 + int(calldata[-20:].hex(), 16).to_bytes(32, "big"))
+                   for _, calldata in aggregated[1]]
+        return Web3().codec.encode_abi(["(bool,bytes)[]"], [results])
+
+
+def account_scanner(eth: StubEth) -> AccountScanner:
+    scanner = AccountScanner(Web3(), LENDING_POOL_ADDRESS, MULTICALL_ADDRESS, max_batch_size=8)
+    scanner.batch_size = 8
+    scanner.w3 = SimpleNamespace(eth=eth)
+    return scanner
+
+
+def test_scan_parses_account_data():
+    scan = account_scanner(StubEth()).scan(ADDRESSES, 100)
+
+    assert scan.success.all()
+    # The stub answers each address's own number as its health factor
+    assert np.allclose(scan.health_factor * 1e18, np.arange(1, 9))
+
+
+def test_size_errors_split_the_batch():
+    eth = StubEth(ValueError({"code": -32000, "message": "out of gas"}), max_size=2)
+    scanner = account_scanner(eth)
+    scan = scanner.scan(ADDRESSES, 100)
+
+    assert scan.success.all()
+    assert scanner.batch_size == 2
+
+
+def test_transport_errors_are_raised_without_splitting():
+    eth = StubEth(ConnectionError("Connection reset by peer"))
+    scanner = account_scanner(eth)
+    with pytest.raises(ConnectionError):
+        scanner.scan(ADDRESSES, 100)
+
+    assert eth.batches == [8]
+    assert scanner.batch_size == 8
@@ -0,0 +1,83 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from aave_python.client import AaveClient
+from aave_python.token_cache import ReserveTokenCache
+
+from conftest import reserve_token
+
+DATA_PROVIDER = "0x057835Ad21a177dbdd3090bB1CAE03EaCF78Fc6d"
+WETH = reserve_token("WETH", "0x000000000000000000000000000000000000E001", 18)
+USDC = reserve_token("USDC", "0x000000000000000000000000000000000000E002", 6)
+DAI = reserve_token("DAI", "0x000000000000000000000000000000000000E003", 18)
+
+
+def test_saved_tokens_are_loaded(tmp_path):
+    ReserveTokenCache(1, DATA_PROVIDER, str(tmp_path)).save([WETH, USDC])
+
+    assert ReserveTokenCache(1, DATA_PROVIDER.lower(), str(tmp_path)).load() == [WETH, USDC]
+
+
+@pytest.mark.parametrize("field, value", [("version", 0), ("chain_id", 5), ("data_provider", "0x0")])
+def test_stale_cache_is_ignored(tmp_path, field, value):
+    cache = ReserveTokenCache(1, DATA_PROVIDER, str(tmp_path))
+    cache.save([WETH])
+    with open(cache.path) as infile:
+        contents = json.load(infile)
+    contents[field] = value
+    with open(cache.path, "w") as outfile:
+        json.dump(contents, outfile)
+
+    assert cache.load() == []
+
+
+@pytest.mark.parametrize("contents", ["{not json", '{"version": 1}',
+                                      '{"version": 1, "chain_id": 1, '
+                                      f'"data_provider": "{DATA_PROVIDER.lower()}", "tokens": [{{"symbol": "WETH"}}]}}'])
+def test_unreadable_cache_is_ignored(tmp_path, contents):
+    cache = ReserveTokenCache(1, DATA_PROVIDER, str(tmp_path))
+    with open(cache.path, "w") as outfile:
+        outfile.write(contents)
+
+    assert cache.load() == []
+    assert ReserveTokenCache(1, DATA_PROVIDER, str(tmp_path / "missing")).load() == []  # No cache file
+
+
+def token_loading_client(tmp_path, listed_tokens: list) -> AaveClient:
+    """An AaveClient whose data provider lists 'listed_tokens', recording the reserves it fetches"""
+    def fetch_reserve_tokens(reserves):
+        client.fetched.extend(symbol for symbol, _ in reserves)
+        return [token for token in listed_tokens if (token.symbol, token.address) in reserves]
+
+    reserves = [(token.symbol, token.address) for token in listed_tokens]
+    data_provider = SimpleNamespace(functions=SimpleNamespace(
+        getAllReservesTokens=lambda: SimpleNamespace(call=lambda: reserves)))
+    client = AaveClient.__new__(AaveClient)
+    client.__dict__.update(fetched=[], data_provider_contract=data_provider,
+                           active_network=SimpleNamespace(aave_tokens=[], net_name="mainnet"),
+                           reserve_token_cache=ReserveTokenCache(1, DATA_PROVIDER, str(tmp_path)),
+                           _fetch_reserve_tokens=fetch_reserve_tokens)
+    return client
+
+
+def test_only_reserves_missing_from_the_cache_are_fetched(tmp_path):
+    ReserveTokenCache(1, DATA_PROVIDER, str(tmp_path)).save([WETH, USDC])
+    client = token_loading_client(tmp_path, [WETH, USDC, DAI])
+    client._store_reserve_tokens()
+
+    assert client.fetched == ["DAI"]
+    assert client.fetch_reserve_tokens() == [WETH, USDC, DAI]
+    assert client.get_reserve_token("dai") is DAI
+    assert client.reserve_token_cache.load() == [WETH, USDC, DAI]
+
+
+def test_delisted_reserves_are_dropped_from_the_cache(tmp_path):
+    ReserveTokenCache(1, DATA_PROVIDER, str(tmp_path)).save([WETH, USDC, DAI])
+    client = token_loading_client(tmp_path, [WETH, DAI])
+    client._store_reserve_tokens()
+
+    assert client.fetched == []
+    assert client.fetch_reserve_tokens() == [WETH, DAI]
+    assert client.reserve_token_cache.load() == [WETH, DAI]
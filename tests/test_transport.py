@@ -0,0 +1,92 @@
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import threading
+from types import SimpleNamespace
+
+import pytest
+import requests
+from web3 import Web3
+
+from aave_python.transport import HTTPTransport, PooledHTTPProvider
+
+
+@pytest.fixture
+def rpc_server():
+    """Local JSON-RPC server answering eth_blockNumber, recording the client port of every request"""
+    client_ports = []
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            client_ports.append(self.client_address[1])
+            body = json.dumps({"jsonrpc": "2.0", "id": request["id"], "result": "0x7b"}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}", client_ports
+    server.shutdown()
+
+
+def test_provider_posts_through_the_transport_session(rpc_server):
+    url, client_ports = rpc_server
+    transport = HTTPTransport()
+    provider = transport.provider(url)
+
+    assert isinstance(provider, PooledHTTPProvider)
+    assert Web3(provider).eth.block_number == 123
+
+
+def test_requests_from_every_thread_share_the_pool(rpc_server):
+    url, client_ports = rpc_server
+    transport = HTTPTransport(pool_maxsize=2)
+    w3 = Web3(transport.provider(url))
+    w3.eth.block_number
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        for _ in range(10):
+            list(executor.map(lambda _: w3.eth.block_number, range(2)))
+
+    # Every connection comes from the transport's pool of at most 2 connections per host
+    assert len(set(client_ports)) <= 2
+    assert len(client_ports) == 21
+
+
+class FlakyTransport:
+    """Fails the first 'failures' POSTs with a connection error, then answers every JSON-RPC request with 0x7b"""
+    def __init__(self, failures: int):
+        self.failures = failures
+        self.posts = 0
+
+    def post(self, url, data, **kwargs):
+        self.posts += 1
+        if self.posts <= self.failures:
+            raise requests.ConnectionError("Connection reset by peer")
+        request = json.loads(data)
+        return SimpleNamespace(content=json.dumps({"jsonrpc": "2.0", "id": request["id"], "result": "0x7b"}).encode())
+
+
+def test_idempotent_reads_are_retried_on_connection_errors():
+    transport = FlakyTransport(failures=2)
+    w3 = Web3(PooledHTTPProvider("http://127.0.0.1:1", transport))
+
+    assert w3.eth.block_number == 123
+    assert transport.posts == 3
+
+
+def test_node_signed_transactions_are_not_retried():
+    transport = FlakyTransport(failures=1)
+    provider = PooledHTTPProvider("http://127.0.0.1:1", transport)
+    with pytest.raises(requests.ConnectionError):
+        Web3(provider, middlewares=[]).manager.request_blocking("eth_sendTransaction", [{}])
+
+    assert transport.posts == 1
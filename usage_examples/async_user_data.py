@@ -0,0 +1,31 @@
+from dotenv import load_dotenv
+load_dotenv()
+
+import asyncio
+import os  # For fetching environment variables
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from aave_python import AsyncAaveClient
+
+
+async def main():
+    """Obstantiate the asyncio client using the Ethereum Mainnet"""
+    async with AsyncAaveClient(wallet_address=os.getenv('WALLET_ADDRESS'),
+                               private_wallet_key=os.getenv('PRIVATE_WALLET_KEY'),
+                               mainnet_rpc_url=os.getenv('MAINNET_RPC_URL'),
+                               gas_strategy="medium") as aave_client:
+        """Fetch the account data, all reserve balances and every reserve price concurrently"""
+        user_data, balances, prices = await asyncio.gather(
+            aave_client.get_user_data(),
+            aave_client.get_all_reserve_balances(hide_empty_assets=True),
+            aave_client.get_asset_prices(aave_client.fetch_reserve_tokens()),
+        )
+        print(user_data)
+        print(balances)
+        print(prices)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())